@@ -0,0 +1,407 @@
+"""
+Benchmark every endpoint of properties/urls.py and users/urls.py in process.
+
+Each endpoint is called --requests times through the Django test client,
+after two warm-up calls, and one more time to count its queries and the
+peak Python memory it allocates (tracemalloc slows requests down, so that
+call is not timed). Writes run in a transaction that is rolled back, so
+every call sees the same data.
+
+By default a test database is created, filled by the generate_synthetic_data
+command at the given scale and seed, and dropped afterwards, so runs on the
+same machine are comparable. With --existing the configured database and
+--username/--password are used as they are.
+
+Results are printed and written as JSON to --output. If --baseline exists
+the run is compared with it: an endpoint regresses when it makes more
+queries, or its p95 grew by more than --tolerance and --min-delta-ms.
+Regressions make the script exit with status 1. --save-baseline writes the
+results to --baseline instead.
+
+Usage, from backend/ with the database settings in the environment:
+
+  python benchmarks/endpoints.py
+  python benchmarks/endpoints.py --properties 2000 --requests 50 --output results.json
+  python benchmarks/endpoints.py --save-baseline
+  python benchmarks/endpoints.py --existing --username owner --password secret --baseline none
+
+Response caching is switched off (DummyCache) unless --keep-cache is given,
+so every request reaches the database.
+"""
+import argparse
+import datetime
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from loadgen import BACKEND_DIR, percentile
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / 'baseline.json'
+RESULT_HEADER = (
+  f"{'endpoint':<58}{'status':>7}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'queries':>8}{'peak KiB':>10}  baseline"
+)
+
+
+def parse_args():
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument('--requests', type=int, default=30, help="Timed calls per endpoint (default 30).")
+  parser.add_argument('--only', help="Only endpoints whose name contains this text.")
+  parser.add_argument('--output', help="Write the results to this JSON file.")
+  parser.add_argument('--baseline', default=str(DEFAULT_BASELINE),
+                      help="Baseline JSON to compare with, 'none' to skip (default benchmarks/baseline.json).")
+  parser.add_argument('--save-baseline', action='store_true', help="Write the results to --baseline.")
+  parser.add_argument('--tolerance', type=float, default=0.25, help="Allowed p95 growth (default 0.25).")
+  parser.add_argument('--min-delta-ms', type=float, default=2.0,
+                      help="p95 growth below this is noise whatever the ratio (default 2).")
+  parser.add_argument('--keep-cache', action='store_true', help="Leave response caching on.")
+  scale = parser.add_argument_group('synthetic data (test database)')
+  scale.add_argument('--owners', type=int, default=2)
+  scale.add_argument('--properties', type=int, default=500, help="Properties per owner (default 500).")
+  scale.add_argument('--leases', type=int, default=2, help="Leases per property (default 2).")
+  scale.add_argument('--lease-months', type=int, default=12)
+  scale.add_argument('--tenants', type=int, default=500)
+  scale.add_argument('--seed', type=int, default=0)
+  existing = parser.add_argument_group('existing database')
+  existing.add_argument('--existing', action='store_true', help="Use the configured database as it is.")
+  existing.add_argument('--username')
+  existing.add_argument('--password')
+  args = parser.parse_args()
+  if args.existing and not (args.username and args.password):
+    parser.error("--existing needs --username and --password")
+  if args.requests < 2:
+    parser.error("--requests must be at least 2")
+  return args
+
+
+def setup_django(args):
+  sys.path.insert(0, str(BACKEND_DIR))
+  os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+  # Keep DEBUG's query log and the rendered contracts out of the measurements
+  os.environ['DEBUG'] = 'False'
+  os.environ.setdefault('CONTRACT_PDF_ROOT', tempfile.mkdtemp(prefix='rentwise-benchmark-'))
+  if not args.keep_cache:
+    os.environ['CACHE_BACKEND'] = 'django.core.cache.backends.dummy.DummyCache'
+  import django
+  django.setup()
+
+
+def scenarios(owner, password, refresh_token):
+  """
+  (name, method, build) for every endpoint. build() runs before each call,
+  inside the call's transaction for writes, and returns (path, client kwargs).
+  """
+  from django.core.files.uploadedfile import SimpleUploadedFile
+  from properties.availability import add_months
+  from properties.contracts import submit_contract
+  from properties.models import Property, Lease, Payment
+  from properties.serializers import PaymentSerializer
+
+  today = datetime.date.today()
+  property = Property.objects.filter(owner=owner, leases__isnull=False).order_by('id').first()
+  lease = Lease.objects.filter(property=property).order_by('-start_date').first()
+  payment = Payment.objects.filter(lease=lease).order_by('due_date').first()
+  if payment is None:
+    raise SystemExit(f"{owner.username} needs a property with a lease and a payment.")
+  payment_ids = list(Payment.objects.filter(lease__property__owner=owner).order_by('id').values_list('id', flat=True)[:50])
+  # A missing contract is only queued by the request (202), so the endpoint is measured serving it from disk
+  submit_contract(Lease.objects.select_related('property', 'tenant').get(pk=lease.pk)).result()
+
+  def future_lease():
+    # Far enough ahead not to overlap anything, and allowed by Lease.check_dates
+    start = add_months(today, 120)
+    return Lease.objects.create(
+      property=property, tenant=lease.tenant, start_date=start,
+      end_date=add_months(start, 12) - datetime.timedelta(days=1), rate_amount=lease.rate_amount,
+    )
+
+  def lease_data(new_lease):
+    return {
+      'tenant': new_lease.tenant_id, 'property': property.pk, 'start_date': str(new_lease.start_date),
+      'end_date': str(new_lease.end_date), 'rate_amount': '1234.00',
+    }
+
+  def payment_data(pk):
+    data = PaymentSerializer(Payment.objects.get(pk=pk)).data
+    return {**{name: data[name] for name in ('lease', 'amount', 'due_date', 'payment_date')}, 'is_paid': True}
+
+  def get(path, **params):
+    return lambda: (path, {'data': params})
+
+  def put_lease():
+    new_lease = future_lease()
+    return f'/properties/api/leases/{new_lease.pk}/', {'data': lease_data(new_lease), 'content_type': 'application/json'}
+
+  def post_lease():
+    new_lease = future_lease()
+    data = lease_data(new_lease)
+    new_lease.delete()
+    return '/properties/api/leases/', {'data': data, 'content_type': 'application/json'}
+
+  def lease_batch():
+    new_lease = future_lease()
+    operations = [{'op': 'update', 'id': new_lease.pk, 'data': lease_data(new_lease)}]
+    return '/properties/api/leases/batch/', {'data': operations, 'content_type': 'application/json'}
+
+  def payment_batch():
+    operations = [{'op': 'update', 'id': pk, 'data': payment_data(pk)} for pk in payment_ids]
+    return '/properties/api/payments/batch/', {'data': operations, 'content_type': 'application/json'}
+
+  def schedule():
+    return f'/properties/api/leases/{future_lease().pk}/schedule/', {}
+
+  def put_property():
+    data = {
+      'address': property.address, 'description': 'Benchmarked', 'property_type': property.property_type,
+      'status': property.status, 'area': str(property.area), 'num_of_rooms': property.num_of_rooms,
+    }
+    return f'/properties/api/{property.pk}/', {'data': data, 'content_type': 'application/json'}
+
+  def import_properties():
+    rows = ''.join(
+      f'Benchmark Lane {i},Imported,apartment,available,50,2\n' for i in range(20)
+    )
+    upload = SimpleUploadedFile(
+      'properties.csv', f'address,description,property_type,status,area,num_of_rooms\n{rows}'.encode(), 'text/csv'
+    )
+    return '/properties/api/import/properties/', {'data': {'file': upload}}
+
+  def obtain_token():
+    return '/users/api/token/', {'data': {'username': owner.username, 'password': password}, 'anonymous': True}
+
+  window = {'start_date': str(today), 'end_date': str(add_months(today, 12))}
+  month = today.strftime('%Y-%m')
+  return [
+    ('GET properties/api/', 'get', get('/properties/api/')),
+    ('GET properties/api/ (filtered)', 'get', get('/properties/api/', status='rented', property_type='apartment')),
+    ('POST properties/api/', 'post', lambda: ('/properties/api/', {
+      'data': {'address': 'Benchmark Lane 1', 'property_type': 'room', 'status': 'available', 'area': '20',
+               'num_of_rooms': 1},
+      'content_type': 'application/json',
+    })),
+    ('GET properties/api/<int:id>/', 'get', get(f'/properties/api/{property.pk}/')),
+    ('PUT properties/api/<int:id>/', 'put', put_property),
+    ('DELETE properties/api/<int:id>/', 'delete', lambda: (f'/properties/api/{property.pk}/', {})),
+    ('GET properties/api/availability/', 'get', get('/properties/api/availability/', months=12)),
+    ('GET properties/api/<int:id>/availability/', 'get', get(f'/properties/api/{property.pk}/availability/', **window)),
+    ('GET properties/api/search/', 'get', get('/properties/api/search/', q='garden balcony')),
+    ('GET properties/api/leases/', 'get', get('/properties/api/leases/')),
+    ('POST properties/api/leases/', 'post', post_lease),
+    ('GET properties/api/leases/contracts/', 'get', get('/properties/api/leases/contracts/', property=property.pk)),
+    ('POST properties/api/leases/batch/', 'post', lease_batch),
+    ('GET properties/api/leases/<int:id>/', 'get', get(f'/properties/api/leases/{lease.pk}/')),
+    ('PUT properties/api/leases/<int:id>/', 'put', put_lease),
+    ('DELETE properties/api/leases/<int:id>/', 'delete', lambda: (f'/properties/api/leases/{lease.pk}/', {})),
+    ('POST properties/api/leases/<int:id>/schedule/', 'post', schedule),
+    ('GET properties/api/payments/', 'get', get('/properties/api/payments/')),
+    ('GET properties/api/payments/ (overdue)', 'get', get('/properties/api/payments/', status='overdue')),
+    ('POST properties/api/payments/', 'post', lambda: ('/properties/api/payments/', {
+      'data': {'lease': lease.pk, 'amount': '100.00', 'due_date': str(today)}, 'content_type': 'application/json',
+    })),
+    ('POST properties/api/payments/batch/', 'post', payment_batch),
+    ('GET properties/api/payments/<int:id>/', 'get', get(f'/properties/api/payments/{payment.pk}/')),
+    ('PUT properties/api/payments/<int:id>/', 'put', lambda: (
+      f'/properties/api/payments/{payment.pk}/', {'data': payment_data(payment.pk), 'content_type': 'application/json'}
+    )),
+    ('DELETE properties/api/payments/<int:id>/', 'delete', lambda: (f'/properties/api/payments/{payment.pk}/', {})),
+    ('GET properties/api/export/<str:resource>/ (properties)', 'get', get('/properties/api/export/properties/')),
+    ('GET properties/api/export/<str:resource>/ (leases)', 'get', get('/properties/api/export/leases/')),
+    ('GET properties/api/export/<str:resource>/ (payments)', 'get', get('/properties/api/export/payments/')),
+    ('POST properties/api/import/<str:resource>/ (properties)', 'post', import_properties),
+    ('GET properties/api/reports/rent-roll/', 'get', get('/properties/api/reports/rent-roll/', month=month)),
+    ('GET properties/api/reports/arrears/', 'get', get('/properties/api/reports/arrears/', year=today.year)),
+    ('GET properties/api/forecast/', 'get', get('/properties/api/forecast/', months=12)),
+    ('GET properties/api/audit/', 'get', get('/properties/api/audit/', lease=lease.pk)),
+    ('GET properties/api/dashboard/', 'get', get('/properties/api/dashboard/')),
+    ('GET properties/api/async/', 'get', get('/properties/api/async/')),
+    ('GET properties/api/async/<int:id>/', 'get', get(f'/properties/api/async/{property.pk}/')),
+    ('GET properties/api/async/leases/', 'get', get('/properties/api/async/leases/')),
+    ('GET properties/api/async/leases/<int:id>/', 'get', get(f'/properties/api/async/leases/{lease.pk}/')),
+    ('GET properties/api/async/payments/', 'get', get('/properties/api/async/payments/')),
+    ('GET properties/api/async/payments/<int:id>/', 'get', get(f'/properties/api/async/payments/{payment.pk}/')),
+    ('GET properties/api/async/dashboard/', 'get', get('/properties/api/async/dashboard/')),
+    ('GET properties/leases/<int:pk>/contract/', 'get', get(f'/properties/leases/{lease.pk}/contract/')),
+    ('POST users/api/token/', 'post', obtain_token),
+    ('POST users/api/token/refresh/', 'post', lambda: (
+      '/users/api/token/refresh/', {'data': {'refresh': refresh_token}, 'anonymous': True}
+    )),
+    ('GET users/api/users/', 'get', get('/users/api/users/')),
+    ('GET users/api/users/ (search)', 'get', get('/users/api/users/', search=owner.username[:6])),
+    ('GET users/auth/users/me/', 'get', get('/users/auth/users/me/')),
+  ]
+
+
+def uncovered_routes(names):
+  """Routes of properties/urls.py and users/urls.py no scenario calls."""
+  from django.urls import URLPattern
+  from properties import urls as property_urls
+  from users import urls as user_urls
+  covered = {name.split(' ')[1] for name in names}
+  routes = [f'properties/{pattern.pattern}' for pattern in property_urls.urlpatterns if isinstance(pattern, URLPattern)]
+  routes += [f'users/{pattern.pattern}' for pattern in user_urls.urlpatterns if isinstance(pattern, URLPattern)]
+  return [route for route in routes if route not in covered]
+
+
+def call(client, anonymous, method, build, write):
+  """One request as (seconds, status, response); writes are rolled back."""
+  from django.db import transaction
+  with transaction.atomic():
+    path, kwargs = build()
+    kwargs = dict(kwargs)
+    target = anonymous if kwargs.pop('anonymous', False) else client
+    started = time.perf_counter()
+    response = getattr(target, method)(path, **kwargs)
+    if response.streaming:
+      b''.join(response.streaming_content)
+    elapsed = time.perf_counter() - started
+    if write:
+      transaction.set_rollback(True)
+  return elapsed, response.status_code, response
+
+
+def measure(client, anonymous, method, build, requests):
+  from django.db import connection
+  from django.test.utils import CaptureQueriesContext
+  write = method != 'get'
+  for _ in range(2):
+    call(client, anonymous, method, build, write)
+  timings, statuses = [], set()
+  for _ in range(requests):
+    elapsed, status, _ = call(client, anonymous, method, build, write)
+    timings.append(elapsed * 1000)
+    statuses.add(status)
+
+  with CaptureQueriesContext(connection) as queries:
+    tracemalloc.start()
+    _, status, _ = call(client, anonymous, method, build, write)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+  return {
+    'status': status if len(statuses) == 1 else sorted(statuses),
+    'p50_ms': round(percentile(timings, 50), 2),
+    'p95_ms': round(percentile(timings, 95), 2),
+    'p99_ms': round(percentile(timings, 99), 2),
+    'mean_ms': round(statistics.fmean(timings), 2),
+    # Includes the savepoints of atomic blocks nested in the rolled back transaction
+    'queries': len(queries),
+    'peak_memory_kib': round(peak / 1024, 1),
+  }
+
+
+def compare(result, baseline, args):
+  """A short comparison with the baseline entry, and whether it is a regression."""
+  if baseline is None:
+    return 'new', False
+  notes, regressed = [], False
+  if result['queries'] > baseline['queries']:
+    notes.append(f"queries {baseline['queries']}->{result['queries']}")
+    regressed = True
+  growth = result['p95_ms'] - baseline['p95_ms']
+  ratio = result['p95_ms'] / baseline['p95_ms'] if baseline['p95_ms'] else 1
+  if ratio > 1 + args.tolerance and growth > args.min_delta_ms:
+    regressed = True
+  notes.insert(0, f"p95 {ratio - 1:+.0%}")
+  return ', '.join(notes) + (' REGRESSION' if regressed else ''), regressed
+
+
+def run(args, owner, password):
+  from django.test import Client
+  anonymous = Client(raise_request_exception=False)
+  tokens = json.loads(anonymous.post('/users/api/token/', {'username': owner.username, 'password': password}).content)
+  if 'access' not in tokens:
+    raise SystemExit(f"Could not log in as {owner.username}: {tokens}")
+  client = Client(raise_request_exception=False, HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+
+  endpoints = scenarios(owner, password, tokens['refresh'])
+  for route in uncovered_routes([name for name, _, _ in endpoints]):
+    print(f"warning: no scenario for {route}", file=sys.stderr)
+  results = {}
+  for name, method, build in endpoints:
+    if args.only and args.only not in name:
+      continue
+    results[name] = measure(client, anonymous, method, build, args.requests)
+  return results
+
+
+def database_description():
+  from django.db import connection
+  with connection.cursor() as cursor:
+    cursor.execute('SHOW server_version')
+    return f"{connection.vendor} {cursor.fetchone()[0]}"
+
+
+def main():
+  args = parse_args()
+  setup_django(args)
+  import django
+  from django.contrib.auth import get_user_model
+  from django.core.management import call_command
+  from django.test.utils import setup_databases, setup_test_environment, teardown_databases
+
+  setup_test_environment()
+  scale = None
+  if args.existing:
+    owner = get_user_model().objects.get(username=args.username)
+    results = run(args, owner, args.password)
+    database = database_description()
+  else:
+    scale = {name: getattr(args, name) for name in ('owners', 'properties', 'leases', 'lease_months', 'tenants', 'seed')}
+    old_config = setup_databases(verbosity=0, interactive=False)
+    try:
+      started = time.perf_counter()
+      call_command('generate_synthetic_data', prefix='benchmark', password='benchmark', stdout=io.StringIO(), **scale)
+      print(f"Test database filled in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+      results = run(args, get_user_model().objects.get(username='benchmark-owner0'), 'benchmark')
+      database = database_description()
+    finally:
+      teardown_databases(old_config, verbosity=0)
+
+  report = {
+    'meta': {
+      'created': datetime.datetime.now().isoformat(timespec='seconds'),
+      'python': platform.python_version(),
+      'django': django.get_version(),
+      'database': database,
+      'scale': scale,
+      'requests': args.requests,
+      'cache': args.keep_cache,
+    },
+    'endpoints': results,
+  }
+
+  baseline = {}
+  baseline_path = None if args.baseline == 'none' else Path(args.baseline)
+  if baseline_path and baseline_path.exists() and not args.save_baseline:
+    baseline = json.loads(baseline_path.read_text())
+    if baseline['meta']['scale'] != scale or baseline['meta']['requests'] != args.requests:
+      print("warning: the baseline was recorded at another scale or request count", file=sys.stderr)
+
+  print(f"{args.requests} requests per endpoint")
+  print(RESULT_HEADER)
+  regressions = 0
+  for name, result in results.items():
+    note, regressed = compare(result, baseline.get('endpoints', {}).get(name), args) if baseline else ('', False)
+    regressions += regressed
+    status = result['status'] if isinstance(result['status'], int) else '/'.join(map(str, result['status']))
+    print(
+      f"{name:<58}{status:>7}{result['p50_ms']:>9.1f}{result['p95_ms']:>9.1f}{result['p99_ms']:>9.1f}"
+      f"{result['queries']:>8}{result['peak_memory_kib']:>10.0f}  {note}"
+    )
+
+  if args.output:
+    Path(args.output).write_text(json.dumps(report, indent=2) + '\n')
+  if args.save_baseline and baseline_path:
+    baseline_path.write_text(json.dumps(report, indent=2) + '\n')
+    print(f"Baseline saved to {baseline_path}")
+  if regressions:
+    print(f"{regressions} endpoint(s) regressed against {baseline_path}")
+    sys.exit(1)
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,127 @@
+"""
+Time the cash-flow forecast against a per lease Python loop.
+
+Builds a synthetic lease book in memory (no database) and runs the
+vectorized projection and late payment probabilities from
+properties/forecast.py and a straightforward loop over leases and payments
+computing the same numbers, checks that they agree and prints both timings.
+With --username it also times the whole forecast, query included, for that
+user's leases in the configured database.
+
+Usage, from backend/ (--username needs the database settings in the environment):
+
+  python benchmarks/forecast.py
+  python benchmarks/forecast.py --leases 100000 --payments 12 --months 36
+  python benchmarks/forecast.py --username owner
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+import django
+django.setup()
+
+from properties.forecast import PRIOR_PAYMENTS, late_probabilities, monthly_totals, cash_flow_forecast
+
+
+def synthetic_book(leases, payments_per_lease, first_month, seed=0):
+  random = np.random.default_rng(seed)
+  start = first_month - random.integers(0, 24, leases)
+  book = {
+    'id': np.arange(1, leases + 1),
+    'rate': random.integers(500, 5000, leases).astype(np.float64),
+    'active': random.random(leases) < 0.9,
+    'start_month': start,
+    'end_month': start + random.integers(6, 48, leases),
+  }
+  counts = random.integers(0, payments_per_lease + 1, leases)
+  lease = np.repeat(np.arange(leases), counts)
+  # Each tenant has their own habits
+  lateness = random.random(leases) * 0.4
+  late = random.random(len(lease)) < lateness[lease]
+  missed = late & (random.random(len(lease)) < 0.3)
+  return book, {'lease': lease, 'late': late, 'missed': missed}
+
+
+def vectorized(leases, payments, first_month, months):
+  late, missed, counts, _, _ = late_probabilities(leases, payments)
+  return (
+    monthly_totals(leases, leases['rate'], first_month, months),
+    monthly_totals(leases, leases['rate'] * (1 - missed), first_month, months),
+    monthly_totals(leases, leases['rate'] * (1 - late), first_month, months),
+  )
+
+
+def loop(rows, payment_rows, first_month, months):
+  history = {}
+  late_total = missed_total = 0
+  for lease_id, late, missed in payment_rows:
+    counts = history.setdefault(lease_id, [0, 0, 0])
+    counts[0] += 1
+    counts[1] += late
+    counts[2] += missed
+    late_total += late
+    missed_total += missed
+  portfolio_late = late_total / max(len(payment_rows), 1)
+  portfolio_missed = missed_total / max(len(payment_rows), 1)
+
+  expected, collected, on_time = [0.0] * months, [0.0] * months, [0.0] * months
+  for lease_id, rate, active, start_month, end_month in rows:
+    if not active:
+      continue
+    count, late, missed = history.get(lease_id, (0, 0, 0))
+    late_probability = (late + PRIOR_PAYMENTS * portfolio_late) / (count + PRIOR_PAYMENTS)
+    missed_probability = (missed + PRIOR_PAYMENTS * portfolio_missed) / (count + PRIOR_PAYMENTS)
+    for month in range(max(start_month, first_month), min(end_month, first_month + months - 1) + 1):
+      expected[month - first_month] += rate
+      collected[month - first_month] += rate * (1 - missed_probability)
+      on_time[month - first_month] += rate * (1 - late_probability)
+  return expected, collected, on_time
+
+
+def timed(function, *args, repeat):
+  timings = []
+  for _ in range(repeat):
+    started = time.perf_counter()
+    result = function(*args)
+    timings.append(time.perf_counter() - started)
+  return result, statistics.median(timings)
+
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument('--leases', type=int, default=100000)
+  parser.add_argument('--payments', type=int, default=12, help="Most past payments per lease.")
+  parser.add_argument('--months', type=int, default=12)
+  parser.add_argument('--repeat', type=int, default=5)
+  parser.add_argument('--username', help="Also time cash_flow_forecast for this user's leases.")
+  args = parser.parse_args()
+
+  first_month = 2025 * 12
+  leases, payments = synthetic_book(args.leases, args.payments, first_month)
+  # What a per lease implementation works on: rows as Python objects
+  rows = list(zip(*(leases[name].tolist() for name in ('id', 'rate', 'active', 'start_month', 'end_month'))))
+  payment_rows = list(zip(leases['id'][payments['lease']].tolist(), payments['late'].tolist(), payments['missed'].tolist()))
+
+  print(f"{args.leases} leases, {len(payment_rows)} past payments, {args.months} months, median of {args.repeat}")
+  fast, fast_time = timed(vectorized, leases, payments, first_month, args.months, repeat=args.repeat)
+  slow, slow_time = timed(loop, rows, payment_rows, first_month, args.months, repeat=args.repeat)
+  for fast_totals, slow_totals in zip(fast, slow):
+    np.testing.assert_allclose(fast_totals, slow_totals, rtol=1e-9)
+  print(f"{'vectorized':<12}{fast_time * 1000:10.1f} ms")
+  print(f"{'python loop':<12}{slow_time * 1000:10.1f} ms  ({slow_time / fast_time:.0f}x)")
+
+  if args.username:
+    from django.contrib.auth import get_user_model
+    owner = get_user_model().objects.get(username=args.username)
+    _, total_time = timed(cash_flow_forecast, owner, args.months, repeat=args.repeat)
+    print(f"{'database':<12}{total_time * 1000:10.1f} ms  (cash_flow_forecast for {args.username})")
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,88 @@
+"""
+Load test the development and production serving profiles.
+
+Runs the same list and detail requests against:
+
+  - runserver with core.settings (a new database connection per request)
+  - gunicorn -c gunicorn.conf.py with core.settings_production but
+    DB_CONN_MAX_AGE=0, to separate the server from the connection reuse
+  - gunicorn -c gunicorn.conf.py with core.settings_production
+
+and prints requests per second and latency percentiles for each endpoint.
+Detail endpoints use the newest property and lease of the user.
+
+Usage, from backend/ with DJANGO_KEY and the DB_* variables in the environment:
+
+  python benchmarks/load_test.py --username owner --password secret
+  python benchmarks/load_test.py --username owner --password secret --workers 4 --threads 8
+
+Response caching is switched off (DummyCache) unless --keep-cache is given,
+so every request reaches the database.
+"""
+import argparse
+import sys
+from loadgen import RESULT_HEADER, format_result, get_json, obtain_token, run_load, start_server, stop_server
+
+
+def endpoints(base_url, token):
+  properties = get_json(f'{base_url}/properties/api/?page_size=1', token)['results']
+  leases = get_json(f'{base_url}/properties/api/leases/?page_size=1', token)['results']
+  paths = ['/properties/api/', '/properties/api/leases/']
+  if properties:
+    paths.append(f"/properties/api/{properties[0]['id']}/")
+  if leases:
+    paths.append(f"/properties/api/leases/{leases[0]['id']}/")
+  return paths
+
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument('--username', required=True)
+  parser.add_argument('--password', required=True)
+  parser.add_argument('--requests', type=int, default=500)
+  parser.add_argument('--concurrency', type=int, default=32)
+  parser.add_argument('--workers', default='4', help="GUNICORN_WORKERS for the production runs.")
+  parser.add_argument('--threads', default='4', help="GUNICORN_THREADS for the production runs.")
+  parser.add_argument('--dev-settings', default='core.settings')
+  parser.add_argument('--prod-settings', default='core.settings_production')
+  parser.add_argument('--host', default='127.0.0.1')
+  parser.add_argument('--port', type=int, default=8765)
+  parser.add_argument('--keep-cache', action='store_true', help="Leave response caching on.")
+  args = parser.parse_args()
+
+  bind = f'{args.host}:{args.port}'
+  base_url = f'http://{bind}'
+  common = {} if args.keep_cache else {'CACHE_BACKEND': 'django.core.cache.backends.dummy.DummyCache'}
+  gunicorn = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--bind', bind]
+  production = {
+    **common,
+    'DJANGO_SETTINGS_MODULE': args.prod_settings,
+    'GUNICORN_WORKERS': args.workers,
+    'GUNICORN_THREADS': args.threads,
+    'GUNICORN_ACCESS_LOG': '',
+    'ALLOWED_HOSTS': args.host,
+  }
+  profiles = [
+    ('runserver, dev settings',
+     [sys.executable, 'manage.py', 'runserver', '--noreload', bind],
+     {**common, 'DJANGO_SETTINGS_MODULE': args.dev_settings}),
+    (f'gunicorn {args.workers}x{args.threads}, CONN_MAX_AGE=0',
+     gunicorn, {**production, 'DB_CONN_MAX_AGE': '0'}),
+    (f'gunicorn {args.workers}x{args.threads}, production', gunicorn, production),
+  ]
+
+  print(f"{args.requests} requests per endpoint, {args.concurrency} concurrent")
+  print(RESULT_HEADER)
+  for name, command, env in profiles:
+    process = start_server(command, args.host, args.port, env)
+    try:
+      token = obtain_token(base_url, args.username, args.password)
+      for path in endpoints(base_url, token):
+        result = run_load(base_url + path, token, args.requests, args.concurrency)
+        print(format_result(name, path, result))
+    finally:
+      stop_server(process)
+
+
+if __name__ == '__main__':
+  main()
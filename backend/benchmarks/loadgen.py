@@ -0,0 +1,105 @@
+"""Helpers shared by the benchmark scripts: start a server, log in, load it."""
+import json
+import os
+import socket
+import statistics
+import subprocess
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+RESULT_HEADER = f"{'server':<40}{'path':<36}{'req/s':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>8}"
+
+
+def wait_for_port(host, port, timeout=30):
+  deadline = time.monotonic() + timeout
+  while time.monotonic() < deadline:
+    with socket.socket() as sock:
+      if sock.connect_ex((host, port)) == 0:
+        return
+    time.sleep(0.1)
+  raise RuntimeError(f"Server on {host}:{port} did not start within {timeout}s")
+
+
+def start_server(command, host, port, env=None):
+  """Start `command` from the backend directory with `env` on top of os.environ."""
+  process = subprocess.Popen(
+    command, cwd=BACKEND_DIR, env={**os.environ, **(env or {})},
+    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+  )
+  try:
+    wait_for_port(host, port)
+  except RuntimeError:
+    process.terminate()
+    raise
+  return process
+
+
+def stop_server(process):
+  process.terminate()
+  process.wait()
+
+
+def obtain_token(base_url, username, password):
+  request = urllib.request.Request(
+    f'{base_url}/users/api/token/',
+    data=json.dumps({'username': username, 'password': password}).encode(),
+    headers={'Content-Type': 'application/json'},
+  )
+  with urllib.request.urlopen(request) as response:
+    return json.load(response)['access']
+
+
+def get_json(url, token):
+  request = urllib.request.Request(url, headers={'Authorization': f'Bearer {token}'})
+  with urllib.request.urlopen(request) as response:
+    return json.load(response)
+
+
+def timed_get(url, token):
+  request = urllib.request.Request(url, headers={'Authorization': f'Bearer {token}'})
+  started = time.perf_counter()
+  try:
+    with urllib.request.urlopen(request) as response:
+      response.read()
+      status = response.status
+  except urllib.error.HTTPError as e:
+    status = e.code
+  return time.perf_counter() - started, status
+
+
+def percentile(values, pct):
+  return statistics.quantiles(values, n=100, method='inclusive')[pct - 1]
+
+
+def run_load(url, token, requests, concurrency):
+  """GET `url` `requests` times from `concurrency` threads; returns req/s and latency percentiles."""
+  # Warm up connections, imports and the query plan cache
+  for _ in range(min(concurrency, 10)):
+    timed_get(url, token)
+
+  started = time.perf_counter()
+  with ThreadPoolExecutor(max_workers=concurrency) as pool:
+    results = list(pool.map(lambda _: timed_get(url, token), range(requests)))
+  elapsed = time.perf_counter() - started
+
+  latencies = [latency * 1000 for latency, _ in results]
+  errors = sum(1 for _, status in results if status != 200)
+  return {
+    'rps': requests / elapsed,
+    'p50': percentile(latencies, 50),
+    'p95': percentile(latencies, 95),
+    'p99': percentile(latencies, 99),
+    'errors': errors,
+  }
+
+
+def format_result(name, path, result):
+  return (
+    f"{name:<40}{path:<36}{result['rps']:>8.1f}{result['p50']:>9.1f}"
+    f"{result['p95']:>9.1f}{result['p99']:>9.1f}{result['errors']:>8}"
+  )
@@ -0,0 +1,70 @@
+"""
+Compare WSGI and ASGI throughput for the read endpoints on a single process.
+
+Starts each server in turn from the backend directory, fires concurrent GETs
+at it with a JWT for an existing user and prints requests per second and
+latency percentiles:
+
+  - gunicorn (WSGI, one sync worker) serving the sync endpoint
+  - uvicorn (ASGI, one worker) serving the sync endpoint
+  - uvicorn (ASGI, one worker) serving the async endpoint
+
+Usage, from backend/ with the database settings in the environment:
+
+  python benchmarks/wsgi_vs_asgi.py --username owner --password secret
+  python benchmarks/wsgi_vs_asgi.py --username owner --password secret \\
+      --path /properties/api/payments/ --async-path /properties/api/async/payments/
+
+Response caching is switched off for the servers (DummyCache) unless
+--keep-cache is given, so every request reaches the database.
+"""
+import argparse
+import os
+import sys
+from loadgen import RESULT_HEADER, format_result, obtain_token, run_load, start_server, stop_server
+
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument('--username', required=True)
+  parser.add_argument('--password', required=True)
+  parser.add_argument('--path', default='/properties/api/dashboard/', help="Sync endpoint to load.")
+  parser.add_argument('--async-path', default='/properties/api/async/dashboard/', help="Async counterpart of --path.")
+  parser.add_argument('--requests', type=int, default=500)
+  parser.add_argument('--concurrency', type=int, default=50)
+  parser.add_argument('--host', default='127.0.0.1')
+  parser.add_argument('--port', type=int, default=8765)
+  parser.add_argument('--keep-cache', action='store_true', help="Leave response caching on.")
+  args = parser.parse_args()
+
+  bind = f'{args.host}:{args.port}'
+  base_url = f'http://{bind}'
+  servers = [
+    ('WSGI gunicorn, 1 sync worker', args.path,
+     [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--workers', '1', '--threads', '1', '--bind', bind]),
+    ('ASGI uvicorn, sync view', args.path,
+     [sys.executable, '-m', 'uvicorn', 'core.asgi:application', '--workers', '1',
+      '--host', args.host, '--port', str(args.port), '--no-access-log']),
+    ('ASGI uvicorn, async view', args.async_path,
+     [sys.executable, '-m', 'uvicorn', 'core.asgi:application', '--workers', '1',
+      '--host', args.host, '--port', str(args.port), '--no-access-log']),
+  ]
+
+  # Same settings for every server (gunicorn.conf.py would default to production)
+  env = {'DJANGO_SETTINGS_MODULE': os.getenv('DJANGO_SETTINGS_MODULE', 'core.settings')}
+  if not args.keep_cache:
+    env['CACHE_BACKEND'] = 'django.core.cache.backends.dummy.DummyCache'
+  print(f"{args.requests} requests, {args.concurrency} concurrent")
+  print(RESULT_HEADER)
+  for name, path, command in servers:
+    process = start_server(command, args.host, args.port, env)
+    try:
+      token = obtain_token(base_url, args.username, args.password)
+      result = run_load(base_url + path, token, args.requests, args.concurrency)
+    finally:
+      stop_server(process)
+    print(format_result(name, path, result))
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,280 @@
+"""
+Per request performance instrumentation.
+
+RequestTimingMiddleware measures every request: wall time, the number and
+duration of its database queries, and named sections timed with timed()
+(serialization, PDF rendering). The numbers are sent back in a Server-Timing
+header, added to in-process Prometheus metrics served by metrics_view, and
+queries slower than SLOW_QUERY_THRESHOLD_MS are logged with the line of
+project code that ran them.
+"""
+import contextlib
+import contextvars
+import logging
+import threading
+import time
+import traceback
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import Http404, HttpResponse
+from rest_framework.renderers import JSONRenderer
+
+logger = logging.getLogger(__name__)
+
+# Histogram buckets, in seconds
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+_current = contextvars.ContextVar('request_timing', default=None)
+
+
+class RequestTiming:
+  """What one request spent where. Section durations exclude the queries run inside them."""
+
+  def __init__(self):
+    self.started = time.perf_counter()
+    self.queries = 0
+    self.db_time = 0.0
+    self.slow_queries = 0
+    self.sections = {}
+    self.depth = 0
+
+  def execute(self, execute, sql, params, many, context):
+    """Time one query of the request."""
+    started = time.perf_counter()
+    try:
+      return execute(sql, params, many, context)
+    finally:
+      elapsed = time.perf_counter() - started
+      self.queries += 1
+      self.db_time += elapsed
+      if elapsed * 1000 >= settings.SLOW_QUERY_THRESHOLD_MS:
+        self.slow_queries += 1
+        log_slow_query(sql, elapsed)
+
+
+def _execute(execute, sql, params, many, context):
+  """Execute wrapper of every connection, handing queries to the current request's timing."""
+  timing = _current.get()
+  if timing is None:
+    return execute(sql, params, many, context)
+  return timing.execute(execute, sql, params, many, context)
+
+
+def watch(connection, **kwargs):
+  """
+  Install _execute on `connection` for good. Connections are per thread, and
+  under ASGI the ORM runs in sync_to_async's thread rather than the one
+  handling the request, so the wrapper is installed where each connection is
+  opened and finds the request through the context sync_to_async carries over.
+  """
+  if _execute not in connection.execute_wrappers:
+    # First, so that execute_wrapper() blocks open at the time pop their own
+    connection.execute_wrappers.insert(0, _execute)
+
+
+connection_created.connect(watch, dispatch_uid='core.instrumentation.watch')
+# Connections opened before this module was imported
+for _connection in connections.all(initialized_only=True):
+  watch(_connection)
+
+
+def query_origin():
+  """(file, line, function) of the innermost project frame on the stack, outside this module."""
+  base_dir = str(settings.BASE_DIR)
+  for frame in reversed(traceback.extract_stack()):
+    if frame.filename.startswith(base_dir) and frame.filename != __file__ and 'site-packages' not in frame.filename:
+      return frame.filename[len(base_dir) + 1:], frame.lineno, frame.name
+  return None
+
+
+def log_slow_query(sql, elapsed):
+  origin = query_origin()
+  where = f'{origin[0]}:{origin[1]} in {origin[2]}' if origin else 'outside the project'
+  # The parameters are left out, they may hold personal data
+  logger.warning('Slow query (%.1f ms) from %s: %s', elapsed * 1000, where, sql)
+
+
+@contextlib.contextmanager
+def timed(name):
+  """
+  Add the time spent in the block, minus its queries, to section `name` of
+  the current request. Nested sections are counted once, by the outermost.
+  Does nothing outside a request.
+  """
+  timing = _current.get()
+  if timing is None or timing.depth:
+    yield
+    return
+  timing.depth += 1
+  started, db_time = time.perf_counter(), timing.db_time
+  try:
+    yield
+  finally:
+    timing.depth -= 1
+    elapsed = time.perf_counter() - started - (timing.db_time - db_time)
+    timing.sections[name] = timing.sections.get(name, 0.0) + elapsed
+
+
+class TimedJSONRenderer(JSONRenderer):
+  """JSONRenderer that times the encoding as part of the serialize section."""
+
+  def render(self, data, accepted_media_type=None, renderer_context=None):
+    with timed('serialize'):
+      return super().render(data, accepted_media_type, renderer_context)
+
+
+class MetricsRegistry:
+  """Prometheus counters and histograms, kept in this process and labelled by view."""
+
+  def __init__(self):
+    self.lock = threading.Lock()
+    self.counters = {}
+    self.histograms = {}
+
+  def increment(self, name, labels, value=1):
+    key = (name, tuple(sorted(labels.items())))
+    with self.lock:
+      self.counters[key] = self.counters.get(key, 0) + value
+
+  def observe(self, name, labels, value, buckets):
+    key = (name, tuple(sorted(labels.items())))
+    with self.lock:
+      histogram = self.histograms.get(key)
+      if histogram is None:
+        histogram = self.histograms[key] = {'buckets': buckets, 'counts': [0] * len(buckets), 'sum': 0.0, 'count': 0}
+      for i, bound in enumerate(buckets):
+        if value <= bound:
+          histogram['counts'][i] += 1
+      histogram['sum'] += value
+      histogram['count'] += 1
+
+  def clear(self):
+    with self.lock:
+      self.counters.clear()
+      self.histograms.clear()
+
+  def render(self):
+    """Everything in the Prometheus text exposition format."""
+    lines = []
+    with self.lock:
+      for name, kind, help_text in METRICS:
+        if kind == 'counter':
+          samples = sorted((labels, value) for (metric, labels), value in self.counters.items() if metric == name)
+        else:
+          samples = sorted((labels, value) for (metric, labels), value in self.histograms.items() if metric == name)
+        if not samples:
+          continue
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+        for labels, value in samples:
+          if kind == 'counter':
+            lines.append(f'{name}{_format_labels(labels)} {value}')
+            continue
+          for bound, count in zip(value['buckets'], value['counts']):
+            lines.append(f'{name}_bucket{_format_labels(labels + (("le", str(bound)),))} {count}')
+          lines.append(f'{name}_bucket{_format_labels(labels + (("le", "+Inf"),))} {value["count"]}')
+          lines.append(f'{name}_sum{_format_labels(labels)} {value["sum"]:.6f}')
+          lines.append(f'{name}_count{_format_labels(labels)} {value["count"]}')
+    return '\n'.join(lines) + '\n'
+
+
+def _format_labels(labels):
+  escaped = (
+    (name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')) for name, value in labels
+  )
+  return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+
+METRICS = [
+  ('rentwise_requests_total', 'counter', 'Requests served, by view, method and status code.'),
+  ('rentwise_db_queries_total', 'counter', 'Database queries run by requests.'),
+  ('rentwise_slow_queries_total', 'counter', 'Queries slower than SLOW_QUERY_THRESHOLD_MS.'),
+  ('rentwise_request_duration_seconds', 'histogram', 'Wall time of requests until the response is returned.'),
+  ('rentwise_db_duration_seconds', 'histogram', 'Time requests spent waiting on database queries.'),
+  ('rentwise_request_queries', 'histogram', 'Database queries per request.'),
+  ('rentwise_serialize_duration_seconds', 'histogram', 'Time requests spent serializing and rendering data.'),
+  ('rentwise_pdf_duration_seconds', 'histogram', 'Time requests spent queueing contract PDFs.'),
+]
+
+registry = MetricsRegistry()
+
+
+def view_name(request):
+  """The URL name of the matched route, its pattern if unnamed, or 'unmatched'."""
+  match = getattr(request, 'resolver_match', None)
+  if match is None:
+    return 'unmatched'
+  if match.url_name:
+    return ':'.join(match.namespaces + [match.url_name])
+  return match.route
+
+
+@contextlib.contextmanager
+def instrument(timing):
+  """Make `timing` the current request's, fed every query run meanwhile in its context."""
+  token = _current.set(timing)
+  try:
+    yield
+  finally:
+    _current.reset(token)
+
+
+class RequestTimingMiddleware:
+  """
+  Time each request and report it in a Server-Timing header and the metrics.
+
+  Queries are counted with an execute_wrapper on every database connection,
+  so they are attributed to the request whichever code runs them, in
+  sync_to_async's thread too. Works for sync and async views; streamed
+  bodies are not included in the timings.
+  """
+  sync_capable = True
+  async_capable = True
+
+  def __init__(self, get_response):
+    self.get_response = get_response
+    if iscoroutinefunction(get_response):
+      markcoroutinefunction(self)
+
+  def __call__(self, request):
+    if iscoroutinefunction(self):
+      return self.__acall__(request)
+    timing = RequestTiming()
+    with instrument(timing):
+      response = self.get_response(request)
+    return self.finish(request, response, timing)
+
+  async def __acall__(self, request):
+    timing = RequestTiming()
+    with instrument(timing):
+      response = await self.get_response(request)
+    return self.finish(request, response, timing)
+
+  def finish(self, request, response, timing):
+    total = time.perf_counter() - timing.started
+    entries = [f'db;dur={timing.db_time * 1000:.1f};desc="{timing.queries} queries"']
+    entries += [f'{name};dur={elapsed * 1000:.1f}' for name, elapsed in sorted(timing.sections.items())]
+    entries.append(f'total;dur={total * 1000:.1f}')
+    response['Server-Timing'] = ', '.join(entries)
+
+    view = view_name(request)
+    registry.increment('rentwise_requests_total', {'view': view, 'method': request.method, 'status': response.status_code})
+    registry.increment('rentwise_db_queries_total', {'view': view}, timing.queries)
+    if timing.slow_queries:
+      registry.increment('rentwise_slow_queries_total', {'view': view}, timing.slow_queries)
+    registry.observe('rentwise_request_duration_seconds', {'view': view}, total, DURATION_BUCKETS)
+    registry.observe('rentwise_db_duration_seconds', {'view': view}, timing.db_time, DURATION_BUCKETS)
+    registry.observe('rentwise_request_queries', {'view': view}, timing.queries, QUERY_COUNT_BUCKETS)
+    for name in ('serialize', 'pdf'):
+      if name in timing.sections:
+        registry.observe(f'rentwise_{name}_duration_seconds', {'view': view}, timing.sections[name], DURATION_BUCKETS)
+    return response
+
+
+def metrics_view(request):
+  """The metrics in Prometheus text format, for clients in METRICS_ALLOWED_IPS only."""
+  if request.META.get('REMOTE_ADDR') not in settings.METRICS_ALLOWED_IPS:
+    raise Http404
+  return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -42,6 +42,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'users',
     'properties',
     'rest_framework',
@@ -52,6 +53,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so its timings cover all the other middleware
+    'core.instrumentation.RequestTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -60,6 +63,8 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
+    # Lets audit entries written during the request record its user
+    'properties.audit.AuditMiddleware',
 ]
 
 ROOT_URLCONF = 'core.urls'
@@ -139,6 +144,52 @@ STATIC_URL = 'static/'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Local memory is per process; point CACHE_BACKEND at the file based cache
+# (django.core.cache.backends.filebased.FileBasedCache) when running several
+# workers so invalidations reach all of them.
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'rentwise'),
+    }
+}
+
+# Seconds a cached list response is kept; writes invalidate it earlier
+RESPONSE_CACHE_TIMEOUT = int(os.getenv('RESPONSE_CACHE_TIMEOUT', '300'))
+
+
+# Lease contract PDFs
+# Rendered by a pool of worker processes and cached on disk
+
+CONTRACT_PDF_ROOT = os.getenv('CONTRACT_PDF_ROOT', str(BASE_DIR / 'media' / 'contracts'))
+CONTRACT_PDF_WORKERS = int(os.getenv('CONTRACT_PDF_WORKERS', '2'))
+# Retry-After, in seconds, of the 202 Accepted answered while a PDF is rendered
+CONTRACT_PDF_RETRY_AFTER = int(os.getenv('CONTRACT_PDF_RETRY_AFTER', '2'))
+
+
+# Request instrumentation (core.instrumentation)
+# Server-Timing headers on every response, Prometheus metrics at /metrics/
+# for the listed client addresses, and a warning for each slow query.
+# Metrics are kept per process: scrape every worker, or run a single one.
+
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv('SLOW_QUERY_THRESHOLD_MS', '200'))
+METRICS_ALLOWED_IPS = [ip.strip() for ip in os.getenv('METRICS_ALLOWED_IPS', '127.0.0.1,::1').split(',') if ip.strip()]
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'core.instrumentation': {'handlers': ['console'], 'level': 'WARNING', 'propagate': False},
+    },
+}
+
+
 # Auth user model
 AUTH_USER_MODEL = 'users.CustomUser'
 
@@ -150,10 +201,18 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ),
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.CachedJWTAuthentication',
+    ),
+    'DEFAULT_RENDERER_CLASSES': (
+        'core.instrumentation.TimedJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
     ),
 }
 
+# Seconds an authenticated user is served from the cache on read requests;
+# saving or deleting the user drops it earlier
+AUTH_USER_CACHE_TIMEOUT = int(os.getenv('AUTH_USER_CACHE_TIMEOUT', '60'))
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
     'SLIDING_TOKEN_REFRESH_LIFETIME': timedelta(days=1),
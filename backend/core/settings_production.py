@@ -0,0 +1,37 @@
+"""
+Production settings: core.settings plus what a multi-worker deployment needs.
+
+Select with DJANGO_SETTINGS_MODULE=core.settings_production (the Docker image
+does) and serve with gunicorn -c gunicorn.conf.py.
+"""
+
+from .settings import *  # noqa: F401,F403
+
+DEBUG = os.getenv("DEBUG", "False") == "True"
+
+ALLOWED_HOSTS = [host.strip() for host in os.getenv("ALLOWED_HOSTS", "localhost,127.0.0.1").split(",") if host.strip()]
+
+
+# Database
+# Keep connections open between requests instead of paying the PostgreSQL
+# connect and auth round trip on each one, and check a reused connection is
+# still alive before the request runs on it. psycopg2 has no built-in pool in
+# Django, so each worker thread holds one persistent connection: size
+# max_connections for GUNICORN_WORKERS * GUNICORN_THREADS per instance.
+# Persistent connections only pay off with threads that outlive the request,
+# set DB_CONN_MAX_AGE=0 when serving with the ASGI worker.
+
+DATABASES['default']['CONN_MAX_AGE'] = int(os.getenv('DB_CONN_MAX_AGE', '600'))
+DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+
+
+# Cache
+# Local memory is per worker process; the file based cache is shared by all
+# workers on a host, so a write in one of them invalidates cached lists in all.
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', str(BASE_DIR / 'media' / 'cache')),
+    }
+}
@@ -0,0 +1,38 @@
+"""
+Production server entry point: gunicorn -c gunicorn.conf.py
+
+Tunable through the environment:
+  GUNICORN_BIND        address to listen on (default 0.0.0.0:8000)
+  GUNICORN_WORKERS     worker processes (default 2 * CPUs + 1)
+  GUNICORN_THREADS     threads per worker for WSGI (default 4)
+  GUNICORN_TIMEOUT     seconds before a stuck worker is restarted (default 60)
+  SERVER_INTERFACE     wsgi (default) or asgi, which runs core.asgi in uvicorn
+                       workers for the async endpoints
+"""
+import multiprocessing
+import os
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings_production')
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.getenv('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '60'))
+graceful_timeout = 30
+keepalive = 5
+
+# Recycle workers now and then so a slow leak cannot grow without bound;
+# the jitter keeps them from all restarting at once
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '5000'))
+max_requests_jitter = max_requests // 10
+
+if os.getenv('SERVER_INTERFACE', 'wsgi') == 'asgi':
+  wsgi_app = 'core.asgi:application'
+  worker_class = 'uvicorn_worker.UvicornWorker'
+else:
+  wsgi_app = 'core.wsgi:application'
+  worker_class = 'gthread'
+  threads = int(os.getenv('GUNICORN_THREADS', '4'))
+
+# Set GUNICORN_ACCESS_LOG= (empty) to turn the access log off
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-') or None
+errorlog = '-'
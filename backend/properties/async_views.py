@@ -0,0 +1,117 @@
+import functools
+from asgiref.sync import sync_to_async
+from django.db.models import Prefetch
+from django.http import JsonResponse
+from rest_framework.exceptions import APIException, NotAuthenticated, NotFound
+from users.authentication import CachedJWTAuthentication
+from .models import Payment, Property, Lease
+from .serializers import PaymentSerializer, PropertySerializer, LeaseSerializer, LeaseDetailSerializer
+from .filters import PropertyFilterSerializer, LeaseFilterSerializer, PaymentFilterSerializer, DashboardFilterSerializer
+from .pagination import OwnerCursorPagination
+from .dashboard import owner_summary
+
+# Async counterparts of the read endpoints in views.py. DRF's APIView is sync
+# only, so these are plain Django async views that reuse the filters,
+# serializers and pagination. They do not avoid threads: the async ORM
+# (afirst, aiterator) and cache.aget() wrap the sync code in sync_to_async,
+# which runs it on one shared thread per process. The event loop stays free
+# while a query runs, but the JWT checks and queries of concurrent requests
+# take turns on that thread.
+
+
+async def authenticate(request):
+  """CachedJWTAuthentication for async views, sharing its cache with the sync ones."""
+  jwt = CachedJWTAuthentication()
+  header = jwt.get_header(request)
+  raw_token = jwt.get_raw_token(header) if header is not None else None
+  if raw_token is None:
+    raise NotAuthenticated()
+  return await jwt.aget_user(jwt.get_validated_token(raw_token))
+
+
+def async_api_view(view):
+  """Authenticate the request and turn APIExceptions into JSON error responses."""
+  @functools.wraps(view)
+  async def wrapper(request, *args, **kwargs):
+    if request.method != 'GET':
+      return JsonResponse({'detail': f'Method "{request.method}" not allowed.'}, status=405)
+    try:
+      request.user = await authenticate(request)
+      return await view(request, *args, **kwargs)
+    except APIException as e:
+      return JsonResponse(e.detail, status=e.status_code, safe=False)
+  return wrapper
+
+
+async def paginated_response(queryset, request, serializer_class):
+  paginator = OwnerCursorPagination()
+  page = await paginator.apaginate_queryset(queryset, request)
+  serializer = serializer_class(page, many=True)
+  return JsonResponse(paginator.get_async_paginated_data(serializer.data))
+
+
+def filter_errors(filters):
+  return JsonResponse(filters.errors, status=400)
+
+
+@async_api_view
+async def property_list(request):
+  filters = PropertyFilterSerializer(data=request.GET.dict())
+  if not filters.is_valid():
+    return filter_errors(filters)
+  properties = filters.filter_queryset(Property.objects.filter(owner=request.user))
+  return await paginated_response(properties, request, PropertySerializer)
+
+
+@async_api_view
+async def property_detail(request, id):
+  property = await Property.objects.filter(owner=request.user, id=id).afirst()
+  if property is None:
+    raise NotFound()
+  return JsonResponse(PropertySerializer(property).data)
+
+
+@async_api_view
+async def lease_list(request):
+  filters = LeaseFilterSerializer(data=request.GET.dict())
+  if not filters.is_valid():
+    return filter_errors(filters)
+  leases = filters.filter_queryset(Lease.objects.filter(property__owner=request.user))
+  return await paginated_response(leases, request, LeaseSerializer)
+
+
+@async_api_view
+async def lease_detail(request, id):
+  lease = await Lease.objects.select_related('property').defer('property__search_vector').prefetch_related(
+    Prefetch('payments', queryset=Payment.objects.with_live_status())
+  ).filter(property__owner=request.user, id=id).afirst()
+  if lease is None:
+    raise NotFound()
+  return JsonResponse(LeaseDetailSerializer(lease).data)
+
+
+@async_api_view
+async def payment_list(request):
+  filters = PaymentFilterSerializer(data=request.GET.dict())
+  if not filters.is_valid():
+    return filter_errors(filters)
+  payments = filters.filter_queryset(Payment.objects.with_live_status().filter(lease__property__owner=request.user))
+  return await paginated_response(payments, request, PaymentSerializer)
+
+
+@async_api_view
+async def payment_detail(request, id):
+  payment = await Payment.objects.with_live_status().filter(lease__property__owner=request.user, id=id).afirst()
+  if payment is None:
+    raise NotFound()
+  return JsonResponse(PaymentSerializer(payment).data)
+
+
+@async_api_view
+async def dashboard_summary(request):
+  filters = DashboardFilterSerializer(data=request.GET.dict())
+  if not filters.is_valid():
+    return filter_errors(filters)
+  # owner_summary runs its two aggregate queries back to back on one thread hop
+  summary = await sync_to_async(owner_summary)(request.user, months=filters.validated_data['months'])
+  return JsonResponse(summary)
@@ -0,0 +1,97 @@
+import contextvars
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.utils import timezone
+from .models import Lease, Payment, AuditEntry
+
+# Fields whose changes are recorded, by model
+AUDITED_FIELDS = {
+  Lease: ['tenant', 'property', 'start_date', 'end_date', 'rate_amount', 'active_lease'],
+  Payment: ['lease', 'amount', 'due_date', 'payment_date', 'is_paid'],
+}
+
+# The request being handled, set by AuditMiddleware so entries get its user
+_request = contextvars.ContextVar('audit_request', default=None)
+
+
+def snapshot(instance):
+  """The audited field values of a Lease or Payment, by field name (ids for relations)."""
+  fields = AUDITED_FIELDS.get(type(instance), [])
+  return {name: getattr(instance, instance._meta.get_field(name).attname) for name in fields}
+
+
+def change(action, instance, before=None):
+  """
+  An unsaved AuditEntry for `action` on `instance`, or None if the model is
+  not audited or an update changed nothing. `before` is the snapshot taken
+  before an update or delete; call this before delete() clears the pk.
+  """
+  if type(instance) not in AUDITED_FIELDS:
+    return None
+  before = before or {}
+  after = snapshot(instance) if action != 'delete' else {}
+  changes = {
+    name: [before.get(name), after.get(name)]
+    for name in AUDITED_FIELDS[type(instance)]
+    if before.get(name) != after.get(name)
+  }
+  if not changes and action == 'update':
+    return None
+  return AuditEntry(
+    model=instance._meta.model_name,
+    object_id=instance.pk,
+    lease_id=instance.pk if isinstance(instance, Lease) else instance.lease_id,
+    action=action,
+    changes=changes,
+  )
+
+
+def record(entries):
+  """
+  Insert audit entries with one bulk_create, stamped with the current time
+  and the user of the current request. Call it inside the atomic block that
+  makes the recorded changes, so the entries commit or roll back with them.
+  """
+  entries = [entry for entry in entries if entry is not None]
+  if not entries:
+    return []
+  now = timezone.now()
+  request = _request.get()
+  user = request_user(request) if request is not None else None
+  for entry in entries:
+    entry.created_at = now
+    entry.month = timezone.localdate(now).replace(day=1)
+    if entry.user_id is None and user is not None:
+      entry.user = user
+  return AuditEntry.objects.bulk_create(entries, batch_size=1000)
+
+
+class AuditMiddleware:
+  """Make the current request available to record(), which attributes entries to its user."""
+  sync_capable = True
+  async_capable = True
+
+  def __init__(self, get_response):
+    self.get_response = get_response
+    if iscoroutinefunction(get_response):
+      markcoroutinefunction(self)
+
+  def __call__(self, request):
+    if iscoroutinefunction(self):
+      return self.__acall__(request)
+    token = _request.set(request)
+    try:
+      return self.get_response(request)
+    finally:
+      _request.reset(token)
+
+  async def __acall__(self, request):
+    token = _request.set(request)
+    try:
+      return await self.get_response(request)
+    finally:
+      _request.reset(token)
+
+
+def request_user(request):
+  user = getattr(request, 'user', None)
+  return user if user is not None and user.is_authenticated else None
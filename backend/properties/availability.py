@@ -0,0 +1,101 @@
+import calendar
+import datetime
+import itertools
+from operator import itemgetter
+from django.contrib.postgres.expressions import ArraySubquery
+from django.db.backends.postgresql.psycopg_any import DateRange
+from django.db.models import OuterRef
+from .models import Property, Lease, lease_period
+
+ONE_DAY = datetime.timedelta(days=1)
+
+# Rows fetched per round trip when walking an owner's leases
+CALENDAR_CHUNK_SIZE = 2000
+
+
+def overlapping_leases(start_date, end_date):
+  """
+  Active leases booked on any day of [start_date, end_date].
+
+  Written with the same daterange expression as the lease_active_no_overlap
+  constraint, so the lookup is served by the constraint's GiST index.
+  """
+  return Lease.objects.filter(active_lease=True).alias(period=lease_period()).filter(
+    period__overlap=DateRange(start_date, end_date, '[]')
+  )
+
+
+def with_conflicting_leases(properties, start_date, end_date, exclude_lease=None):
+  """
+  Annotate `properties` with `conflicting_leases`, the ids of the active
+  leases overlapping the window, in the same query.
+
+  `exclude_lease` leaves out one lease, to check whether an existing lease
+  could be moved to new dates.
+  """
+  leases = overlapping_leases(start_date, end_date).filter(property=OuterRef('pk'))
+  if exclude_lease is not None:
+    leases = leases.exclude(pk=exclude_lease)
+  return properties.annotate(conflicting_leases=ArraySubquery(leases.order_by('start_date').values('pk')))
+
+
+def add_months(date, months):
+  """The same day `months` later, clamped to the end of shorter months."""
+  month = date.month - 1 + months
+  year, month = date.year + month // 12, month % 12 + 1
+  return datetime.date(year, month, min(date.day, calendar.monthrange(year, month)[1]))
+
+
+def merge_periods(periods, start_date, end_date):
+  """
+  Clip (start, end) periods sorted by start to [start_date, end_date] and
+  merge the ones that overlap or touch. Returns (occupied, free) as lists of
+  inclusive (start, end) pairs that together cover the window.
+  """
+  occupied = []
+  for start, end in periods:
+    start, end = max(start, start_date), min(end, end_date)
+    if occupied and start <= occupied[-1][1] + ONE_DAY:
+      if end > occupied[-1][1]:
+        occupied[-1] = (occupied[-1][0], end)
+    else:
+      occupied.append((start, end))
+
+  free, day = [], start_date
+  for start, end in occupied:
+    if start > day:
+      free.append((day, start - ONE_DAY))
+    day = end + ONE_DAY
+  if day <= end_date:
+    free.append((day, end_date))
+  return occupied, free
+
+
+def portfolio_calendar(owner, start_date, end_date):
+  """
+  Yield the occupied and free intervals of every property of `owner` over
+  [start_date, end_date], in property id order.
+
+  Two queries whatever the portfolio size: the properties, and the active
+  leases overlapping the window sorted by property and start date. Both are
+  streamed and walked side by side, so each lease is looked at once.
+  """
+  properties = Property.objects.filter(owner=owner).order_by('id').values_list('id', 'address')
+  leases = overlapping_leases(start_date, end_date).filter(property__owner=owner).order_by(
+    'property_id', 'start_date'
+  ).values_list('property_id', 'start_date', 'end_date')
+
+  groups = itertools.groupby(leases.iterator(chunk_size=CALENDAR_CHUNK_SIZE), key=itemgetter(0))
+  group = next(groups, None)
+  for property_id, address in properties.iterator(chunk_size=CALENDAR_CHUNK_SIZE):
+    periods = []
+    if group is not None and group[0] == property_id:
+      periods = [(start, end) for _, start, end in group[1]]
+      group = next(groups, None)
+    occupied, free = merge_periods(periods, start_date, end_date)
+    yield {
+      'property': property_id,
+      'address': address,
+      'occupied': [{'start': start.isoformat(), 'end': end.isoformat()} for start, end in occupied],
+      'free': [{'start': start.isoformat(), 'end': end.isoformat()} for start, end in free],
+    }
@@ -0,0 +1,113 @@
+from django.db import transaction
+from rest_framework import serializers
+from . import audit
+
+# Upper bound on operations accepted in one batch request
+MAX_BATCH_OPERATIONS = 5000
+
+
+class BatchOperationSerializer(serializers.Serializer):
+  op = serializers.ChoiceField(choices=['create', 'update', 'delete'])
+  id = serializers.IntegerField(required=False)
+  data = serializers.DictField(required=False)
+
+  def validate(self, attrs):
+    if attrs['op'] in ('update', 'delete') and 'id' not in attrs:
+      raise serializers.ValidationError({'id': 'This field is required.'})
+    if attrs['op'] in ('create', 'update') and 'data' not in attrs:
+      raise serializers.ValidationError({'data': 'This field is required.'})
+    return attrs
+
+
+class BatchError(Exception):
+  """Raised with one error entry per operation ({} for operations that were fine)."""
+
+  def __init__(self, errors):
+    super().__init__(errors)
+    self.errors = errors
+
+
+def apply_batch(operations, serializer_class, queryset, related=None, after_write=None, before_delete=None):
+  """
+  Validate and apply a list of create/update/delete operations at once.
+
+  `queryset` limits which rows may be updated or deleted and is loaded with
+  one in_bulk() query. All create/update payloads are validated together with
+  `serializer_class(many=True)`; `related` maps relation field names to the
+  querysets their primary keys may point to. Everything is then written with
+  bulk_create, bulk_update and a single DELETE inside one transaction.
+  `after_write`, if given, is called inside that transaction with the
+  created and updated instances, `before_delete` with the ids about to be
+  deleted.
+
+  Returns one result per operation. Raises BatchError if any operation is
+  invalid, in which case nothing is written.
+  """
+  model = queryset.model
+  errors = [{} for _ in operations]
+
+  targets = queryset.in_bulk({op['id'] for op in operations if 'id' in op})
+  seen = set()
+  for i, op in enumerate(operations):
+    if op['op'] == 'create':
+      continue
+    if op['id'] not in targets:
+      errors[i] = {'id': 'Not found.'}
+    elif op['id'] in seen:
+      errors[i] = {'id': 'Only one operation per id is allowed.'}
+    seen.add(op['id'])
+
+  writes = [i for i, op in enumerate(operations) if op['op'] != 'delete']
+  serializer = serializer_class(data=[operations[i]['data'] for i in writes], many=True)
+  for name, related_queryset in (related or {}).items():
+    serializer.child.fields[name].queryset = related_queryset
+  if not serializer.is_valid():
+    for i, item_errors in zip(writes, serializer.errors):
+      errors[i] = {**errors[i], **item_errors}
+  if any(errors):
+    raise BatchError(errors)
+
+  instances, before = {}, {}
+  created, updated, update_fields = [], [], set()
+  for i, attrs in zip(writes, serializer.validated_data):
+    op = operations[i]
+    if op['op'] == 'create':
+      instance = model(**attrs)
+      created.append(instance)
+    else:
+      instance = targets[op['id']]
+      before[i] = audit.snapshot(instance)
+      for name, value in attrs.items():
+        setattr(instance, name, value)
+      update_fields.update(attrs)
+      updated.append(instance)
+    instances[i] = instance
+  deleted = [op['id'] for op in operations if op['op'] == 'delete']
+  deleted_entries = [audit.change('delete', targets[pk], audit.snapshot(targets[pk])) for pk in deleted]
+
+  with transaction.atomic():
+    model.objects.bulk_create(created, batch_size=500)
+    if updated:
+      model.objects.bulk_update(updated, sorted(update_fields), batch_size=500)
+    if deleted:
+      if before_delete:
+        before_delete(deleted)
+      model.objects.filter(pk__in=deleted).delete()
+    if after_write:
+      after_write(created + updated)
+    audit.record([
+      audit.change(op['op'], instances[i], before.get(i)) for i, op in enumerate(operations) if op['op'] != 'delete'
+    ] + deleted_entries)
+
+  results = []
+  for i, op in enumerate(operations):
+    if op['op'] == 'delete':
+      results.append({'op': 'delete', 'id': op['id'], 'status': 204})
+    else:
+      results.append({
+        'op': op['op'],
+        'id': instances[i].pk,
+        'status': 201 if op['op'] == 'create' else 200,
+        'data': serializer_class(instances[i]).data,
+      })
+  return results
@@ -0,0 +1,80 @@
+import datetime
+import functools
+import hashlib
+import uuid
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import parse_etags
+from rest_framework.response import Response
+
+# Cached list responses are keyed by a per-owner version token (plus a global
+# one for bulk jobs touching every owner). Writes replace the token instead of
+# deleting keys, which makes every older entry for that owner unreachable.
+
+GLOBAL_VERSION_KEY = 'properties:version'
+
+
+def _owner_version_key(owner_id):
+  return f'properties:owner:{owner_id}:version'
+
+
+def _version(key):
+  version = cache.get(key)
+  if version is None:
+    cache.add(key, uuid.uuid4().hex, None)
+    version = cache.get(key)
+  return version
+
+
+def invalidate_owner(owner_id):
+  if owner_id is not None:
+    cache.set(_owner_version_key(owner_id), uuid.uuid4().hex, None)
+
+
+def invalidate_all():
+  cache.set(GLOBAL_VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def response_cache_key(request):
+  """Cache key for a GET by the current user, also used (hashed) as its ETag."""
+  parts = [
+    request.get_host(),
+    request.path,
+    sorted(request.query_params.lists()),
+    request.user.pk,
+    _version(_owner_version_key(request.user.pk)),
+    _version(GLOBAL_VERSION_KEY),
+    # Payment status and dashboard totals depend on the date
+    datetime.date.today().isoformat(),
+  ]
+  return 'properties:response:' + hashlib.sha1(repr(parts).encode()).hexdigest()
+
+
+def cache_owner_response(view_method):
+  """
+  Cache successful responses of an APIView ``get`` per owner and query string.
+
+  Clients sending back the ETag in If-None-Match get a 304 before the view,
+  the cache or the serializers are touched.
+  """
+  @functools.wraps(view_method)
+  def wrapper(self, request, *args, **kwargs):
+    key = response_cache_key(request)
+    etag = f'"{key.rsplit(":", 1)[1]}"'
+    # private, no-cache: browsers keep the body and revalidate it with the ETag
+    headers = {'ETag': etag, 'Cache-Control': 'private, no-cache'}
+    if etag in parse_etags(request.headers.get('If-None-Match', '')):
+      return Response(status=304, headers=headers)
+
+    data = cache.get(key)
+    if data is not None:
+      response = Response(data, status=200)
+    else:
+      response = view_method(self, request, *args, **kwargs)
+      if response.status_code != 200:
+        return response
+      cache.set(key, response.data, settings.RESPONSE_CACHE_TIMEOUT)
+    for name, value in headers.items():
+      response[name] = value
+    return response
+  return wrapper
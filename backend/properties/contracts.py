@@ -0,0 +1,151 @@
+import datetime
+import hashlib
+import multiprocessing
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from django.conf import settings
+from django.template.loader import get_template
+from .pdf_worker import write_pdf
+
+CONTRACT_TEMPLATE = 'properties/contract_template.html'
+
+_executor = None
+_lock = threading.Lock()
+_pending = {}
+
+
+def contract_fingerprint(lease):
+  """
+  Hash of everything the contract template reads from the lease, its property
+  and tenant, plus the template source itself. The contract is dated on the
+  day it is generated, which is not part of the hash.
+  """
+  prop, tenant = lease.property, lease.tenant
+  values = [
+    get_template(CONTRACT_TEMPLATE).template.source,
+    lease.pk, lease.start_date, lease.end_date, lease.rate_amount,
+    prop.address, prop.area, prop.property_type,
+    tenant.email, tenant.first_name, tenant.last_name,
+  ]
+  return hashlib.sha256(repr(values).encode()).hexdigest()[:32]
+
+
+def contract_path(lease):
+  return Path(settings.CONTRACT_PDF_ROOT) / f'lease-{lease.pk}-{contract_fingerprint(lease)}.pdf'
+
+
+def render_contract_html(lease):
+  return get_template(CONTRACT_TEMPLATE).render({
+    'lease': lease,
+    'today': datetime.date.today(),
+  })
+
+
+def get_executor():
+  """Process pool shared by all contract rendering, created on first use."""
+  global _executor
+  with _lock:
+    if _executor is None:
+      # spawn, not fork: forking a threaded server process is unsafe
+      _executor = ProcessPoolExecutor(
+        max_workers=settings.CONTRACT_PDF_WORKERS,
+        mp_context=multiprocessing.get_context('spawn'),
+      )
+    return _executor
+
+
+def submit_contract(lease, path=None):
+  """
+  Queue rendering of the lease contract to its cache file and return the
+  Future. A request for a contract already being rendered shares its Future.
+  A failed rendering is handed to the next caller once, and queued again
+  after that.
+  """
+  path = path or contract_path(lease)
+  executor = get_executor()
+  # One lock over the lookup and the insert, so concurrent misses render once
+  with _lock:
+    future = _pending.get(path)
+    if future is not None:
+      if future.done():
+        del _pending[path]
+      return future
+    stale_pattern = str(path.with_name(f'lease-{lease.pk}-*.pdf'))
+    future = executor.submit(write_pdf, render_contract_html(lease), str(path), stale_pattern)
+    _pending[path] = future
+  future.add_done_callback(lambda done: _forget(path, done))
+  return future
+
+
+def _forget(path, future):
+  # Failures stay until a caller has seen them
+  if future.exception() is None:
+    with _lock:
+      if _pending.get(path) is future:
+        del _pending[path]
+
+
+class _ZipStream:
+  """Write-only, unseekable sink for ZipFile; collected bytes are drained with pop()."""
+
+  def __init__(self):
+    self.chunks = []
+
+  def write(self, data):
+    self.chunks.append(bytes(data))
+    return len(data)
+
+  def flush(self):
+    pass
+
+  def pop(self):
+    data = b''.join(self.chunks)
+    self.chunks.clear()
+    return data
+
+
+def stream_contracts_zip(leases):
+  """
+  Return a generator yielding a zip archive of the leases' contract PDFs.
+
+  Missing PDFs are queued on the worker pool right away, before the first
+  byte is produced. Cached files go into the archive first, the rest in the
+  order they finish rendering, so only one PDF is held in memory at a time.
+  Contracts that fail to render are listed in errors.txt.
+  """
+  cached, jobs = [], {}
+  for lease in leases:
+    path = contract_path(lease)
+    if path.exists():
+      cached.append((lease, path))
+    else:
+      jobs[submit_contract(lease, path)] = (lease, path)
+
+  def generate():
+    stream = _ZipStream()
+    failed = []
+    with zipfile.ZipFile(stream, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+      def add(lease, path):
+        try:
+          archive.write(path, arcname=f'lease-{lease.pk}.pdf')
+        except FileNotFoundError:
+          # Replaced by a newer version of the contract in the meantime
+          failed.append(lease.pk)
+
+      for lease, path in cached:
+        add(lease, path)
+        yield stream.pop()
+      for future in as_completed(jobs):
+        lease, path = jobs[future]
+        if future.exception() is not None:
+          failed.append(lease.pk)
+          continue
+        add(lease, path)
+        yield stream.pop()
+      if failed:
+        archive.writestr('errors.txt', ''.join(f'lease {pk}: contract could not be generated\n' for pk in failed))
+    yield stream.pop()
+
+  return generate()
@@ -0,0 +1,57 @@
+import datetime
+from decimal import Decimal
+from django.db.models import Count, Q, Sum
+from .availability import add_months
+from .models import Property, Payment
+
+
+def _amount(value):
+  return str(value if value is not None else Decimal('0.00'))
+
+
+def owner_summary(owner, months=12, today=None):
+  """
+  Portfolio totals for one owner, computed by two aggregate queries (one over
+  the properties, one over the payments) so the response size and cost do not
+  depend on how many rows the owner has.
+
+  `monthly` covers the last `months` calendar months up to the current one:
+  `expected` sums payments due in the month, `collected` the paid ones.
+  """
+  today = today or datetime.date.today()
+  month_starts = [add_months(today.replace(day=1), offset) for offset in range(1 - months, 1)]
+
+  properties = Property.objects.filter(owner=owner).aggregate(
+    total=Count('id'),
+    **{f'status_{value}': Count('id', filter=Q(status=value)) for value, _ in Property.STATUS_CHOICES},
+    **{f'type_{value}': Count('id', filter=Q(property_type=value)) for value, _ in Property.PROPERTY_CHOICES},
+  )
+
+  per_month = {}
+  for i, start in enumerate(month_starts):
+    due = Q(due_date__gte=start, due_date__lt=add_months(start, 1))
+    per_month[f'expected_{i}'] = Sum('amount', filter=due)
+    per_month[f'collected_{i}'] = Sum('amount', filter=due & Q(is_paid=True))
+  overdue = Q(is_paid=False, due_date__lt=today)
+  payments = Payment.objects.filter(lease__property__owner=owner).aggregate(
+    overdue_count=Count('id', filter=overdue), overdue_amount=Sum('amount', filter=overdue), **per_month,
+  )
+
+  total = properties['total']
+  by_status = {value: properties[f'status_{value}'] for value, _ in Property.STATUS_CHOICES if properties[f'status_{value}']}
+  by_type = {value: properties[f'type_{value}'] for value, _ in Property.PROPERTY_CHOICES if properties[f'type_{value}']}
+  return {
+    'total_properties': total,
+    'occupancy_rate': round(by_status.get('rented', 0) / total, 4) if total else 0.0,
+    'by_status': by_status,
+    'by_property_type': by_type,
+    'monthly': [
+      {
+        'month': start.strftime('%Y-%m'),
+        'expected': _amount(payments[f'expected_{i}']),
+        'collected': _amount(payments[f'collected_{i}']),
+      }
+      for i, start in enumerate(month_starts)
+    ],
+    'overdue': {'count': payments['overdue_count'], 'amount': _amount(payments['overdue_amount'])},
+  }
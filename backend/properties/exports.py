@@ -0,0 +1,81 @@
+import csv
+import io
+import json
+from django.core.serializers.json import DjangoJSONEncoder
+from .filters import PropertyFilterSerializer, LeaseFilterSerializer, PaymentFilterSerializer
+from .models import Property, Lease, Payment
+
+# Rows are read through a server-side cursor in chunks of this size
+EXPORT_CHUNK_SIZE = 2000
+
+# Column name in the export -> lookup passed to values_list(). Names follow the
+# API serializers, so an export has the same shape as the list endpoints.
+EXPORTS = {
+  'properties': {
+    'queryset': lambda user: Property.objects.filter(owner=user),
+    'filters': PropertyFilterSerializer,
+    'columns': [
+      ('id', 'id'), ('address', 'address'), ('description', 'description'),
+      ('property_type', 'property_type'), ('status', 'status'), ('area', 'area'),
+      ('num_of_rooms', 'num_of_rooms'),
+    ],
+  },
+  'leases': {
+    'queryset': lambda user: Lease.objects.filter(property__owner=user),
+    'filters': LeaseFilterSerializer,
+    'columns': [
+      ('id', 'id'), ('tenant', 'tenant_id'), ('property', 'property_id'), ('start_date', 'start_date'),
+      ('end_date', 'end_date'), ('rate_amount', 'rate_amount'), ('active_lease', 'active_lease'),
+    ],
+  },
+  'payments': {
+    'queryset': lambda user: Payment.objects.with_live_status().filter(lease__property__owner=user),
+    'filters': PaymentFilterSerializer,
+    'columns': [
+      ('id', 'id'), ('lease', 'lease_id'), ('amount', 'amount'), ('due_date', 'due_date'),
+      ('payment_date', 'payment_date'), ('is_paid', 'is_paid'), ('status', 'live_status'),
+    ],
+  },
+}
+
+
+def export_rows(queryset, columns):
+  """Stream value tuples for `columns` in id order without building model instances."""
+  lookups = [lookup for _, lookup in columns]
+  return queryset.order_by('id').values_list(*lookups).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+
+def stream_csv(rows, columns):
+  buffer = io.StringIO()
+  writer = csv.writer(buffer)
+  writer.writerow([name for name, _ in columns])
+  # The header goes out on its own, before the query runs
+  yield buffer.getvalue()
+  buffer.seek(0)
+  buffer.truncate()
+  for count, row in enumerate(rows, 1):
+    writer.writerow(row)
+    if count % EXPORT_CHUNK_SIZE == 0:
+      yield buffer.getvalue()
+      buffer.seek(0)
+      buffer.truncate()
+  if buffer.tell():
+    yield buffer.getvalue()
+
+
+def stream_ndjson(rows, columns):
+  names = [name for name, _ in columns]
+  lines = []
+  for row in rows:
+    lines.append(json.dumps(dict(zip(names, row)), cls=DjangoJSONEncoder))
+    if len(lines) == EXPORT_CHUNK_SIZE:
+      yield '\n'.join(lines) + '\n'
+      lines = []
+  if lines:
+    yield '\n'.join(lines) + '\n'
+
+
+EXPORT_FORMATS = {
+  'csv': ('text/csv', stream_csv),
+  'ndjson': ('application/x-ndjson', stream_ndjson),
+}
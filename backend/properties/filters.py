@@ -0,0 +1,228 @@
+import datetime
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import Count, F
+from rest_framework import serializers
+from .models import SEARCH_CONFIG, Property, Payment, AuditEntry
+from .availability import add_months
+
+
+# Query param filters for the list endpoints. They are plain serializers so
+# invalid values come back as a regular 400 with field errors.
+# Pass ``request.query_params.dict()`` as data: with a QueryDict a missing
+# BooleanField would be read as False instead of "not given".
+
+class PropertyFilterSerializer(serializers.Serializer):
+  status = serializers.ChoiceField(choices=Property.STATUS_CHOICES, required=False)
+  property_type = serializers.ChoiceField(choices=Property.PROPERTY_CHOICES, required=False)
+
+  def filter_queryset(self, queryset):
+    data = self.validated_data
+    if 'status' in data:
+      queryset = queryset.filter(status=data['status'])
+    if 'property_type' in data:
+      queryset = queryset.filter(property_type=data['property_type'])
+    return queryset
+
+
+class PropertySearchSerializer(PropertyFilterSerializer):
+  # Web search syntax: "quoted phrases", or, -excluded
+  q = serializers.CharField(required=False, max_length=200)
+  area_min = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
+  area_max = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
+  rooms_min = serializers.IntegerField(min_value=1, required=False)
+  rooms_max = serializers.IntegerField(min_value=1, required=False)
+
+  def validate(self, attrs):
+    if 'area_min' in attrs and 'area_max' in attrs and attrs['area_min'] > attrs['area_max']:
+      raise serializers.ValidationError({'area_max': 'area_max cannot be below area_min.'})
+    if 'rooms_min' in attrs and 'rooms_max' in attrs and attrs['rooms_min'] > attrs['rooms_max']:
+      raise serializers.ValidationError({'rooms_max': 'rooms_max cannot be below rooms_min.'})
+    return attrs
+
+  def search_query(self):
+    return SearchQuery(self.validated_data['q'], search_type='websearch', config=SEARCH_CONFIG)
+
+  def search_queryset(self, queryset):
+    """The text search and range filters, everything but the facets."""
+    data = self.validated_data
+    if 'q' in data:
+      queryset = queryset.filter(search_vector=self.search_query())
+    if 'area_min' in data:
+      queryset = queryset.filter(area__gte=data['area_min'])
+    if 'area_max' in data:
+      queryset = queryset.filter(area__lte=data['area_max'])
+    if 'rooms_min' in data:
+      queryset = queryset.filter(num_of_rooms__gte=data['rooms_min'])
+    if 'rooms_max' in data:
+      queryset = queryset.filter(num_of_rooms__lte=data['rooms_max'])
+    return queryset
+
+  def filter_queryset(self, queryset):
+    queryset = super().filter_queryset(self.search_queryset(queryset))
+    if 'q' not in self.validated_data:
+      return queryset.order_by('-id')
+    return queryset.annotate(
+      rank=SearchRank(F('search_vector'), self.search_query())
+    ).order_by('-rank', '-id')
+
+  def facet_counts(self, queryset):
+    """
+    Return (matches, facets): the number of properties filter_queryset gives
+    and {'property_type': {value: count}, 'status': {value: count}}, both from
+    one query grouped by type and status.
+
+    Each facet is counted with the other facet's filter applied but not its
+    own, so it tells how many results picking another value would give.
+    """
+    data = self.validated_data
+    facets = {
+      'property_type': {value: 0 for value, _ in Property.PROPERTY_CHOICES},
+      'status': {value: 0 for value, _ in Property.STATUS_CHOICES},
+    }
+    matches = 0
+    rows = self.search_queryset(queryset).order_by().values('property_type', 'status').annotate(
+      count=Count('id')
+    ).values_list('property_type', 'status', 'count')
+    for property_type, status, count in rows:
+      type_matches = data.get('property_type', property_type) == property_type
+      status_matches = data.get('status', status) == status
+      if status_matches:
+        facets['property_type'][property_type] += count
+      if type_matches:
+        facets['status'][status] += count
+      if type_matches and status_matches:
+        matches += count
+    return matches, facets
+
+
+class LeaseFilterSerializer(serializers.Serializer):
+  # Comma separated lease ids, e.g. ?ids=4,8,15
+  ids = serializers.CharField(required=False)
+  property = serializers.IntegerField(required=False)
+  active_lease = serializers.BooleanField(required=False)
+  status = serializers.ChoiceField(choices=Property.STATUS_CHOICES, required=False)
+  property_type = serializers.ChoiceField(choices=Property.PROPERTY_CHOICES, required=False)
+  # Leases overlapping the [date_from, date_to] window
+  date_from = serializers.DateField(required=False)
+  date_to = serializers.DateField(required=False)
+
+  def validate_ids(self, value):
+    try:
+      return [int(pk) for pk in value.split(',') if pk.strip()]
+    except ValueError:
+      raise serializers.ValidationError('Expected a comma separated list of ids.')
+
+  def validate(self, attrs):
+    if 'date_from' in attrs and 'date_to' in attrs and attrs['date_from'] > attrs['date_to']:
+      raise serializers.ValidationError({'date_to': 'date_to cannot be before date_from.'})
+    return attrs
+
+  def filter_queryset(self, queryset):
+    data = self.validated_data
+    if 'ids' in data:
+      queryset = queryset.filter(pk__in=data['ids'])
+    if 'property' in data:
+      queryset = queryset.filter(property_id=data['property'])
+    if 'active_lease' in data:
+      queryset = queryset.filter(active_lease=data['active_lease'])
+    if 'status' in data:
+      queryset = queryset.filter(property__status=data['status'])
+    if 'property_type' in data:
+      queryset = queryset.filter(property__property_type=data['property_type'])
+    if 'date_from' in data:
+      queryset = queryset.filter(end_date__gte=data['date_from'])
+    if 'date_to' in data:
+      queryset = queryset.filter(start_date__lte=data['date_to'])
+    return queryset
+
+
+class PaymentFilterSerializer(serializers.Serializer):
+  lease = serializers.IntegerField(required=False)
+  is_paid = serializers.BooleanField(required=False)
+  status = serializers.ChoiceField(choices=Payment.STATUS_CHOICES, required=False)
+  due_from = serializers.DateField(required=False)
+  due_to = serializers.DateField(required=False)
+
+  def validate(self, attrs):
+    if 'due_from' in attrs and 'due_to' in attrs and attrs['due_from'] > attrs['due_to']:
+      raise serializers.ValidationError({'due_to': 'due_to cannot be before due_from.'})
+    return attrs
+
+  def filter_queryset(self, queryset):
+    data = self.validated_data
+    if 'lease' in data:
+      queryset = queryset.filter(lease_id=data['lease'])
+    if 'is_paid' in data:
+      queryset = queryset.filter(is_paid=data['is_paid'])
+    if 'status' in data:
+      queryset = queryset.filter_status(data['status'])
+    if 'due_from' in data:
+      queryset = queryset.filter(due_date__gte=data['due_from'])
+    if 'due_to' in data:
+      queryset = queryset.filter(due_date__lte=data['due_to'])
+    return queryset
+
+
+class AvailabilityFilterSerializer(serializers.Serializer):
+  start_date = serializers.DateField()
+  end_date = serializers.DateField()
+  # Ignore this lease, e.g. the one being edited
+  exclude_lease = serializers.IntegerField(required=False)
+
+  def validate(self, attrs):
+    if attrs['start_date'] > attrs['end_date']:
+      raise serializers.ValidationError({'end_date': 'end_date cannot be before start_date.'})
+    return attrs
+
+
+class CalendarFilterSerializer(serializers.Serializer):
+  start_date = serializers.DateField(default=datetime.date.today)
+  # The window runs `months` from start_date unless end_date is given
+  months = serializers.IntegerField(min_value=1, max_value=36, default=12)
+  end_date = serializers.DateField(required=False)
+
+  def validate(self, attrs):
+    last_day = add_months(attrs['start_date'], 36)
+    if 'end_date' not in attrs:
+      attrs['end_date'] = add_months(attrs['start_date'], attrs['months']) - datetime.timedelta(days=1)
+    elif attrs['end_date'] < attrs['start_date']:
+      raise serializers.ValidationError({'end_date': 'end_date cannot be before start_date.'})
+    elif attrs['end_date'] >= last_day:
+      raise serializers.ValidationError({'end_date': 'The window cannot be longer than 36 months.'})
+    return attrs
+
+
+class RentRollFilterSerializer(serializers.Serializer):
+  # ?month=2025-03, the current month by default
+  month = serializers.DateField(input_formats=['%Y-%m'], default=datetime.date.today)
+
+
+class YearOverYearFilterSerializer(serializers.Serializer):
+  year = serializers.IntegerField(min_value=1900, max_value=9998, default=lambda: datetime.date.today().year)
+
+
+class DashboardFilterSerializer(serializers.Serializer):
+  months = serializers.IntegerField(min_value=1, max_value=36, default=12)
+
+
+class ForecastFilterSerializer(serializers.Serializer):
+  months = serializers.IntegerField(min_value=1, max_value=36, default=12)
+
+
+class AuditFilterSerializer(serializers.Serializer):
+  # ?month=2025-03; without it and without lease, the current month
+  month = serializers.DateField(input_formats=['%Y-%m'], required=False)
+  lease = serializers.IntegerField(required=False)
+  model = serializers.ChoiceField(choices=AuditEntry.MODEL_CHOICES, required=False)
+
+  def filter_queryset(self, queryset):
+    data = self.validated_data
+    if 'lease' in data:
+      queryset = queryset.filter(lease_id=data['lease'])
+    if 'month' in data:
+      queryset = queryset.filter(month=data['month'].replace(day=1))
+    elif 'lease' not in data:
+      queryset = queryset.filter(month=datetime.date.today().replace(day=1))
+    if 'model' in data:
+      queryset = queryset.filter(model=data['model'])
+    return queryset
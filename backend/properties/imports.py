@@ -0,0 +1,232 @@
+import csv
+import itertools
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from rest_framework import serializers
+from rest_framework.validators import UniqueValidator
+from .models import LEASE_OVERLAP_CONSTRAINT, LEASE_OVERLAP_MESSAGE, Property, Lease, Payment, violated_constraint
+from .serializers import PropertySerializer, LeaseSerializer, PaymentSerializer
+from .status import refresh_property_status
+from .reports import refresh_rent_roll
+from . import audit
+
+# Rows validated and inserted per transaction
+IMPORT_CHUNK_SIZE = 1000
+
+
+class CSVImportError(Exception):
+  """Raised when the file as a whole cannot be read (as opposed to a bad row)."""
+
+
+class NaturalKeyMap:
+  """
+  Translates the values a CSV may use for a relation into primary keys.
+
+  Digits are taken as a primary key already; anything else is looked up by
+  `field` (a username, an address), with one query per chunk for the keys
+  not seen before. Keys that match several rows are remembered as ambiguous.
+  """
+
+  def __init__(self, queryset, field):
+    self.queryset = queryset
+    self.field = field
+    self.pks = {}
+
+  def load(self, values):
+    missing = {value for value in values if value and not value.isdigit()} - self.pks.keys()
+    if not missing:
+      return
+    for key, pk in self.queryset.filter(**{f'{self.field}__in': missing}).values_list(self.field, 'pk'):
+      self.pks[key] = None if key in self.pks else pk
+
+  def resolve(self, value):
+    """Return (primary key, error message)."""
+    if not value or value.isdigit():
+      return value, None
+    if value not in self.pks:
+      return value, f'No match for {self.field} "{value}".'
+    if self.pks[value] is None:
+      return value, f'{self.field} "{value}" matches more than one row.'
+    return str(self.pks[value]), None
+
+
+def _take_unique_validators(serializer):
+  """
+  Remove the UniqueValidators from `serializer`'s fields, which would run one
+  query per row, and return {field name: error message} to check per chunk.
+  """
+  unique = {}
+  for name, field in serializer.fields.items():
+    for validator in field.validators:
+      if isinstance(validator, UniqueValidator):
+        unique[name] = validator.message
+    field.validators = [v for v in field.validators if not isinstance(v, UniqueValidator)]
+  return unique
+
+
+def _build_payment(attrs, owner):
+  return Payment(**attrs, status=Payment.compute_status(attrs.get('is_paid', False), attrs.get('due_date')))
+
+
+def _refresh_rent_roll(payments):
+  # bulk_create skips the post_save signal that keeps the ledger current
+  refresh_rent_roll({payment.lease_id for payment in payments})
+
+
+def _refresh_leased_properties(leases):
+  # bulk_create skips Lease.save, which normally keeps the property status in sync
+  refresh_property_status({lease.property_id for lease in leases})
+
+
+# `related` scopes which rows a primary key may point to, `natural_keys` which
+# non-numeric values are accepted for a relation and how they are looked up.
+# `constraints` maps database constraints a row may violate to the error
+# reported for it.
+IMPORTS = {
+  'properties': {
+    'model': Property,
+    'serializer': PropertySerializer,
+    'related': lambda owner: {},
+    'natural_keys': lambda owner: {},
+    'build': lambda attrs, owner: Property(**attrs, owner=owner),
+  },
+  'leases': {
+    'model': Lease,
+    'serializer': LeaseSerializer,
+    'related': lambda owner: {'property': Property.objects.filter(owner=owner)},
+    'natural_keys': lambda owner: {
+      'tenant': NaturalKeyMap(get_user_model().objects.all(), 'username'),
+      'property': NaturalKeyMap(Property.objects.filter(owner=owner), 'address'),
+    },
+    'build': lambda attrs, owner: Lease(**attrs),
+    'after_write': _refresh_leased_properties,
+    'constraints': {LEASE_OVERLAP_CONSTRAINT: LEASE_OVERLAP_MESSAGE},
+  },
+  'payments': {
+    'model': Payment,
+    'serializer': PaymentSerializer,
+    'related': lambda owner: {'lease': Lease.objects.filter(property__owner=owner)},
+    'natural_keys': lambda owner: {},
+    'build': _build_payment,
+    'after_write': _refresh_rent_roll,
+  },
+}
+
+
+def _write_chunk(spec, rows, errors):
+  """
+  Insert the (line, instance) pairs of a chunk in one transaction and return
+  the instances written.
+
+  If the insert breaks one of the spec's `constraints`, the rows are retried
+  one savepoint at a time so only the offending ones are reported in `errors`.
+  """
+  model, constraints = spec['model'], spec.get('constraints', {})
+  try:
+    with transaction.atomic():
+      written = model.objects.bulk_create([instance for _, instance in rows], batch_size=500)
+      if 'after_write' in spec:
+        spec['after_write'](written)
+      audit.record([audit.change('create', instance) for instance in written])
+    return written
+  except IntegrityError as e:
+    if violated_constraint(e) not in constraints:
+      raise
+
+  written = []
+  with transaction.atomic():
+    for line, instance in rows:
+      try:
+        with transaction.atomic():
+          model.objects.bulk_create([instance])
+      except IntegrityError as e:
+        if violated_constraint(e) not in constraints:
+          raise
+        errors.append({'line': line, 'errors': {'non_field_errors': [constraints[violated_constraint(e)]]}})
+      else:
+        written.append(instance)
+    if 'after_write' in spec:
+      spec['after_write'](written)
+    audit.record([audit.change('create', instance) for instance in written])
+  return written
+
+
+def import_csv(resource, lines, owner, chunk_size=IMPORT_CHUNK_SIZE):
+  """
+  Import the rows of a CSV file (any iterable of text lines) for `owner`.
+
+  The file is read incrementally and handled `chunk_size` rows at a time:
+  each chunk is validated row by row with the API serializer, relations are
+  resolved and unique fields checked with one query per field, and the
+  valid rows are inserted with
+  bulk_create in their own transaction. Invalid rows, including rows the
+  database rejects (an overlapping active lease), are skipped and reported
+  with their line number, so one bad row does not sink the file.
+
+  Returns {'created': count, 'errors': [{'line': n, 'errors': {...}}, ...]}.
+  """
+  spec = IMPORTS[resource]
+  reader = csv.DictReader(lines)
+  try:
+    if not reader.fieldnames:
+      raise CSVImportError('The file is empty.')
+    natural_keys = spec['natural_keys'](owner)
+    related = spec['related'](owner)
+    created, errors = 0, []
+
+    # The header is line 1
+    rows = enumerate(reader, 2)
+    while chunk := list(itertools.islice(rows, chunk_size)):
+      for name, key_map in natural_keys.items():
+        key_map.load({row.get(name) for _, row in chunk})
+
+      items, lines_by_item = [], []
+      for line, row in chunk:
+        item = {name: value for name, value in row.items() if name and value not in ('', None)}
+        item_errors = {}
+        for name, key_map in natural_keys.items():
+          item[name], error = key_map.resolve(item.get(name))
+          if error:
+            item_errors[name] = [error]
+          if item[name] is None:
+            del item[name]
+        if item_errors:
+          errors.append({'line': line, 'errors': item_errors})
+        else:
+          items.append(item)
+          lines_by_item.append(line)
+
+      validator = spec['serializer'](many=True)
+      for name, queryset in related.items():
+        validator.child.fields[name].queryset = queryset
+      validator.prefetch_relations(items)
+      unique = _take_unique_validators(validator.child)
+
+      valid = []
+      for line, item in zip(lines_by_item, items):
+        try:
+          valid.append((line, validator.child.run_validation(item)))
+        except serializers.ValidationError as e:
+          errors.append({'line': line, 'errors': e.detail})
+
+      # One query per unique field; earlier chunks are already in the table
+      for name, message in unique.items():
+        values = {attrs[name] for _, attrs in valid if name in attrs}
+        taken = set(spec['model'].objects.filter(**{f'{name}__in': values}).values_list(name, flat=True))
+        kept = []
+        for line, attrs in valid:
+          if attrs.get(name) in taken:
+            errors.append({'line': line, 'errors': {name: [message]}})
+          else:
+            taken.add(attrs.get(name))
+            kept.append((line, attrs))
+        valid = kept
+
+      if valid:
+        instances = [(line, spec['build'](attrs, owner)) for line, attrs in valid]
+        created += len(_write_chunk(spec, instances, errors))
+  except (csv.Error, UnicodeDecodeError) as e:
+    raise CSVImportError(f'Could not read the file: {e}')
+
+  errors.sort(key=lambda error: error['line'])
+  return {'created': created, 'errors': errors}
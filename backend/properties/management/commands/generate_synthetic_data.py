@@ -0,0 +1,160 @@
+import datetime
+import random
+import time
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from properties.availability import add_months
+from properties.cache import invalidate_all
+from properties.models import Property, Lease, Payment
+from properties.reports import refresh_rent_roll
+from properties.schedule import monthly_due_dates
+from properties.status import refresh_property_status
+
+FIRST_NAMES = ['Anna', 'Jan', 'Maria', 'Piotr', 'Kasia', 'Tomasz', 'Ewa', 'Marek', 'Zofia', 'Adam', 'Ola', 'Pawel']
+LAST_NAMES = ['Nowak', 'Kowalski', 'Wisniewska', 'Wojcik', 'Kaminski', 'Lewandowska', 'Zielinski', 'Szymanska']
+STREETS = ['Garden', 'Mill', 'Oak', 'River', 'Station', 'Market', 'Church', 'Park', 'Castle', 'Bridge']
+FEATURES = [
+  'balcony', 'garden', 'parking space', 'lift', 'terrace', 'basement', 'air conditioning',
+  'fitted kitchen', 'river view', 'quiet street', 'near the station', 'newly renovated',
+]
+PROPERTY_TYPES = [choice for choice, _ in Property.PROPERTY_CHOICES]
+
+# Share of past due payments that are never paid, and of paid ones paid late
+MISSED_RATE = 0.05
+LATE_RATE = 0.2
+
+
+class Command(BaseCommand):
+  help = (
+    "Fill the database with synthetic owners, tenants, properties, leases and monthly "
+    "payments, written with bulk inserts one batch of properties per transaction. "
+    "The same --seed and --date always give the same data."
+  )
+
+  def add_arguments(self, parser):
+    parser.add_argument('--owners', type=int, default=10)
+    parser.add_argument('--properties', type=int, default=100, help="Properties per owner (default 100).")
+    parser.add_argument('--leases', type=int, default=3,
+                        help="Back to back leases per property, the last one usually running (default 3).")
+    parser.add_argument('--lease-months', type=int, default=12,
+                        help="Length of every lease, one payment per month (default 12).")
+    parser.add_argument('--tenants', type=int, default=1000)
+    parser.add_argument('--vacancy', type=float, default=0.1,
+                        help="Share of properties whose last lease has already ended (default 0.1).")
+    parser.add_argument('--prefix', default='synthetic', help="Start of every generated username and address.")
+    parser.add_argument('--password', default='synthetic', help="Password of every generated user.")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--date', type=datetime.date.fromisoformat, default=None,
+                        help="Generate the data as of this date (YYYY-MM-DD) instead of today.")
+    parser.add_argument('--batch-size', type=int, default=1000,
+                        help="Properties written per transaction (default 1000).")
+
+  def handle(self, *args, **options):
+    User = get_user_model()
+    prefix = options['prefix']
+    if User.objects.filter(username__startswith=f'{prefix}-').exists():
+      raise CommandError(f"Users named {prefix}-... already exist, choose another --prefix.")
+    if options['owners'] < 1 or options['tenants'] < 1 or options['lease_months'] < 1:
+      raise CommandError("--owners, --tenants and --lease-months must be at least 1.")
+
+    self.random = random.Random(options['seed'])
+    self.today = options['date'] or datetime.date.today()
+    started = time.perf_counter()
+    # Hashing is deliberately slow, every user shares the one hash
+    password = make_password(options['password'])
+    owners = User.objects.bulk_create(
+      self.user(f'{prefix}-owner{i}', password) for i in range(options['owners'])
+    )
+    tenants = User.objects.bulk_create(
+      (self.user(f'{prefix}-tenant{i}', password) for i in range(options['tenants'])), batch_size=5000
+    )
+    self.tenant_ids = [tenant.pk for tenant in tenants]
+
+    counts = {'users': len(owners) + len(tenants), 'properties': 0, 'leases': 0, 'payments': 0}
+    for owner_index, owner in enumerate(owners):
+      for first in range(0, options['properties'], options['batch_size']):
+        indexes = range(first, min(first + options['batch_size'], options['properties']))
+        with transaction.atomic():
+          written = self.write_batch(owner, owner_index, indexes, options)
+        for name, count in written.items():
+          counts[name] += count
+      self.stdout.write(f"{owner.username}: {counts['properties']} properties so far")
+
+    # Bulk inserts bypass the signals that keep caches current
+    invalidate_all()
+    elapsed = time.perf_counter() - started
+    rows = sum(counts.values())
+    self.stdout.write(', '.join(f"{count} {name}" for name, count in counts.items()))
+    self.stdout.write(self.style.SUCCESS(f"{rows} rows in {elapsed:.2f}s ({rows / elapsed:.0f} rows/s)"))
+
+  def user(self, username, password):
+    return get_user_model()(
+      username=username, email=f'{username}@example.com', password=password,
+      first_name=self.random.choice(FIRST_NAMES), last_name=self.random.choice(LAST_NAMES),
+    )
+
+  def write_batch(self, owner, owner_index, indexes, options):
+    """Properties `indexes` of one owner with their leases and payments."""
+    properties = Property.objects.bulk_create(self.property(owner, owner_index, i, options['prefix']) for i in indexes)
+    leases = Lease.objects.bulk_create(
+      lease for property in properties for lease in self.leases(property, options)
+    )
+    payments = Payment.objects.bulk_create(
+      (payment for lease in leases for payment in self.payments(lease)), batch_size=5000
+    )
+    refresh_property_status([property.pk for property in properties], today=self.today)
+    refresh_rent_roll([lease.pk for lease in leases])
+    return {'properties': len(properties), 'leases': len(leases), 'payments': len(payments)}
+
+  def property(self, owner, owner_index, index, prefix):
+    rooms = self.random.randint(1, 6)
+    return Property(
+      address=f'{index + 1} {self.random.choice(STREETS)} Street, {prefix} {owner_index}',
+      description=f"{rooms} rooms with a {' and a '.join(self.random.sample(FEATURES, 2))}",
+      owner=owner,
+      property_type=self.random.choice(PROPERTY_TYPES),
+      # Set from the leases once they are written
+      status='under_renovation' if self.random.random() < 0.02 else 'available',
+      area=Decimal(self.random.randint(20, 300)),
+      num_of_rooms=rooms,
+    )
+
+  def leases(self, property, options):
+    months = options['lease_months']
+    # The last lease started within the last `months` months, or a whole term
+    # earlier for a vacant property
+    last_start = add_months(self.today.replace(day=self.random.randint(1, 28)), -self.random.randrange(months))
+    if self.random.random() < options['vacancy']:
+      last_start = add_months(last_start, -months)
+    tenant = self.random.choice(self.tenant_ids)
+    rate = Decimal(self.random.randrange(800, 5000, 50))
+    for term in range(options['leases'] - 1, -1, -1):
+      start_date = add_months(last_start, -term * months)
+      end_date = add_months(start_date, months) - datetime.timedelta(days=1)
+      yield Lease(
+        property=property, tenant_id=tenant, start_date=start_date, end_date=end_date,
+        rate_amount=rate, active_lease=end_date >= self.today,
+      )
+      # Most renewals keep the tenant, at a slightly higher rate
+      if self.random.random() < 0.3:
+        tenant = self.random.choice(self.tenant_ids)
+      rate = (rate * Decimal('1.03')).quantize(Decimal('1.00'))
+
+  def payments(self, lease):
+    for due_date in monthly_due_dates(lease.start_date, lease.end_date):
+      is_paid, payment_date = False, None
+      if due_date < self.today:
+        draw = self.random.random()
+        if draw >= MISSED_RATE:
+          is_paid = True
+          late = draw < MISSED_RATE + LATE_RATE
+          payment_date = min(self.today, due_date + datetime.timedelta(
+            days=self.random.randint(1, 30) if late else -self.random.randint(0, 5)
+          ))
+      yield Payment(
+        lease=lease, amount=lease.rate_amount, due_date=due_date, payment_date=payment_date, is_paid=is_paid,
+        status=Payment.compute_status(is_paid, due_date, self.today),
+      )
@@ -0,0 +1,45 @@
+import time
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from properties.cache import invalidate_owner
+from properties.imports import IMPORTS, IMPORT_CHUNK_SIZE, CSVImportError, import_csv
+
+
+class Command(BaseCommand):
+  help = (
+    "Import properties, leases or payments for one owner from a CSV file whose "
+    "columns match the API fields. Invalid rows are skipped and reported."
+  )
+
+  def add_arguments(self, parser):
+    parser.add_argument('resource', choices=sorted(IMPORTS))
+    parser.add_argument('path', help="CSV file with a header row.")
+    parser.add_argument('--owner', required=True, help="Username of the owner the rows belong to.")
+    parser.add_argument('--chunk-size', type=int, default=IMPORT_CHUNK_SIZE,
+                        help=f"Rows validated and inserted per transaction (default {IMPORT_CHUNK_SIZE}).")
+
+  def handle(self, *args, **options):
+    try:
+      owner = get_user_model().objects.get(username=options['owner'])
+    except get_user_model().DoesNotExist:
+      raise CommandError(f"No user named {options['owner']!r}.")
+
+    started = time.perf_counter()
+    try:
+      with open(options['path'], encoding='utf-8-sig', newline='') as lines:
+        report = import_csv(options['resource'], lines, owner, chunk_size=options['chunk_size'])
+    except (OSError, CSVImportError) as e:
+      raise CommandError(str(e))
+    invalidate_owner(owner.pk)
+    elapsed = time.perf_counter() - started
+
+    for error in report['errors']:
+      fields = '; '.join(
+        f"{name}: {' '.join(str(message) for message in messages)}"
+        for name, messages in error['errors'].items()
+      )
+      self.stderr.write(f"line {error['line']}: {fields}")
+    self.stdout.write(self.style.SUCCESS(
+      f"Imported {report['created']} {options['resource']} in {elapsed:.2f}s, "
+      f"{len(report['errors'])} rows skipped"
+    ))
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.4 on 2026-10-18 09:45
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0003_payment_due_date_alter_payment_payment_date_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='lease',
+            index=models.Index(fields=['property', 'active_lease', 'start_date', 'end_date'], name='lease_prop_active_dates_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['lease', 'due_date', 'is_paid'], name='payment_lease_due_paid_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['owner', 'status'], name='property_owner_status_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.4 on 2026-10-18 09:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0004_list_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='payment',
+            name='status',
+            field=models.CharField(choices=[('paid', 'Paid'), ('unknown', 'Unknown'), ('overdue', 'Overdue'), ('due_soon', 'Due soon'), ('pending', 'Pending')], db_index=True, default='pending', max_length=10),
+        ),
+        # Backfill existing rows; from here on save() and nightly_rollover keep it current
+        migrations.RunSQL(
+            """
+            UPDATE properties_payment SET status = CASE
+                WHEN is_paid THEN 'paid'
+                WHEN due_date IS NULL THEN 'unknown'
+                WHEN due_date < CURRENT_DATE THEN 'overdue'
+                WHEN due_date <= CURRENT_DATE + 3 THEN 'due_soon'
+                ELSE 'pending'
+            END
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
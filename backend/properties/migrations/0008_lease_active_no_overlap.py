@@ -0,0 +1,70 @@
+# Generated by Django 5.2.4 on 2026-10-18 11:14
+
+import datetime
+import logging
+import django.contrib.postgres.constraints
+from django.contrib.postgres.operations import BtreeGistExtension
+import django.contrib.postgres.fields.ranges
+from django.db import migrations, models
+
+logger = logging.getLogger(__name__)
+
+
+def deactivate_overlapping_leases(apps, schema_editor):
+    """
+    Earlier releases allowed a property to have overlapping active leases,
+    which the constraint would reject. Keep the earliest of each overlapping
+    group active, deactivate the later ones and recompute the status of their
+    properties the way refresh_property_status does, logging what changed.
+    """
+    Lease = apps.get_model('properties', 'Lease')
+    Property = apps.get_model('properties', 'Property')
+    db = schema_editor.connection.alias
+    active = Lease.objects.using(db).filter(
+        active_lease=True, property__isnull=False,
+    ).order_by('property_id', 'start_date', 'id').values_list('id', 'property_id', 'start_date', 'end_date')
+    deactivated, property_id, kept_until = [], None, None
+    for lease_id, lease_property_id, start_date, end_date in active.iterator():
+        if lease_property_id != property_id:
+            property_id, kept_until = lease_property_id, None
+        # Both ends are included, like in the constraint
+        if kept_until is not None and start_date <= kept_until:
+            deactivated.append((lease_id, lease_property_id))
+        else:
+            kept_until = end_date
+    if not deactivated:
+        return
+
+    Lease.objects.using(db).filter(pk__in=[lease_id for lease_id, _ in deactivated]).update(active_lease=False)
+    logger.warning(
+        'Deactivated %d lease(s) overlapping an earlier active lease of their property: %s',
+        len(deactivated), ', '.join(f'lease {lease_id} (property {pk})' for lease_id, pk in deactivated),
+    )
+
+    # The update skipped Lease.save, so bring the properties' status up to date here
+    affected = {pk for _, pk in deactivated}
+    rented = set(Lease.objects.using(db).filter(
+        property_id__in=affected, active_lease=True, end_date__gte=datetime.date.today(),
+    ).values_list('property_id', flat=True))
+    properties = Property.objects.using(db).filter(pk__in=affected)
+    changed = properties.filter(pk__in=rented).exclude(status='rented').update(status='rented')
+    changed += properties.exclude(pk__in=rented).filter(status='rented').update(status='available')
+    if changed:
+        logger.warning('Updated the status of %d of their properties.', changed)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0007_property_search_vector'),
+    ]
+
+    operations = [
+        # GiST support for the = on property_id
+        BtreeGistExtension(),
+        migrations.RunPython(deactivate_overlapping_leases, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='lease',
+            constraint=django.contrib.postgres.constraints.ExclusionConstraint(condition=models.Q(('active_lease', True)), expressions=[('property', '='), (models.Func(models.F('start_date'), models.F('end_date'), models.Value('[]'), function='DATERANGE', output_field=django.contrib.postgres.fields.ranges.DateRangeField()), '&&')], name='lease_active_no_overlap', violation_error_message='The property already has an active lease for these dates.'),
+        ),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 5.2.4 on 2026-10-18 11:31
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0008_lease_active_no_overlap'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RentRollEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('expected', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('paid', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('arrears', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('lease', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rent_roll', to='properties.lease')),
+                ('owner', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['owner', 'month'], name='rent_roll_owner_month_idx')],
+                'constraints': [models.UniqueConstraint(fields=('lease', 'month'), name='rent_roll_lease_month_uniq')],
+            },
+        ),
+        migrations.CreateModel(
+            name='RentRollMonth',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('expected', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('paid', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('owner', 'month'), name='rent_roll_month_owner_month_uniq')],
+            },
+        ),
+        # Fill both tables for existing payments, later writes keep them current
+        migrations.RunSQL(
+            """
+            INSERT INTO properties_rentrollentry (lease_id, owner_id, month, expected, paid, arrears)
+            SELECT lease_id, owner_id, month, expected, paid,
+              sum(expected - paid) OVER (PARTITION BY lease_id ORDER BY month)
+            FROM (
+              SELECT pay.lease_id, p.owner_id, date_trunc('month', pay.due_date)::date AS month,
+                sum(pay.amount) AS expected,
+                coalesce(sum(pay.amount) FILTER (WHERE pay.is_paid), 0) AS paid
+              FROM properties_payment AS pay
+              JOIN properties_lease AS l ON l.id = pay.lease_id
+              LEFT JOIN properties_property AS p ON p.id = l.property_id
+              WHERE pay.due_date IS NOT NULL
+              GROUP BY pay.lease_id, p.owner_id, 3
+            ) AS months;
+
+            INSERT INTO properties_rentrollmonth (owner_id, month, expected, paid)
+            SELECT owner_id, month, sum(expected), sum(paid)
+            FROM properties_rentrollentry
+            WHERE owner_id IS NOT NULL
+            GROUP BY owner_id, month;
+            """,
+            migrations.RunSQL.noop,
+        ),
+    ]
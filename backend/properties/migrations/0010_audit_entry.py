@@ -0,0 +1,53 @@
+# Generated by Django 5.2.4 on 2026-10-18 12:00
+
+import django.contrib.postgres.indexes
+import django.core.serializers.json
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0009_rent_roll'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuditEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField()),
+                ('month', models.DateField()),
+                ('model', models.CharField(choices=[('lease', 'Lease'), ('payment', 'Payment')], max_length=10)),
+                ('object_id', models.BigIntegerField()),
+                ('lease_id', models.BigIntegerField(null=True)),
+                ('action', models.CharField(choices=[('create', 'Create'), ('update', 'Update'), ('delete', 'Delete')], max_length=10)),
+                ('changes', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('user', models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'month', 'id'], name='audit_user_month_idx'), models.Index(fields=['lease_id', 'id'], name='audit_lease_idx'), django.contrib.postgres.indexes.BrinIndex(fields=['created_at'], name='audit_created_brin')],
+            },
+        ),
+        # History is never rewritten; TRUNCATE is still allowed for test flushes
+        migrations.RunSQL(
+            """
+            CREATE FUNCTION properties_auditentry_append_only() RETURNS trigger AS $$
+            BEGIN
+              RAISE EXCEPTION 'properties_auditentry is append-only';
+            END
+            $$ LANGUAGE plpgsql;
+
+            CREATE TRIGGER auditentry_append_only
+            BEFORE UPDATE OR DELETE ON properties_auditentry
+            FOR EACH ROW EXECUTE FUNCTION properties_auditentry_append_only();
+            """,
+            """
+            DROP TRIGGER auditentry_append_only ON properties_auditentry;
+            DROP FUNCTION properties_auditentry_append_only();
+            """,
+        ),
+    ]
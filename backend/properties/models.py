@@ -1,4 +1,10 @@
-from django.db import models
+from django.contrib.postgres.constraints import ExclusionConstraint
+from django.contrib.postgres.fields import DateRangeField, RangeOperators
+from django.contrib.postgres.indexes import BrinIndex, GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
+from django.db import IntegrityError, models, transaction
+from django.db.models import Case, F, Func, Q, Value, When
+from django.core.serializers.json import DjangoJSONEncoder
 from django.core.validators import MinValueValidator
 from django.core.exceptions import ValidationError
 from users.models import CustomUser
@@ -6,6 +12,17 @@ import datetime
 
 # Create your models here.
 
+# Text search configuration for property search (stemming, stop words)
+SEARCH_CONFIG = 'english'
+
+
+class PropertyManager(models.Manager):
+
+  def get_queryset(self):
+    # The search vector is only filtered and ranked on in SQL, never read
+    return super().get_queryset().defer('search_vector')
+
+
 class Property(models.Model):
 
   PROPERTY_CHOICES = [
@@ -29,10 +46,55 @@ class Property(models.Model):
   status = models.CharField(choices=STATUS_CHOICES, max_length=30)
   area = models.DecimalField(decimal_places=2, max_digits=10, validators=[MinValueValidator(1)])
   num_of_rooms = models.IntegerField(validators=[MinValueValidator(1)])
+  # Computed by the database on every insert and update, bulk ones included
+  search_vector = models.GeneratedField(
+    expression=(
+      SearchVector('address', weight='A', config=SEARCH_CONFIG)
+      + SearchVector('description', weight='B', config=SEARCH_CONFIG)
+    ),
+    output_field=SearchVectorField(),
+    db_persist=True,
+  )
+
+  objects = PropertyManager()
+
+  class Meta:
+    indexes = [
+      models.Index(fields=['owner', 'status'], name='property_owner_status_idx'),
+      GinIndex(fields=['search_vector'], name='property_search_vector_idx'),
+    ]
 
   def __str__(self):
     return f"{self.address}"
 
+  @classmethod
+  def from_db(cls, db, field_names, values):
+    instance = super().from_db(db, field_names, values)
+    # A property handed to another owner leaves the previous one's lists stale
+    instance._loaded_owner_id = instance.__dict__.get('owner_id')
+    return instance
+
+  def delete(self, *args, **kwargs):
+    from .reports import retire_rent_roll
+    with transaction.atomic():
+      # The cascade removes the leases' ledger rows but not the owner's totals
+      retire_rent_roll(self.leases.values_list('pk', flat=True))
+      return super().delete(*args, **kwargs)
+
+def lease_period():
+  """A lease's dates as a daterange, both ends included."""
+  return Func(F('start_date'), F('end_date'), Value('[]'), function='DATERANGE', output_field=DateRangeField())
+
+
+def violated_constraint(error):
+  """Name of the constraint an IntegrityError was raised for, if known."""
+  return getattr(getattr(error.__cause__, 'diag', None), 'constraint_name', None)
+
+
+LEASE_OVERLAP_CONSTRAINT = 'lease_active_no_overlap'
+LEASE_OVERLAP_MESSAGE = "The property already has an active lease for these dates."
+
+
 class Lease(models.Model):
   tenant = models.ForeignKey(CustomUser, null=False, related_name="leases", on_delete=models.CASCADE)
   property = models.ForeignKey(Property, related_name="leases", null=True, blank=True, on_delete=models.CASCADE)
@@ -41,59 +103,242 @@ class Lease(models.Model):
   rate_amount = models.DecimalField(decimal_places=2, max_digits=10, validators=[MinValueValidator(0)])
   active_lease = models.BooleanField(default=False)
 
-  def save(self, *args, **kwargs):
+  class Meta:
+    indexes = [
+      models.Index(fields=['property', 'active_lease', 'start_date', 'end_date'], name='lease_prop_active_dates_idx'),
+    ]
+    constraints = [
+      # Checked by PostgreSQL on every write, so concurrent requests cannot
+      # both book the same dates. Its GiST index also serves availability checks.
+      ExclusionConstraint(
+        name=LEASE_OVERLAP_CONSTRAINT,
+        expressions=[('property', RangeOperators.EQUAL), (lease_period(), RangeOperators.OVERLAPS)],
+        condition=Q(active_lease=True),
+        violation_error_message=LEASE_OVERLAP_MESSAGE,
+      ),
+    ]
+
+  @staticmethod
+  def check_dates(start_date, end_date):
 
     # Checks start date
-    if self.start_date < datetime.date.today():
+    if start_date < datetime.date.today():
       raise ValidationError("The start date cannot be in the past!")
     
     # Checks end date
-    if self.end_date < datetime.date.today() or self.end_date < self.start_date:
+    if end_date < datetime.date.today() or end_date < start_date:
       raise ValidationError("Invalid end date!")
 
-    # Changes status of property & checks if already rented
-    is_new = self.pk is None
-    old = None
-    if not is_new:
-        old = Lease.objects.get(pk=self.pk)
+  @classmethod
+  def from_db(cls, db, field_names, values):
+    instance = super().from_db(db, field_names, values)
+    # Remember the property the lease was loaded with, so moving a lease
+    # also refreshes the status of the property it left
+    instance._loaded_property_id = instance.__dict__.get('property_id')
+    return instance
 
-    super().save(*args, **kwargs)
+  def save(self, *args, **kwargs):
+    self.check_dates(self.start_date, self.end_date)
 
-    prop = self.property
-    if not prop:
-        return
+    try:
+      # A savepoint, so a rejected lease leaves any outer transaction usable
+      with transaction.atomic():
+        super().save(*args, **kwargs)
+    except IntegrityError as e:
+      if violated_constraint(e) != LEASE_OVERLAP_CONSTRAINT:
+        raise
+      raise ValidationError(LEASE_OVERLAP_MESSAGE)
 
-    active_now = self.active_lease
+    # Changes status of property & checks if already rented
+    from .status import refresh_property_status
+    loaded_property_id = getattr(self, '_loaded_property_id', None)
+    refresh_property_status({self.property_id, loaded_property_id})
+    if loaded_property_id is not None and loaded_property_id != self.property_id:
+      # The rent roll is filed under the property's owner
+      from .reports import refresh_rent_roll
+      refresh_rent_roll([self.pk])
+    self._loaded_property_id = self.property_id
 
-    if active_now:
-        prop.status = 'rented'
-    else:
-        has_other = Lease.objects.filter(
-            property=prop,
-            active_lease=True,
-            start_date__lte=datetime.date.today(),
-            end_date__gte=datetime.date.today()
-        ).exclude(pk=self.pk).exists()
-        prop.status = 'rented' if has_other else 'available'
-    prop.save(update_fields=['status'])
+  def delete(self, *args, **kwargs):
+    from .reports import retire_rent_roll
+    from .status import refresh_property_status
+    property_id = self.property_id
+    with transaction.atomic():
+      # The cascade removes the ledger rows but not the owner's totals
+      retire_rent_roll([self.pk])
+      result = super().delete(*args, **kwargs)
+    refresh_property_status([property_id])
+    return result
 
  
+class PaymentQuerySet(models.QuerySet):
+
+  @staticmethod
+  def status_expression(today=None):
+    """Database-side equivalent of Payment.compute_status."""
+    today = today or datetime.date.today()
+    return Case(
+      When(is_paid=True, then=Value('paid')),
+      When(due_date__isnull=True, then=Value('unknown')),
+      When(due_date__lt=today, then=Value('overdue')),
+      When(due_date__lte=today + datetime.timedelta(days=Payment.DUE_SOON_DAYS), then=Value('due_soon')),
+      default=Value('pending'),
+    )
+
+  @staticmethod
+  def status_condition(status, today=None):
+    """
+    The same statuses written as plain conditions on is_paid and due_date, so
+    filtering on them can use the partial index over unpaid payments.
+    """
+    today = today or datetime.date.today()
+    soon = today + datetime.timedelta(days=Payment.DUE_SOON_DAYS)
+    return {
+      'paid': Q(is_paid=True),
+      'unknown': Q(is_paid=False, due_date__isnull=True),
+      'overdue': Q(is_paid=False, due_date__lt=today),
+      'due_soon': Q(is_paid=False, due_date__gte=today, due_date__lte=soon),
+      'pending': Q(is_paid=False, due_date__gt=soon),
+    }[status]
+
+  def with_live_status(self, today=None):
+    return self.annotate(live_status=self.status_expression(today))
+
+  def filter_status(self, status, today=None):
+    return self.filter(self.status_condition(status, today))
+
+
 class Payment(models.Model):
+
+  STATUS_CHOICES = [
+    ("paid", "Paid"),
+    ("unknown", "Unknown"),
+    ("overdue", "Overdue"),
+    ("due_soon", "Due soon"),
+    ("pending", "Pending"),
+  ]
+  DUE_SOON_DAYS = 3
+
   lease = models.ForeignKey(Lease, related_name='payments', on_delete=models.CASCADE)
   amount = models.DecimalField(decimal_places=2, max_digits=10, validators=[MinValueValidator(0)])
   due_date = models.DateField(null=True)
   payment_date = models.DateField(null=True, blank=True)
   is_paid = models.BooleanField(default=False)
+  # Stored so it can be filtered and indexed; set on save and moved forward
+  # as dates pass by the nightly_rollover command
+  status = models.CharField(choices=STATUS_CHOICES, max_length=10, default='pending', db_index=True)
+
+  objects = PaymentQuerySet.as_manager()
+
+  class Meta:
+    indexes = [
+      models.Index(fields=['lease', 'due_date', 'is_paid'], name='payment_lease_due_paid_idx'),
+      # Overdue / due soon lookups only ever look at unpaid payments
+      models.Index(fields=['due_date'], condition=Q(is_paid=False), name='payment_unpaid_due_idx'),
+    ]
 
-  @property
-  def status(self):
-      today = datetime.date.today()
-      if self.is_paid:
+  @classmethod
+  def compute_status(cls, is_paid, due_date, today=None):
+      today = today or datetime.date.today()
+      if is_paid:
           return 'paid'
-      if self.due_date is None:
+      if due_date is None:
         return 'unknown'
-      if self.due_date < today:
+      if due_date < today:
           return 'overdue'
-      if self.due_date <= today + datetime.timedelta(days=3):
+      if due_date <= today + datetime.timedelta(days=cls.DUE_SOON_DAYS):
           return 'due_soon'
       return 'pending'
+
+  @classmethod
+  def from_db(cls, db, field_names, values):
+    instance = super().from_db(db, field_names, values)
+    # Moving a payment to another lease changes the rent roll of both
+    instance._loaded_lease_id = instance.__dict__.get('lease_id')
+    return instance
+
+  def save(self, *args, **kwargs):
+    self.status = self.compute_status(self.is_paid, self.due_date)
+    if kwargs.get('update_fields') is not None:
+      kwargs['update_fields'] = {*kwargs['update_fields'], 'status'}
+    super().save(*args, **kwargs)
+
+
+class RentRollEntry(models.Model):
+  """
+  What one lease expected and collected for one month, by due date.
+
+  A ledger derived from Payment and kept current by reports.refresh_rent_roll,
+  so reports read it instead of aggregating payments.
+  """
+  lease = models.ForeignKey(Lease, related_name='rent_roll', on_delete=models.CASCADE)
+  # Copied from the lease's property so reports filter without joins
+  owner = models.ForeignKey(CustomUser, null=True, related_name='+', on_delete=models.CASCADE)
+  # First day of the month
+  month = models.DateField()
+  expected = models.DecimalField(decimal_places=2, max_digits=12)
+  paid = models.DecimalField(decimal_places=2, max_digits=12)
+  # expected minus paid for this and every earlier month of the lease
+  arrears = models.DecimalField(decimal_places=2, max_digits=12)
+
+  class Meta:
+    constraints = [
+      models.UniqueConstraint(fields=['lease', 'month'], name='rent_roll_lease_month_uniq'),
+    ]
+    indexes = [
+      models.Index(fields=['owner', 'month'], name='rent_roll_owner_month_idx'),
+    ]
+
+
+class RentRollMonth(models.Model):
+  """RentRollEntry summed per owner and month, adjusted by every ledger refresh."""
+  owner = models.ForeignKey(CustomUser, related_name='+', on_delete=models.CASCADE)
+  month = models.DateField()
+  expected = models.DecimalField(decimal_places=2, max_digits=14)
+  paid = models.DecimalField(decimal_places=2, max_digits=14)
+
+  class Meta:
+    constraints = [
+      models.UniqueConstraint(fields=['owner', 'month'], name='rent_roll_month_owner_month_uniq'),
+    ]
+
+
+class AuditEntry(models.Model):
+  """
+  One create, update or delete of a Lease or Payment and the fields it changed.
+
+  Written in bulk by properties.audit, once per request. The table is
+  append-only, a trigger rejects UPDATE and DELETE, and its references are
+  plain columns without foreign keys so the history outlives the rows.
+  """
+
+  ACTION_CHOICES = [
+    ("create", "Create"),
+    ("update", "Update"),
+    ("delete", "Delete"),
+  ]
+  MODEL_CHOICES = [
+    ("lease", "Lease"),
+    ("payment", "Payment"),
+  ]
+
+  created_at = models.DateTimeField()
+  # First day of created_at's month, so history is read month by month from an index
+  month = models.DateField()
+  # Who made the change
+  user = models.ForeignKey(CustomUser, null=True, related_name='+', on_delete=models.DO_NOTHING, db_constraint=False)
+  model = models.CharField(choices=MODEL_CHOICES, max_length=10)
+  object_id = models.BigIntegerField()
+  # The lease itself, or the payment's lease
+  lease_id = models.BigIntegerField(null=True)
+  action = models.CharField(choices=ACTION_CHOICES, max_length=10)
+  # {field: [old, new]}, old is null for creates and new for deletes
+  changes = models.JSONField(encoder=DjangoJSONEncoder)
+
+  class Meta:
+    indexes = [
+      models.Index(fields=['user', 'month', 'id'], name='audit_user_month_idx'),
+      models.Index(fields=['lease_id', 'id'], name='audit_lease_idx'),
+      # Rows arrive in created_at order, a BRIN index stays tiny however long the history gets
+      BrinIndex(fields=['created_at'], name='audit_created_brin'),
+    ]
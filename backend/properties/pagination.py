@@ -0,0 +1,65 @@
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination, LimitOffsetPagination
+from rest_framework.request import Request
+
+
+class OwnerCursorPagination(CursorPagination):
+  """
+  Keyset pagination over the primary key.
+
+  Ordering on a unique column lets every page be fetched with a
+  ``WHERE id < cursor ORDER BY id DESC LIMIT n`` query, so the cost of a page
+  does not grow with how deep the cursor is.
+  """
+  page_size = 50
+  page_size_query_param = 'page_size'
+  max_page_size = 500
+  ordering = '-id'
+
+  async def apaginate_queryset(self, queryset, request):
+    """
+    paginate_queryset for async views, reading the page with the async ORM.
+
+    Only walks forward: cursors from `next` links (of either kind of view)
+    are accepted and `previous` is always None.
+    """
+    # The cursor helpers expect a DRF request (query_params)
+    request = request if isinstance(request, Request) else Request(request)
+    self.request = request
+    self.page_size = self.get_page_size(request)
+    self.base_url = request.build_absolute_uri()
+    self.cursor = self.decode_cursor(request)
+    if self.cursor is not None:
+      if self.cursor.reverse or self.cursor.offset:
+        raise NotFound(self.invalid_cursor_message)
+      queryset = queryset.filter(pk__lt=self.cursor.position)
+
+    queryset = queryset.order_by(self.ordering)[:self.page_size + 1]
+    page = [obj async for obj in queryset.aiterator()]
+    self.has_next = len(page) > self.page_size
+    self.page = page[:self.page_size]
+    return self.page
+
+  def get_async_paginated_data(self, data):
+    next_link = None
+    if self.has_next:
+      next_link = self.encode_cursor(Cursor(offset=0, reverse=False, position=self.page[-1].pk))
+    return {'next': next_link, 'previous': None, 'results': data}
+
+
+class PropertySearchPagination(LimitOffsetPagination):
+  """
+  Limit/offset pages for search results, which are ordered by relevance and
+  so cannot be walked with an id cursor.
+
+  Set ``count`` before paginating when the total is already known, to skip
+  the COUNT query.
+  """
+  default_limit = 20
+  max_limit = 100
+  count = None
+
+  def get_count(self, queryset):
+    if self.count is not None:
+      return self.count
+    return super().get_count(queryset)
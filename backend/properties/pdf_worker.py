@@ -0,0 +1,42 @@
+"""
+PDF rendering that runs inside the contract worker processes.
+
+Nothing here imports Django, so spawned workers can import this module
+without setting up the project.
+"""
+import glob
+import os
+import tempfile
+from xhtml2pdf import pisa
+
+
+def write_pdf(html, path, stale_pattern=None):
+  """
+  Render `html` into the PDF file at `path`, atomically.
+
+  The PDF is written to a temporary file next to `path` and moved into place,
+  so readers never see a partial file. Files matching `stale_pattern` other
+  than `path` (earlier versions of the same document) are removed afterwards.
+  """
+  directory = os.path.dirname(path)
+  os.makedirs(directory, exist_ok=True)
+  fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+  try:
+    with os.fdopen(fd, 'wb') as tmp:
+      status = pisa.CreatePDF(html, dest=tmp)
+    if status.err:
+      raise RuntimeError(f"xhtml2pdf reported {status.err} error(s)")
+    os.replace(tmp_path, path)
+  except BaseException:
+    if os.path.exists(tmp_path):
+      os.remove(tmp_path)
+    raise
+
+  if stale_pattern:
+    for stale in glob.glob(stale_pattern):
+      if stale != path:
+        try:
+          os.remove(stale)
+        except FileNotFoundError:
+          pass
+  return path
@@ -0,0 +1,190 @@
+import datetime
+from django.db import connection, transaction
+from django.db.models import Sum
+from .models import Property, Lease, Payment, RentRollEntry, RentRollMonth
+
+
+LOCK_SQL = """
+  SELECT id FROM {lease} AS l WHERE {lease_where} ORDER BY id FOR UPDATE
+"""
+
+REFRESH_SQL = """
+  WITH months AS (
+    SELECT pay.lease_id, p.owner_id,
+      date_trunc('month', pay.due_date)::date AS month,
+      sum(pay.amount) AS expected,
+      coalesce(sum(pay.amount) FILTER (WHERE pay.is_paid), 0) AS paid
+    FROM {payment} AS pay
+    JOIN {lease} AS l ON l.id = pay.lease_id
+    LEFT JOIN {property} AS p ON p.id = l.property_id
+    WHERE pay.due_date IS NOT NULL AND {payment_where}
+    GROUP BY pay.lease_id, p.owner_id, 3
+  ),
+  ledger AS (
+    SELECT *, sum(expected - paid) OVER (PARTITION BY lease_id ORDER BY month) AS arrears
+    FROM months
+  ),
+  previous AS (
+    SELECT owner_id, month, expected, paid FROM {rent_roll} AS r WHERE {rent_roll_where}
+  ),
+  stale AS (
+    DELETE FROM {rent_roll} AS r
+    WHERE {rent_roll_where}
+      AND NOT EXISTS (SELECT 1 FROM ledger WHERE ledger.lease_id = r.lease_id AND ledger.month = r.month)
+  ),
+  written AS (
+    INSERT INTO {rent_roll} AS r (lease_id, owner_id, month, expected, paid, arrears)
+    SELECT lease_id, owner_id, month, expected, paid, arrears FROM ledger
+    ON CONFLICT (lease_id, month) DO UPDATE
+    SET owner_id = excluded.owner_id, expected = excluded.expected, paid = excluded.paid, arrears = excluded.arrears
+    WHERE (r.owner_id, r.expected, r.paid, r.arrears)
+      IS DISTINCT FROM (excluded.owner_id, excluded.expected, excluded.paid, excluded.arrears)
+    RETURNING 1
+  ),
+  totals AS (
+    -- The new rows minus the ones they replace, added to the owner's month
+    INSERT INTO {totals} AS t (owner_id, month, expected, paid)
+    SELECT owner_id, month, sum(expected), sum(paid) FROM (
+      SELECT owner_id, month, expected, paid FROM ledger
+      UNION ALL
+      SELECT owner_id, month, -expected, -paid FROM previous
+    ) AS changes
+    WHERE owner_id IS NOT NULL
+    GROUP BY owner_id, month
+    HAVING sum(expected) <> 0 OR sum(paid) <> 0
+    ON CONFLICT (owner_id, month) DO UPDATE
+    SET expected = t.expected + excluded.expected, paid = t.paid + excluded.paid
+  )
+  SELECT count(*) FROM written
+"""
+
+RETIRE_SQL = """
+  WITH removed AS (
+    DELETE FROM {rent_roll} AS r WHERE r.lease_id = ANY(%(ids)s)
+    RETURNING owner_id, month, expected, paid
+  )
+  UPDATE {totals} AS t
+  SET expected = t.expected - changes.expected, paid = t.paid - changes.paid
+  FROM (
+    SELECT owner_id, month, sum(expected) AS expected, sum(paid) AS paid
+    FROM removed WHERE owner_id IS NOT NULL GROUP BY owner_id, month
+  ) AS changes
+  WHERE t.owner_id = changes.owner_id AND t.month = changes.month
+"""
+
+MONTHLY_SQL = """
+  WITH months AS (
+    SELECT generate_series(%(first_month)s::date, %(last_month)s::date, interval '1 month')::date AS month
+  )
+  SELECT to_char(m.month, 'YYYY-MM') AS month,
+    coalesce(t.expected, 0.00)::text AS expected,
+    coalesce(t.paid, 0.00)::text AS paid,
+    ((SELECT coalesce(sum(expected - paid), 0.00) FROM {totals}
+      WHERE owner_id = %(owner)s AND month < %(first_month)s)
+      + sum(coalesce(t.expected - t.paid, 0.00)) OVER (ORDER BY m.month))::text AS arrears
+  FROM months AS m
+  LEFT JOIN {totals} AS t ON t.owner_id = %(owner)s AND t.month = m.month
+  ORDER BY m.month
+"""
+
+
+def refresh_rent_roll(lease_ids=None, id_range=None):
+  """
+  Bring the rent roll of some leases in line with their payments.
+
+  Every month of the given leases is recomputed from their payments, which
+  keeps moved due dates and running arrears right: rows for months left
+  without payments are deleted, only rows whose numbers changed are
+  written, and the difference is added to the owners' RentRollMonth totals,
+  all in one statement. The leases are locked first so that concurrent
+  refreshes of the same lease run one after the other, each seeing the
+  payments committed before it.
+
+  Limit it with lease_ids or a half-open lease id_range, or pass neither to
+  go over every lease. Returns the number of ledger rows written.
+  """
+  params = {}
+  lease_where, payment_where, rent_roll_where = ['TRUE'], ['TRUE'], ['TRUE']
+  if lease_ids is not None:
+    params['ids'] = sorted({pk for pk in lease_ids if pk is not None})
+    if not params['ids']:
+      return 0
+    for where, alias in ((lease_where, 'l.id'), (payment_where, 'pay.lease_id'), (rent_roll_where, 'r.lease_id')):
+      where.append(f'{alias} = ANY(%(ids)s)')
+  if id_range is not None:
+    params['low'], params['high'] = id_range
+    for where, alias in ((lease_where, 'l.id'), (payment_where, 'pay.lease_id'), (rent_roll_where, 'r.lease_id')):
+      where.append(f'{alias} >= %(low)s AND {alias} < %(high)s')
+
+  tables = {
+    'payment': Payment._meta.db_table, 'lease': Lease._meta.db_table, 'property': Property._meta.db_table,
+    'rent_roll': RentRollEntry._meta.db_table, 'totals': RentRollMonth._meta.db_table,
+  }
+  # The lock lasts until the enclosing transaction ends, no savepoint needed
+  with transaction.atomic(savepoint=False), connection.cursor() as cursor:
+    cursor.execute(LOCK_SQL.format(lease_where=' AND '.join(lease_where), **tables), params)
+    cursor.execute(REFRESH_SQL.format(
+      payment_where=' AND '.join(payment_where), rent_roll_where=' AND '.join(rent_roll_where), **tables
+    ), params)
+    return cursor.fetchone()[0]
+
+
+def retire_rent_roll(lease_ids):
+  """
+  Take leases about to be deleted out of the rent roll: their ledger rows
+  are deleted and subtracted from the owners' RentRollMonth totals, which
+  the cascade would otherwise leave behind. Call it in the transaction
+  that deletes them. Returns the number of RentRollMonth rows adjusted.
+  """
+  ids = sorted({pk for pk in lease_ids if pk is not None})
+  if not ids:
+    return 0
+  tables = {
+    'lease': Lease._meta.db_table, 'rent_roll': RentRollEntry._meta.db_table, 'totals': RentRollMonth._meta.db_table,
+  }
+  with transaction.atomic(savepoint=False), connection.cursor() as cursor:
+    cursor.execute(LOCK_SQL.format(lease_where='l.id = ANY(%(ids)s)', **tables), {'ids': ids})
+    cursor.execute(RETIRE_SQL.format(**tables), {'ids': ids})
+    return cursor.rowcount
+
+
+def rebuild_rent_roll_months():
+  """Recompute every RentRollMonth row from the ledger. Returns the row count."""
+  with transaction.atomic():
+    RentRollMonth.objects.all().delete()
+    totals = RentRollEntry.objects.filter(owner__isnull=False).values('owner', 'month').annotate(
+      total_expected=Sum('expected'), total_paid=Sum('paid'),
+    ).order_by()
+    return len(RentRollMonth.objects.bulk_create(
+      (RentRollMonth(owner_id=row['owner'], month=row['month'], expected=row['total_expected'], paid=row['total_paid'])
+       for row in totals.iterator()),
+      batch_size=1000,
+    ))
+
+
+def rent_roll(owner, month):
+  """The owner's ledger rows for one month (any day of it), with their leases."""
+  entries = RentRollEntry.objects.filter(owner=owner, month=month.replace(day=1))
+  return entries.select_related('lease__property').defer('lease__property__search_vector')
+
+
+def monthly_totals(owner, first_month, last_month):
+  """
+  Expected, paid and running arrears summed over the owner's leases, for
+  every month from first_month to last_month (first days of months).
+
+  One statement over the owner's RentRollMonth rows, so the cost does not
+  depend on the number of leases; arrears include everything owed before
+  first_month.
+  """
+  sql = MONTHLY_SQL.format(totals=RentRollMonth._meta.db_table)
+  with connection.cursor() as cursor:
+    cursor.execute(sql, {'owner': owner.pk, 'first_month': first_month, 'last_month': last_month})
+    columns = [column.name for column in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def year_over_year(owner, year):
+  """monthly_totals for `year` and the year before it, from one query."""
+  months = monthly_totals(owner, datetime.date(year - 1, 1, 1), datetime.date(year, 12, 1))
+  return {'year': year, 'current': months[12:], 'previous': months[:12]}
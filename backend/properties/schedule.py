@@ -0,0 +1,51 @@
+import calendar
+import datetime
+from django.db import transaction
+from .models import Lease, Payment
+from .reports import refresh_rent_roll
+from . import audit
+
+
+def monthly_due_dates(start_date, end_date):
+  """
+  One due date per month from start_date up to end_date (inclusive), on the
+  lease's start day. Days past the end of a shorter month are clamped, e.g.
+  a lease starting on the 31st is due on Feb 28/29.
+  """
+  dates = []
+  year, month, day = start_date.year, start_date.month, start_date.day
+  while True:
+    last_day = calendar.monthrange(year, month)[1]
+    due = datetime.date(year, month, min(day, last_day))
+    if due > end_date:
+      return dates
+    dates.append(due)
+    month += 1
+    if month > 12:
+      year, month = year + 1, 1
+
+
+def generate_payment_schedule(lease_id):
+  """
+  Create the missing monthly payments for a lease in one bulk INSERT.
+
+  Due dates that already have a payment are skipped, so calling this again
+  is a no-op. The lease row is locked for the duration of the transaction so
+  two concurrent calls cannot both insert the same months.
+  Returns the list of created payments.
+  """
+  with transaction.atomic():
+    lease = Lease.objects.select_for_update().get(pk=lease_id)
+    existing = set(
+      Payment.objects.filter(lease=lease, due_date__isnull=False).values_list('due_date', flat=True)
+    )
+    payments = [
+      Payment(lease=lease, amount=lease.rate_amount, due_date=due, status=Payment.compute_status(False, due))
+      for due in monthly_due_dates(lease.start_date, lease.end_date)
+      if due not in existing
+    ]
+    created = Payment.objects.bulk_create(payments, batch_size=500)
+    if created:
+      refresh_rent_roll([lease.pk])
+      audit.record([audit.change('create', payment) for payment in created])
+    return created
@@ -1,22 +1,110 @@
+from django.core.exceptions import ObjectDoesNotExist, ValidationError as DjangoValidationError
+from django.db import transaction
 from rest_framework import serializers
-from .models import Payment, Property, Lease
+import datetime
+from core.instrumentation import timed
+from .models import Payment, Property, Lease, RentRollEntry, AuditEntry
+from . import audit
+
+
+class _PrefetchedObjects:
+    """Stands in for a related field's queryset, answering get(pk=...) from a dict."""
+
+    def __init__(self, objects):
+        self.objects = objects
+
+    def get(self, pk):
+        try:
+            return self.objects[int(pk)]
+        except KeyError:
+            raise ObjectDoesNotExist
+
+    def __iter__(self):
+        return iter(self.objects.values())
+
+
+class PrefetchedRelationsListSerializer(serializers.ListSerializer):
+    """
+    many=True serializer that resolves every primary key relation of the batch
+    with one in_bulk() query per field instead of one get() per item.
+    """
+
+    def prefetch_relations(self, data):
+        for name, field in self.child.fields.items():
+            if field.read_only or not isinstance(field, serializers.PrimaryKeyRelatedField):
+                continue
+            pks = {
+                int(item[name]) for item in data
+                if isinstance(item, dict) and str(item.get(name, '')).isdigit()
+            }
+            field.queryset = _PrefetchedObjects(field.get_queryset().in_bulk(pks))
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            self.prefetch_relations(data)
+        return super().to_internal_value(data)
+
+    def to_representation(self, data):
+        with timed('serialize'):
+            return super().to_representation(data)
+
 
 class PropertySerializer(serializers.ModelSerializer):
   class Meta:
     model = Property
     fields = ['id', 'address', 'description', 'property_type', 'status', 'area', 'num_of_rooms']
+    list_serializer_class = PrefetchedRelationsListSerializer
+
+class AuditedSerializerMixin:
+    """Records an audit entry for every instance the serializer creates or updates."""
+
+    def create(self, validated_data):
+        with transaction.atomic():
+            instance = super().create(validated_data)
+            audit.record([audit.change('create', instance)])
+        return instance
 
-class LeaseSerializer(serializers.ModelSerializer):
+    def update(self, instance, validated_data):
+        before = audit.snapshot(instance)
+        with transaction.atomic():
+            instance = super().update(instance, validated_data)
+            audit.record([audit.change('update', instance, before)])
+        return instance
+
+
+class LeaseSerializer(AuditedSerializerMixin, serializers.ModelSerializer):
     class Meta:
       model = Lease
       fields = ['id', 'tenant', 'property', 'start_date', 'end_date', 'rate_amount', 'active_lease']
+      list_serializer_class = PrefetchedRelationsListSerializer
+
+    def validate(self, attrs):
+      default_start = self.instance.start_date if self.instance else datetime.date.today()
+      start_date = attrs.get('start_date', default_start)
+      try:
+        Lease.check_dates(start_date, attrs['end_date'])
+      except DjangoValidationError as e:
+        raise serializers.ValidationError(e.messages)
+      return attrs
+
+    def save(self, **kwargs):
+      # The database refuses active leases overlapping another one, see Lease.save
+      try:
+        return super().save(**kwargs)
+      except DjangoValidationError as e:
+        raise serializers.ValidationError(e.messages)
 
-class PaymentSerializer(serializers.ModelSerializer):
-    status = serializers.CharField(read_only=True)
+class PaymentSerializer(AuditedSerializerMixin, serializers.ModelSerializer):
+    status = serializers.SerializerMethodField()
 
     class Meta:
       model = Payment
       fields = ['id', 'lease', 'amount', 'due_date', 'payment_date', 'is_paid', 'status']
+      list_serializer_class = PrefetchedRelationsListSerializer
+
+    def get_status(self, obj):
+      # Prefer the status computed by the query over the nightly stored one
+      return getattr(obj, 'live_status', obj.status)
 
 
 class LeaseDetailSerializer(serializers.ModelSerializer):
@@ -26,4 +114,22 @@ class LeaseDetailSerializer(serializers.ModelSerializer):
     class Meta:
         model = Lease
         fields = ['id','tenant','property','start_date','end_date','rate_amount','active_lease','payments',
-        ]
\ No newline at end of file
+        ]
+
+
+class RentRollEntrySerializer(serializers.ModelSerializer):
+    property = serializers.IntegerField(source='lease.property_id', read_only=True)
+    address = serializers.CharField(source='lease.property.address', read_only=True, default=None)
+    tenant = serializers.IntegerField(source='lease.tenant_id', read_only=True)
+
+    class Meta:
+      model = RentRollEntry
+      fields = ['id', 'lease', 'property', 'address', 'tenant', 'month', 'expected', 'paid', 'arrears']
+
+
+class AuditEntrySerializer(serializers.ModelSerializer):
+    lease = serializers.IntegerField(source='lease_id', read_only=True)
+
+    class Meta:
+      model = AuditEntry
+      fields = ['id', 'created_at', 'user', 'model', 'object_id', 'lease', 'action', 'changes']
@@ -0,0 +1,89 @@
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .cache import invalidate_owner
+from .models import Property, Lease, Payment
+from .reports import refresh_rent_roll
+
+# Owner lookups are memoized in the cache so that cascades, which send a
+# post_delete per payment, do not run a query per row.
+
+
+def _property_owner_key(property_id):
+  return f'properties:property:{property_id}:owner'
+
+
+def _lease_owner_key(lease_id):
+  return f'properties:lease:{lease_id}:owner'
+
+
+def _property_owner(property_id):
+  if property_id is None:
+    return None
+  key = _property_owner_key(property_id)
+  owner_id = cache.get(key)
+  if owner_id is None:
+    owner_id = Property.objects.filter(pk=property_id).values_list('owner_id', flat=True).first()
+    cache.set(key, owner_id)
+  return owner_id
+
+
+def _lease_owner(lease_id):
+  key = _lease_owner_key(lease_id)
+  owner_id = cache.get(key)
+  if owner_id is None:
+    owner_id = Lease.objects.filter(pk=lease_id).values_list('property__owner_id', flat=True).first()
+    cache.set(key, owner_id)
+  return owner_id
+
+
+@receiver(post_save, sender=Property)
+@receiver(post_delete, sender=Property)
+def invalidate_property_owner(sender, instance, **kwargs):
+  cache.set(_property_owner_key(instance.pk), instance.owner_id)
+  invalidate_owner(instance.owner_id)
+  loaded_owner_id = getattr(instance, '_loaded_owner_id', None)
+  if loaded_owner_id is not None and loaded_owner_id != instance.owner_id:
+    invalidate_owner(loaded_owner_id)
+    # The memoized owners of its leases changed too
+    cache.delete_many([_lease_owner_key(pk) for pk in instance.leases.values_list('pk', flat=True)])
+  instance._loaded_owner_id = instance.owner_id
+
+
+@receiver(post_save, sender=Lease)
+@receiver(post_delete, sender=Lease)
+def invalidate_lease_owner(sender, instance, **kwargs):
+  if Lease.property.is_cached(instance) and instance.property is not None:
+    owner_id = instance.property.owner_id
+  else:
+    owner_id = _property_owner(instance.property_id)
+  cache.set(_lease_owner_key(instance.pk), owner_id)
+  invalidate_owner(owner_id)
+  # A lease moved to another owner's property leaves the previous owner's lists stale
+  loaded_property_id = getattr(instance, '_loaded_property_id', None)
+  if loaded_property_id is not None and loaded_property_id != instance.property_id:
+    invalidate_owner(_property_owner(loaded_property_id))
+
+
+@receiver(post_save, sender=Payment)
+@receiver(post_delete, sender=Payment)
+def invalidate_payment_owner(sender, instance, **kwargs):
+  invalidate_owner(_lease_owner(instance.lease_id))
+  loaded_lease_id = getattr(instance, '_loaded_lease_id', None)
+  if loaded_lease_id is not None and loaded_lease_id != instance.lease_id:
+    invalidate_owner(_lease_owner(loaded_lease_id))
+
+
+@receiver(post_save, sender=Payment)
+def refresh_payment_rent_roll(sender, instance, **kwargs):
+  refresh_rent_roll({instance.lease_id, getattr(instance, '_loaded_lease_id', None)})
+  instance._loaded_lease_id = instance.lease_id
+
+
+@receiver(post_delete, sender=Payment)
+def refresh_deleted_payment_rent_roll(sender, instance, origin=None, **kwargs):
+  # When a lease or property goes, its ledger rows go with it by cascade,
+  # after reports.retire_rent_roll took them out of the owner's totals.
+  # Queryset deletes refresh the leases they touch once themselves.
+  if isinstance(origin, Payment):
+    refresh_rent_roll([instance.lease_id])
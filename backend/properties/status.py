@@ -0,0 +1,84 @@
+import datetime
+from django.db import connection
+from django.db.models import Max, Min, Q
+from .models import Property, Lease, Payment
+
+
+STATUS_SQL = """
+  UPDATE {property} AS p
+  SET status = s.status
+  FROM (
+    SELECT pr.id,
+      CASE
+        WHEN bool_or(l.id IS NOT NULL) THEN 'rented'
+        WHEN pr.status = 'under_renovation' THEN 'under_renovation'
+        ELSE 'available'
+      END AS status
+    FROM {property} AS pr
+    LEFT JOIN {lease} AS l
+      ON l.property_id = pr.id AND l.active_lease AND l.end_date >= %(today)s
+    {where}
+    GROUP BY pr.id
+  ) AS s
+  WHERE p.id = s.id AND p.status <> s.status
+"""
+
+
+def id_chunks(model, chunk_size):
+  """Yield half-open (low, high) primary key ranges covering every row of `model`."""
+  bounds = model.objects.aggregate(low=Min('pk'), high=Max('pk'))
+  if bounds['low'] is None:
+    return
+  for low in range(bounds['low'], bounds['high'] + 1, chunk_size):
+    yield low, low + chunk_size
+
+
+def refresh_property_status(property_ids=None, id_range=None, today=None):
+  """
+  Recompute Property.status for a set of properties with one UPDATE ... FROM.
+
+  A property is 'rented' while it has an active lease that has not ended,
+  otherwise 'available'; 'under_renovation' is kept until a lease is active.
+  Limit the update with property_ids or a half-open id_range, or pass
+  neither to refresh every property. Only rows whose status actually changes
+  are written. Returns the number of updated properties.
+  """
+  params = {'today': today or datetime.date.today()}
+  conditions = []
+  if property_ids is not None:
+    params['ids'] = [pk for pk in property_ids if pk is not None]
+    if not params['ids']:
+      return 0
+    conditions.append('pr.id = ANY(%(ids)s)')
+  if id_range is not None:
+    params['low'], params['high'] = id_range
+    conditions.append('pr.id >= %(low)s AND pr.id < %(high)s')
+  where = 'WHERE ' + ' AND '.join(conditions) if conditions else ''
+
+  sql = STATUS_SQL.format(property=Property._meta.db_table, lease=Lease._meta.db_table, where=where)
+  with connection.cursor() as cursor:
+    cursor.execute(sql, params)
+    return cursor.rowcount
+
+
+def refresh_payment_status(payment_ids=None, id_range=None, today=None):
+  """
+  Bring the stored Payment.status up to date for the given payments, an id
+  range, or every payment, writing only rows whose status changed.
+  Returns the number of updated payments.
+  """
+  status = Payment.objects.status_expression(today)
+  payments = Payment.objects.all()
+  if payment_ids is not None:
+    payments = payments.filter(pk__in=payment_ids)
+  if id_range is not None:
+    payments = payments.filter(pk__gte=id_range[0], pk__lt=id_range[1])
+  return payments.filter(~Q(status=status)).update(status=status)
+
+
+def deactivate_expired_leases(id_range=None, today=None):
+  """Clear active_lease on leases whose end_date has passed. Returns the count."""
+  leases = Lease.objects.filter(active_lease=True, end_date__lt=today or datetime.date.today())
+  if id_range is not None:
+    leases = leases.filter(pk__gte=id_range[0], pk__lt=id_range[1])
+  return leases.update(active_lease=False)
@@ -0,0 +1,162 @@
+from django.db import DatabaseError, connection, transaction
+from django.test.utils import CaptureQueriesContext
+from unittest import mock
+from django.urls import reverse
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from ..models import Property, Lease, Payment, AuditEntry
+import datetime
+from decimal import Decimal
+
+User = get_user_model()
+
+class AuditTrailTests(APITestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(
+            username='owner1',
+            email='owner1@example.com',
+            password='password123'
+        )
+        self.tenant = User.objects.create_user(
+            username='tenant1',
+            email='tenant1@example.com',
+            password='password123'
+        )
+        self.property = Property.objects.create(
+            address='1 Audit Alley', owner=self.owner, property_type='apartment', status='available',
+            area=60, num_of_rooms=2
+        )
+        self.start = datetime.date.today() + datetime.timedelta(days=1)
+        self.lease = Lease.objects.create(
+            property=self.property,
+            tenant=self.tenant,
+            start_date=self.start,
+            end_date=self.start + datetime.timedelta(days=365),
+            rate_amount=1000,
+        )
+        self.payments = Payment.objects.bulk_create([
+            Payment(lease=self.lease, amount=Decimal('1000.00'), due_date=self.start + datetime.timedelta(days=30 * i))
+            for i in range(3)
+        ])
+
+        self.client = APIClient()
+        response = self.client.post(reverse('token_obtain_pair'), {
+            'username': 'owner1',
+            'password': 'password123'
+        })
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+
+    def request(self, method, url, data=None):
+        return getattr(self.client, method)(url, data, format='json')
+
+    def payment_data(self, payment, **overrides):
+        return {
+            'lease': self.lease.id, 'amount': str(payment.amount), 'due_date': payment.due_date.isoformat(),
+            'is_paid': payment.is_paid, **overrides,
+        }
+
+    def test_update_records_changed_fields_only(self):
+        payment = self.payments[0]
+        paid_on = self.start.isoformat()
+        url = reverse('payment-detail', args=[payment.id])
+        response = self.request('put', url, self.payment_data(payment, is_paid=True, payment_date=paid_on))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        entry = AuditEntry.objects.get()
+        self.assertEqual((entry.model, entry.object_id, entry.lease_id, entry.action), ('payment', payment.id, self.lease.id, 'update'))
+        self.assertEqual(entry.changes, {'payment_date': [None, paid_on], 'is_paid': [False, True]})
+        self.assertEqual(entry.user, self.owner)
+        self.assertEqual(entry.month, datetime.date.today().replace(day=1))
+
+        # Saving the same values again changes nothing
+        response = self.request('put', url, self.payment_data(payment, is_paid=True, payment_date=paid_on))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(AuditEntry.objects.count(), 1)
+
+    def test_lease_create_and_delete(self):
+        start = self.start + datetime.timedelta(days=400)
+        data = {
+            'tenant': self.tenant.id, 'property': self.property.id, 'start_date': start.isoformat(),
+            'end_date': (start + datetime.timedelta(days=30)).isoformat(), 'rate_amount': '900.00',
+        }
+        response = self.request('post', reverse('lease-list'), data)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        lease_id = response.data['id']
+        created = AuditEntry.objects.get(action='create')
+        self.assertEqual(created.object_id, lease_id)
+        self.assertEqual(created.changes['rate_amount'], [None, '900.00'])
+        self.assertEqual(created.changes['tenant'], [None, self.tenant.id])
+
+        response = self.request('delete', reverse('lease-detail', args=[lease_id]))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        deleted = AuditEntry.objects.get(action='delete')
+        self.assertEqual(deleted.object_id, lease_id)
+        self.assertEqual(deleted.changes['start_date'], [start.isoformat(), None])
+
+    def test_batch_is_written_with_one_insert(self):
+        operations = [
+            {'op': 'update', 'id': payment.id, 'data': self.payment_data(payment, amount='1100.00')}
+            for payment in self.payments[:2]
+        ] + [{'op': 'delete', 'id': self.payments[2].id}]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.request('post', reverse('payment-batch'), operations)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        inserts = [q['sql'] for q in queries if q['sql'].startswith(f'INSERT INTO "{AuditEntry._meta.db_table}"')]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(
+            sorted(AuditEntry.objects.values_list('action', 'object_id')),
+            sorted([('update', self.payments[0].id), ('update', self.payments[1].id), ('delete', self.payments[2].id)]),
+        )
+        self.assertEqual(AuditEntry.objects.filter(action='update').first().changes, {'amount': ['1000.00', '1100.00']})
+
+    def test_rejected_batch_records_nothing(self):
+        operations = [
+            {'op': 'update', 'id': self.payments[0].id, 'data': self.payment_data(self.payments[0], amount='1.00')},
+            {'op': 'update', 'id': self.payments[1].id, 'data': self.payment_data(self.payments[1], amount='-5')},
+        ]
+        response = self.request('post', reverse('payment-batch'), operations)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(AuditEntry.objects.exists())
+
+    def test_failed_entry_rolls_back_the_change(self):
+        payment = self.payments[0]
+        url = reverse('payment-detail', args=[payment.id])
+        with mock.patch.object(AuditEntry.objects, 'bulk_create', side_effect=DatabaseError('audit insert failed')):
+            with self.assertRaises(DatabaseError):
+                self.request('put', url, self.payment_data(payment, is_paid=True))
+            with self.assertRaises(DatabaseError):
+                self.request('delete', reverse('lease-detail', args=[self.lease.id]))
+        payment.refresh_from_db()
+        self.assertFalse(payment.is_paid)
+        self.assertTrue(Lease.objects.filter(id=self.lease.id).exists())
+
+    def test_entries_are_append_only(self):
+        self.request('delete', reverse('payment-detail', args=[self.payments[0].id]))
+        entry = AuditEntry.objects.get()
+        for write in (lambda: AuditEntry.objects.update(action='update'), entry.delete):
+            with self.assertRaises(DatabaseError), transaction.atomic():
+                write()
+        self.assertEqual(AuditEntry.objects.get().action, 'delete')
+
+    def test_audit_log_endpoint(self):
+        payment = self.payments[0]
+        self.request('put', reverse('payment-detail', args=[payment.id]), self.payment_data(payment, is_paid=True))
+        other = User.objects.create_user(username='owner2', email='owner2@example.com', password='password123')
+        AuditEntry.objects.create(
+            created_at=datetime.datetime.now(datetime.timezone.utc), month=datetime.date.today().replace(day=1),
+            user=other, model='lease', object_id=1, lease_id=1, action='create', changes={},
+        )
+
+        response = self.client.get(reverse('audit-log'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([e['object_id'] for e in response.data['results']], [payment.id])
+        self.assertEqual(response.data['results'][0]['lease'], self.lease.id)
+
+        response = self.client.get(reverse('audit-log'), {'lease': self.lease.id, 'model': 'lease'})
+        self.assertEqual(response.data['results'], [])
+        last_year = (datetime.date.today().replace(day=1) - datetime.timedelta(days=360)).strftime('%Y-%m')
+        response = self.client.get(reverse('audit-log'), {'month': last_year})
+        self.assertEqual(response.data['results'], [])
+        response = self.client.get(reverse('audit-log'), {'month': 'soon'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
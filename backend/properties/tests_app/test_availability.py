@@ -0,0 +1,160 @@
+from django.db import IntegrityError
+from django.urls import reverse
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from ..models import Property, Lease
+from ..availability import merge_periods
+import datetime
+
+User = get_user_model()
+
+class LeaseAvailabilityTests(APITestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(
+            username='owner1',
+            email='owner1@example.com',
+            password='password123'
+        )
+        self.tenant = User.objects.create_user(
+            username='tenant1',
+            email='tenant1@example.com',
+            password='password123'
+        )
+        self.property = Property.objects.create(
+            address='1 Free St', owner=self.owner, property_type='apartment', status='available', area=50, num_of_rooms=2
+        )
+        self.start = datetime.date.today() + datetime.timedelta(days=10)
+        self.end = self.start + datetime.timedelta(days=89)
+        self.lease = Lease.objects.create(
+            property=self.property,
+            tenant=self.tenant,
+            start_date=self.start,
+            end_date=self.end,
+            rate_amount=1000,
+            active_lease=True,
+        )
+
+        self.client = APIClient()
+        response = self.client.post(reverse('token_obtain_pair'), {
+            'username': 'owner1',
+            'password': 'password123'
+        })
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+        self.url = reverse('property-availability', kwargs={'id': self.property.pk})
+
+    def check(self, start_date, end_date, **params):
+        return self.client.get(self.url, {'start_date': start_date, 'end_date': end_date, **params})
+
+    def test_database_rejects_overlapping_active_leases(self):
+        # bulk_create skips Lease.save, the constraint still applies
+        with self.assertRaises(IntegrityError):
+            Lease.objects.bulk_create([Lease(
+                property=self.property,
+                tenant=self.tenant,
+                start_date=self.end,
+                end_date=self.end + datetime.timedelta(days=30),
+                rate_amount=1000,
+                active_lease=True,
+            )])
+
+    def test_availability(self):
+        day = datetime.timedelta(days=1)
+        # JWT user lookup + one query for the property and its overlapping leases
+        with self.assertNumQueries(2):
+            response = self.check(self.end, self.end + 30 * day)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['available'], False)
+        self.assertEqual(response.data['conflicting_leases'], [self.lease.pk])
+
+        # Both ends of a lease are booked
+        response = self.check(self.end + day, self.end + 30 * day)
+        self.assertEqual(response.data['available'], True)
+        self.assertEqual(response.data['conflicting_leases'], [])
+        response = self.check(self.start - 5 * day, self.start - day)
+        self.assertEqual(response.data['available'], True)
+
+        # Moving the lease itself does not conflict with its old dates
+        response = self.check(self.start + day, self.end + day, exclude_lease=self.lease.pk)
+        self.assertEqual(response.data['available'], True)
+
+    def test_validation_and_ownership(self):
+        self.assertEqual(self.check(self.end, self.start).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_400_BAD_REQUEST)
+
+        other = User.objects.create_user(username='owner2', email='owner2@example.com', password='password123')
+        foreign = Property.objects.create(
+            address='9 Other St', owner=other, property_type='room', status='available', area=10, num_of_rooms=1
+        )
+        url = reverse('property-availability', kwargs={'id': foreign.pk})
+        response = self.client.get(url, {'start_date': self.start, 'end_date': self.end})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class PortfolioCalendarTests(APITestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(
+            username='owner1',
+            email='owner1@example.com',
+            password='password123'
+        )
+        tenant = User.objects.create_user(
+            username='tenant1',
+            email='tenant1@example.com',
+            password='password123'
+        )
+        self.busy, self.empty = Property.objects.bulk_create([
+            Property(address='1 Busy St', owner=self.owner, property_type='apartment', status='rented', area=50, num_of_rooms=2),
+            Property(address='2 Empty St', owner=self.owner, property_type='room', status='available', area=15, num_of_rooms=1),
+        ])
+        d = datetime.date
+        # bulk_create skips Lease.save, so the first lease can have started already
+        Lease.objects.bulk_create([
+            Lease(property=self.busy, tenant=tenant, start_date=start, end_date=end, rate_amount=900, active_lease=active)
+            for start, end, active in [
+                (d(2029, 12, 1), d(2030, 2, 28), True),
+                (d(2030, 3, 1), d(2030, 3, 31), True),
+                (d(2030, 4, 10), d(2030, 4, 20), False),
+                (d(2030, 5, 1), d(2031, 4, 30), True),
+            ]
+        ])
+
+        self.client = APIClient()
+        response = self.client.post(reverse('token_obtain_pair'), {
+            'username': 'owner1',
+            'password': 'password123'
+        })
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+
+    def test_merge_periods(self):
+        d = datetime.date
+        occupied, free = merge_periods(
+            [(d(2030, 1, 1), d(2030, 1, 10)), (d(2030, 1, 5), d(2030, 1, 8)), (d(2030, 1, 11), d(2030, 1, 12))],
+            d(2030, 1, 3), d(2030, 1, 31),
+        )
+        self.assertEqual(occupied, [(d(2030, 1, 3), d(2030, 1, 12))])
+        self.assertEqual(free, [(d(2030, 1, 13), d(2030, 1, 31))])
+        self.assertEqual(merge_periods([], d(2030, 1, 1), d(2030, 1, 1)), ([], [(d(2030, 1, 1), d(2030, 1, 1))]))
+
+    def test_calendar(self):
+        # JWT user lookup + properties + leases
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('portfolio-calendar'), {'start_date': '2030-01-01', 'months': 6})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['end_date'], datetime.date(2030, 6, 30))
+        busy, empty = response.data['properties']
+        self.assertEqual(busy['property'], self.busy.pk)
+        # Back to back leases merge, inactive ones are ignored, both are clipped to the window
+        self.assertEqual(busy['occupied'], [
+            {'start': '2030-01-01', 'end': '2030-03-31'},
+            {'start': '2030-05-01', 'end': '2030-06-30'},
+        ])
+        self.assertEqual(busy['free'], [{'start': '2030-04-01', 'end': '2030-04-30'}])
+        self.assertEqual(empty['occupied'], [])
+        self.assertEqual(empty['free'], [{'start': '2030-01-01', 'end': '2030-06-30'}])
+
+    def test_window_validation(self):
+        url = reverse('portfolio-calendar')
+        self.assertEqual(self.client.get(url, {'start_date': '2030-01-01', 'end_date': '2029-12-31'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'start_date': '2030-01-01', 'end_date': '2033-01-01'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'months': 37}).status_code, 400)
@@ -0,0 +1,163 @@
+from django.urls import reverse
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from ..models import Property, Lease, Payment
+import datetime
+from decimal import Decimal
+
+User = get_user_model()
+
+class BatchAPITests(APITestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(
+            username='owner1',
+            email='owner1@example.com',
+            password='password123'
+        )
+        self.tenant = User.objects.create_user(
+            username='tenant1',
+            email='tenant1@example.com',
+            password='password123'
+        )
+        self.property = Property.objects.create(
+            address='10 Batch Blvd',
+            owner=self.owner,
+            property_type='apartment',
+            status='available',
+            area=70,
+            num_of_rooms=3,
+        )
+        self.start = datetime.date.today() + datetime.timedelta(days=1)
+        self.lease = Lease.objects.create(
+            property=self.property,
+            tenant=self.tenant,
+            start_date=self.start,
+            end_date=self.start + datetime.timedelta(days=365),
+            rate_amount=1000,
+            active_lease=False
+        )
+        self.payment = Payment.objects.create(
+            lease=self.lease,
+            amount=Decimal('1000.00'),
+            due_date=self.start,
+        )
+
+        self.client = APIClient()
+        response = self.client.post(reverse('token_obtain_pair'), {
+            'username': 'owner1',
+            'password': 'password123'
+        })
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+
+    def payment_data(self, **overrides):
+        data = {'lease': self.lease.id, 'amount': '1000.00', 'due_date': self.start.isoformat(), 'is_paid': False}
+        data.update(overrides)
+        return data
+
+    def test_payment_batch_applies_all_operations(self):
+        operations = [
+            {'op': 'create', 'data': self.payment_data()} for _ in range(50)
+        ] + [
+            {'op': 'update', 'id': self.payment.id, 'data': self.payment_data(is_paid=True)},
+        ]
+        response = self.client.post(reverse('payment-batch'), operations, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 51)
+        self.assertEqual(response.data[0]['status'], 201)
+        self.assertEqual(response.data[-1]['status'], 200)
+        self.assertTrue(response.data[-1]['data']['is_paid'])
+        self.assertEqual(response.data[-1]['data']['status'], 'paid')
+        self.payment.refresh_from_db()
+        self.assertEqual(self.payment.status, 'paid')
+        self.assertEqual(Payment.objects.count(), 51)
+
+    def test_payment_batch_query_count_is_constant(self):
+        operations = [{'op': 'create', 'data': self.payment_data()} for _ in range(200)]
+        # auth, lease in_bulk, savepoint + INSERT + payment status UPDATE
+        # + rent roll lock and refresh + audit INSERT + release
+        with self.assertNumQueries(9):
+            response = self.client.post(reverse('payment-batch'), operations, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_invalid_item_rolls_back_whole_batch(self):
+        operations = [
+            {'op': 'create', 'data': self.payment_data()},
+            {'op': 'create', 'data': self.payment_data(amount='-5')},
+            {'op': 'delete', 'id': self.payment.id},
+            {'op': 'delete', 'id': 999999},
+        ]
+        response = self.client.post(reverse('payment-batch'), operations, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data[0], {})
+        self.assertIn('amount', response.data[1])
+        self.assertEqual(response.data[2], {})
+        self.assertIn('id', response.data[3])
+        self.assertEqual(Payment.objects.count(), 1)
+
+    def test_cannot_attach_payment_to_foreign_lease(self):
+        other = User.objects.create_user(username='owner2', email='owner2@example.com', password='password123')
+        prop = Property.objects.create(
+            address='11 Batch Blvd', owner=other, property_type='room', status='available', area=20, num_of_rooms=1
+        )
+        lease = Lease.objects.create(
+            property=prop, tenant=self.tenant, start_date=self.start,
+            end_date=self.start + datetime.timedelta(days=30), rate_amount=100
+        )
+        response = self.client.post(
+            reverse('payment-batch'), [{'op': 'create', 'data': self.payment_data(lease=lease.id)}], format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('lease', response.data[0])
+
+    def test_lease_batch_refreshes_property_status(self):
+        operations = [{
+            'op': 'update',
+            'id': self.lease.id,
+            'data': {
+                'property': self.property.id,
+                'tenant': self.tenant.id,
+                'start_date': self.start.isoformat(),
+                'end_date': (self.start + datetime.timedelta(days=365)).isoformat(),
+                'rate_amount': '1000.00',
+                'active_lease': True,
+            },
+        }]
+        response = self.client.post(reverse('lease-batch'), operations, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.property.refresh_from_db()
+        self.assertEqual(self.property.status, 'rented')
+
+        response = self.client.post(reverse('lease-batch'), [{'op': 'delete', 'id': self.lease.id}], format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.property.refresh_from_db()
+        self.assertEqual(self.property.status, 'available')
+
+    def test_lease_batch_rejects_overlaps(self):
+        data = {
+            'property': self.property.id,
+            'tenant': self.tenant.id,
+            'start_date': self.start.isoformat(),
+            'end_date': (self.start + datetime.timedelta(days=30)).isoformat(),
+            'rate_amount': '1000.00',
+            'active_lease': True,
+        }
+        operations = [{'op': 'create', 'data': data}, {'op': 'create', 'data': data}]
+        response = self.client.post(reverse('lease-batch'), operations, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Lease.objects.count(), 1)
+
+    def test_lease_batch_rejects_past_dates(self):
+        operations = [{
+            'op': 'create',
+            'data': {
+                'property': self.property.id,
+                'tenant': self.tenant.id,
+                'start_date': '2000-01-01',
+                'end_date': '2000-12-31',
+                'rate_amount': '1000.00',
+            },
+        }]
+        response = self.client.post(reverse('lease-batch'), operations, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('non_field_errors', response.data[0])
@@ -0,0 +1,124 @@
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from ..models import Property, Lease, Payment
+import datetime
+from decimal import Decimal
+
+User = get_user_model()
+
+class ResponseCacheTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.owner = User.objects.create_user(
+            username='owner1',
+            email='owner1@example.com',
+            password='password123'
+        )
+        self.tenant = User.objects.create_user(
+            username='tenant1',
+            email='tenant1@example.com',
+            password='password123'
+        )
+        self.property = Property.objects.create(
+            address='5 Cache Ct',
+            owner=self.owner,
+            property_type='apartment',
+            status='available',
+            area=50,
+            num_of_rooms=2,
+        )
+        start = datetime.date.today() + datetime.timedelta(days=1)
+        self.lease = Lease.objects.create(
+            property=self.property,
+            tenant=self.tenant,
+            start_date=start,
+            end_date=start + datetime.timedelta(days=90),
+            rate_amount=800,
+        )
+        self.payment = Payment.objects.create(lease=self.lease, amount=Decimal('800.00'), due_date=start)
+
+        self.client = APIClient()
+        response = self.client.post(reverse('token_obtain_pair'), {
+            'username': 'owner1',
+            'password': 'password123'
+        })
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+
+    def test_second_request_is_served_from_cache(self):
+        first = self.client.get(reverse('payment-list'))
+        # the JWT user comes from the cache as well
+        with self.assertNumQueries(0):
+            second = self.client.get(reverse('payment-list'))
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(first['ETag'], second['ETag'])
+
+    def test_if_none_match_returns_304(self):
+        etag = self.client.get('/properties/api/')['ETag']
+        response = self.client.get('/properties/api/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_query_params_are_part_of_the_key(self):
+        paid = self.client.get(reverse('payment-list'), {'is_paid': 'true'})
+        unpaid = self.client.get(reverse('payment-list'), {'is_paid': 'false'})
+        self.assertEqual(len(paid.data['results']), 0)
+        self.assertEqual(len(unpaid.data['results']), 1)
+        self.assertNotEqual(paid['ETag'], unpaid['ETag'])
+
+    def test_save_invalidates_owner_lists(self):
+        etag = self.client.get(reverse('payment-list'))['ETag']
+        self.payment.is_paid = True
+        self.payment.save()
+        response = self.client.get(reverse('payment-list'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0]['status'], 'paid')
+
+    def test_delete_cascade_invalidates(self):
+        self.client.get(reverse('payment-list'))
+        self.lease.delete()
+        response = self.client.get(reverse('payment-list'))
+        self.assertEqual(response.data['results'], [])
+
+    def test_batch_invalidates(self):
+        self.client.get(reverse('payment-list'))
+        self.client.post(reverse('payment-batch'), [{'op': 'delete', 'id': self.payment.id}], format='json')
+        response = self.client.get(reverse('payment-list'))
+        self.assertEqual(response.data['results'], [])
+
+    def test_moves_invalidate_the_previous_owner(self):
+        other = User.objects.create_user(username='owner2', email='owner2@example.com', password='password123')
+        other_property = Property.objects.create(
+            address='6 Cache Ct', owner=other, property_type='apartment', status='available', area=50, num_of_rooms=2
+        )
+        self.assertEqual(len(self.client.get(reverse('lease-list')).data['results']), 1)
+        lease = Lease.objects.get(pk=self.lease.pk)
+        lease.property = other_property
+        lease.save()
+        self.assertEqual(self.client.get(reverse('lease-list')).data['results'], [])
+
+        self.assertEqual(len(self.client.get('/properties/api/').data['results']), 1)
+        self.assertEqual(len(self.client.get(reverse('payment-list')).data['results']), 0)
+        property = Property.objects.get(pk=self.property.pk)
+        property.owner = other
+        property.save()
+        self.assertEqual(self.client.get('/properties/api/').data['results'], [])
+
+        # The lease's memoized owner follows the property: the new owner sees this change
+        other_property.owner = self.owner
+        other_property.save()
+        self.assertEqual(len(self.client.get(reverse('payment-list')).data['results']), 1)
+        payment = Payment.objects.get(pk=self.payment.pk)
+        payment.is_paid = True
+        payment.save()
+        self.assertEqual(self.client.get(reverse('payment-list')).data['results'][0]['status'], 'paid')
+
+    def test_other_owners_do_not_share_entries(self):
+        self.client.get('/properties/api/')
+        User.objects.create_user(username='owner2', email='owner2@example.com', password='password123')
+        client = APIClient()
+        response = client.post(reverse('token_obtain_pair'), {'username': 'owner2', 'password': 'password123'})
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+        self.assertEqual(client.get('/properties/api/').data['results'], [])
@@ -0,0 +1,141 @@
+import io
+import shutil
+import tempfile
+import time
+import zipfile
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from ..models import Property, Lease
+from ..contracts import contract_path, submit_contract
+import datetime
+
+User = get_user_model()
+
+class ContractPDFTests(APITestCase):
+    def setUp(self):
+        self.pdf_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.pdf_root, ignore_errors=True)
+        settings_override = override_settings(CONTRACT_PDF_ROOT=self.pdf_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.owner = User.objects.create_user(
+            username='owner1',
+            email='owner1@example.com',
+            password='password123'
+        )
+        self.tenant = User.objects.create_user(
+            username='tenant1',
+            email='tenant1@example.com',
+            first_name='Tenant',
+            last_name='One',
+            password='password123'
+        )
+        self.property = Property.objects.create(
+            address='1 Contract Way',
+            owner=self.owner,
+            property_type='apartment',
+            status='available',
+            area=55,
+            num_of_rooms=2,
+        )
+        start = datetime.date.today() + datetime.timedelta(days=1)
+        self.lease = Lease.objects.create(
+            property=self.property,
+            tenant=self.tenant,
+            start_date=start,
+            end_date=start + datetime.timedelta(days=365),
+            rate_amount=1000,
+        )
+
+        self.client = APIClient()
+        response = self.client.post(reverse('token_obtain_pair'), {
+            'username': 'owner1',
+            'password': 'password123'
+        })
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+        self.url = reverse('lease_contract_pdf', kwargs={'pk': self.lease.pk})
+
+    def get_pdf(self):
+        # Polled like a client would, the first request only queues the rendering
+        deadline = time.monotonic() + 60
+        response = self.client.get(self.url)
+        while response.status_code == status.HTTP_202_ACCEPTED and time.monotonic() < deadline:
+            time.sleep(0.1)
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        return b''.join(response.streaming_content)
+
+    def test_pdf_is_cached_until_lease_changes(self):
+        first = self.get_pdf()
+        self.assertTrue(first.startswith(b'%PDF'))
+        self.lease = Lease.objects.select_related('property', 'tenant').get(pk=self.lease.pk)
+        path = contract_path(self.lease)
+        self.assertTrue(path.exists())
+        mtime = path.stat().st_mtime_ns
+
+        self.assertEqual(self.get_pdf(), first)
+        self.assertEqual(path.stat().st_mtime_ns, mtime)
+
+        self.lease.rate_amount = 1200
+        self.lease.save()
+        self.get_pdf()
+        self.lease.refresh_from_db()
+        new_path = contract_path(self.lease)
+        self.assertNotEqual(new_path, path)
+        self.assertTrue(new_path.exists())
+        self.assertFalse(path.exists())
+
+    def test_missing_pdf_is_not_waited_for(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response['Retry-After'], '2')
+        # Concurrent misses share the rendering queued by the first
+        lease = Lease.objects.select_related('property', 'tenant').get(pk=self.lease.pk)
+        future = submit_contract(lease)
+        self.assertIs(submit_contract(lease), future)
+        future.result(timeout=60)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+
+    def test_tenant_change_invalidates(self):
+        path = contract_path(self.lease)
+        self.tenant.last_name = 'Renamed'
+        self.tenant.save()
+        self.lease.refresh_from_db()
+        self.assertNotEqual(contract_path(self.lease), path)
+
+    def test_unrelated_user_is_rejected(self):
+        User.objects.create_user(username='other', email='other@example.com', password='password123')
+        client = APIClient()
+        response = client.post(reverse('token_obtain_pair'), {'username': 'other', 'password': 'password123'})
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+        self.assertEqual(client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_export_zip(self):
+        second = Lease.objects.create(
+            property=self.property,
+            tenant=self.tenant,
+            start_date=self.lease.start_date,
+            end_date=self.lease.end_date,
+            rate_amount=900,
+        )
+        # one cached, one rendered during the export
+        self.get_pdf()
+
+        response = self.client.get(reverse('lease-contract-export'), {'ids': f'{self.lease.pk},{second.pk}'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/zip')
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+        self.assertEqual(
+            sorted(archive.namelist()), sorted([f'lease-{self.lease.pk}.pdf', f'lease-{second.pk}.pdf'])
+        )
+        for name in archive.namelist():
+            self.assertTrue(archive.read(name).startswith(b'%PDF'))
+
+    def test_export_rejects_bad_ids(self):
+        response = self.client.get(reverse('lease-contract-export'), {'ids': '1,abc'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,85 @@
+from django.urls import reverse
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from ..models import Property, Lease, Payment
+import datetime
+from decimal import Decimal
+
+User = get_user_model()
+
+class DashboardSummaryTests(APITestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(
+            username='owner1',
+            email='owner1@example.com',
+            password='password123'
+        )
+        self.tenant = User.objects.create_user(
+            username='tenant1',
+            email='tenant1@example.com',
+            password='password123'
+        )
+        rented, _, _ = Property.objects.bulk_create([
+            Property(address='1 Sum St', owner=self.owner, property_type='apartment', status='rented', area=50, num_of_rooms=2),
+            Property(address='2 Sum St', owner=self.owner, property_type='apartment', status='available', area=50, num_of_rooms=2),
+            Property(address='3 Sum St', owner=self.owner, property_type='office', status='under_renovation', area=90, num_of_rooms=4),
+        ])
+        self.today = datetime.date.today()
+        this_month = self.today.replace(day=1)
+        last_month = (this_month - datetime.timedelta(days=1)).replace(day=1)
+        # bulk_create skips Lease.save, so the lease can have started already
+        lease = Lease.objects.bulk_create([Lease(
+            property=rented,
+            tenant=self.tenant,
+            start_date=last_month,
+            end_date=self.today + datetime.timedelta(days=300),
+            rate_amount=1000,
+            active_lease=True,
+        )])[0]
+        Payment.objects.bulk_create([
+            Payment(lease=lease, amount=Decimal('1000.00'), due_date=last_month, is_paid=True),
+            Payment(lease=lease, amount=Decimal('1000.00'), due_date=last_month + datetime.timedelta(days=1)),
+            Payment(lease=lease, amount=Decimal('1000.00'), due_date=this_month + datetime.timedelta(days=40)),
+        ])
+        self.last_month, self.this_month = last_month, this_month
+
+        other = User.objects.create_user(username='owner2', email='owner2@example.com', password='password123')
+        Property.objects.create(
+            address='9 Other St', owner=other, property_type='room', status='rented', area=10, num_of_rooms=1
+        )
+
+        self.client = APIClient()
+        response = self.client.post(reverse('token_obtain_pair'), {
+            'username': 'owner1',
+            'password': 'password123'
+        })
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+
+    def test_summary(self):
+        # JWT user lookup + the property and payment aggregates
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('dashboard-summary'), {'months': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.data
+        self.assertEqual(data['total_properties'], 3)
+        self.assertEqual(data['occupancy_rate'], round(1 / 3, 4))
+        self.assertEqual(data['by_status'], {'rented': 1, 'available': 1, 'under_renovation': 1})
+        self.assertEqual(data['by_property_type'], {'apartment': 2, 'office': 1})
+        self.assertEqual(data['monthly'], [
+            {'month': self.last_month.strftime('%Y-%m'), 'expected': '2000.00', 'collected': '1000.00'},
+            {'month': self.this_month.strftime('%Y-%m'), 'expected': '0.00', 'collected': '0.00'},
+        ])
+        self.assertEqual(data['overdue'], {'count': 1, 'amount': '1000.00'})
+
+    def test_empty_portfolio(self):
+        Property.objects.filter(owner=self.owner).delete()
+        response = self.client.get(reverse('dashboard-summary'))
+        self.assertEqual(response.data['total_properties'], 0)
+        self.assertEqual(response.data['occupancy_rate'], 0.0)
+        self.assertEqual(len(response.data['monthly']), 12)
+        self.assertEqual(response.data['overdue'], {'count': 0, 'amount': '0.00'})
+
+    def test_invalid_months(self):
+        response = self.client.get(reverse('dashboard-summary'), {'months': 100})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,99 @@
+import csv
+import io
+import json
+from django.urls import reverse
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from ..models import Property, Lease, Payment
+import datetime
+from decimal import Decimal
+
+User = get_user_model()
+
+class ExportTests(APITestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(
+            username='owner1',
+            email='owner1@example.com',
+            password='password123'
+        )
+        self.tenant = User.objects.create_user(
+            username='tenant1',
+            email='tenant1@example.com',
+            password='password123'
+        )
+        self.property = Property.objects.create(
+            address='7 Export Rd',
+            owner=self.owner,
+            property_type='apartment',
+            status='available',
+            area=65,
+            num_of_rooms=3,
+        )
+        self.start = datetime.date.today() + datetime.timedelta(days=1)
+        self.lease = Lease.objects.create(
+            property=self.property,
+            tenant=self.tenant,
+            start_date=self.start,
+            end_date=self.start + datetime.timedelta(days=365),
+            rate_amount=1000,
+        )
+        Payment.objects.bulk_create(
+            Payment(lease=self.lease, amount=Decimal('1000.00'), due_date=self.start, is_paid=i % 2 == 0)
+            for i in range(5)
+        )
+
+        self.client = APIClient()
+        response = self.client.post(reverse('token_obtain_pair'), {
+            'username': 'owner1',
+            'password': 'password123'
+        })
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+
+    def read(self, response):
+        return b''.join(response.streaming_content).decode()
+
+    def test_payments_csv(self):
+        response = self.client.get(reverse('export', kwargs={'resource': 'payments'}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        chunks = [chunk.decode() for chunk in response.streaming_content]
+        self.assertEqual(chunks[0], 'id,lease,amount,due_date,payment_date,is_paid,status\r\n')
+        rows = list(csv.DictReader(io.StringIO(''.join(chunks))))
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[0]['lease'], str(self.lease.pk))
+        self.assertEqual(rows[0]['amount'], '1000.00')
+        self.assertEqual(rows[0]['status'], 'paid')
+
+    def test_leases_ndjson_with_filters(self):
+        response = self.client.get(reverse('export', kwargs={'resource': 'leases'}), {'output': 'ndjson'})
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = [json.loads(line) for line in self.read(response).splitlines()]
+        self.assertEqual(lines, [{
+            'id': self.lease.pk,
+            'tenant': self.tenant.pk,
+            'property': self.property.pk,
+            'start_date': self.start.isoformat(),
+            'end_date': (self.start + datetime.timedelta(days=365)).isoformat(),
+            'rate_amount': '1000.00',
+            'active_lease': False,
+        }])
+
+        response = self.client.get(reverse('export', kwargs={'resource': 'payments'}), {'output': 'ndjson', 'is_paid': 'false'})
+        self.assertEqual(len(self.read(response).splitlines()), 2)
+
+    def test_only_own_rows(self):
+        User.objects.create_user(username='owner2', email='owner2@example.com', password='password123')
+        client = APIClient()
+        response = client.post(reverse('token_obtain_pair'), {'username': 'owner2', 'password': 'password123'})
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+        response = client.get(reverse('export', kwargs={'resource': 'properties'}))
+        self.assertEqual(self.read(response).splitlines(), [
+            'id,address,description,property_type,status,area,num_of_rooms'
+        ])
+
+    def test_unknown_resource_and_format(self):
+        self.assertEqual(self.client.get(reverse('export', kwargs={'resource': 'users'})).status_code, 404)
+        response = self.client.get(reverse('export', kwargs={'resource': 'leases'}), {'output': 'xml'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,101 @@
+from django.urls import reverse
+from rest_framework.test import APITestCase, APIClient
+from django.contrib.auth import get_user_model
+from ..models import Property, Lease, Payment
+from ..availability import add_months
+import datetime
+from decimal import Decimal
+
+User = get_user_model()
+
+class CashFlowForecastTests(APITestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(
+            username='owner1',
+            email='owner1@example.com',
+            password='password123'
+        )
+        other = User.objects.create_user(username='owner2', email='owner2@example.com', password='password123')
+        tenant = User.objects.create_user(username='tenant1', email='tenant1@example.com', password='password123')
+        flat, house, office, elsewhere = Property.objects.bulk_create([
+            Property(address='1 Forecast Way', owner=self.owner, property_type='apartment', area=50, num_of_rooms=2),
+            Property(address='2 Forecast Way', owner=self.owner, property_type='town_house', area=90, num_of_rooms=4),
+            Property(address='3 Forecast Way', owner=self.owner, property_type='office', area=70, num_of_rooms=3),
+            Property(address='4 Elsewhere St', owner=other, property_type='apartment', area=50, num_of_rooms=2),
+        ])
+        self.this_month = datetime.date.today().replace(day=1)
+        month = lambda months: add_months(self.this_month, months)
+        # Started in the past, so bulk_create skips Lease.check_dates
+        self.steady, self.risky, ended, foreign = Lease.objects.bulk_create([
+            # Runs for the first 6 months of the forecast
+            Lease(property=flat, tenant=tenant, start_date=month(-12), end_date=month(6) - datetime.timedelta(days=1),
+                  rate_amount=Decimal('1000.00'), active_lease=True),
+            Lease(property=house, tenant=tenant, start_date=month(-2), end_date=month(24) - datetime.timedelta(days=1),
+                  rate_amount=Decimal('500.00'), active_lease=True),
+            Lease(property=office, tenant=tenant, start_date=month(-12), end_date=month(-1),
+                  rate_amount=Decimal('9000.00'), active_lease=False),
+            Lease(property=elsewhere, tenant=tenant, start_date=month(-12), end_date=month(12),
+                  rate_amount=Decimal('9000.00'), active_lease=True),
+        ])
+        payments = [
+            Payment(lease=self.steady, amount=Decimal('1000.00'), due_date=month(-i), payment_date=month(-i), is_paid=True)
+            for i in range(1, 5)
+        ] + [
+            # Never paid, and paid five days late
+            Payment(lease=self.risky, amount=Decimal('500.00'), due_date=month(-2)),
+            Payment(lease=self.risky, amount=Decimal('500.00'), due_date=month(-1),
+                    payment_date=month(-1) + datetime.timedelta(days=5), is_paid=True),
+            # Not due yet, not part of the history
+            Payment(lease=self.risky, amount=Decimal('500.00'), due_date=month(1)),
+            Payment(lease=foreign, amount=Decimal('9000.00'), due_date=month(-1)),
+        ]
+        Payment.objects.bulk_create(payments)
+
+        self.client = APIClient()
+        response = self.client.post(reverse('token_obtain_pair'), {
+            'username': 'owner1',
+            'password': 'password123'
+        })
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+
+    def forecast(self, **params):
+        response = self.client.get(reverse('cash-flow-forecast'), params)
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data
+
+    def test_monthly_projection(self):
+        data = self.forecast()
+        self.assertEqual(len(data['months']), 12)
+        self.assertEqual(data['months'][0]['month'], self.this_month.strftime('%Y-%m'))
+        # 2 of the 6 past due payments were late, 1 of them is still missed
+        self.assertEqual(data['late_probability'], 0.3333)
+        self.assertEqual(data['missed_probability'], 0.1667)
+        # Steady: late 1/7, missed 0.5/7. Risky: late 3/5, missed 1.5/5
+        self.assertEqual(data['months'][0], {
+            'month': self.this_month.strftime('%Y-%m'),
+            'expected': '1500.00', 'collected': '1278.57', 'on_time': '1057.14',
+        })
+        self.assertEqual(data['months'][5]['expected'], '1500.00')
+        self.assertEqual(data['months'][6], {
+            'month': add_months(self.this_month, 6).strftime('%Y-%m'),
+            'expected': '500.00', 'collected': '350.00', 'on_time': '200.00',
+        })
+
+    def test_riskiest_leases(self):
+        data = self.forecast(months=3)
+        self.assertEqual(len(data['months']), 3)
+        self.assertEqual(data['riskiest_leases'], [
+            {'lease': self.risky.id, 'payments': 2, 'late_probability': 0.6, 'missed_probability': 0.3},
+            {'lease': self.steady.id, 'payments': 4, 'late_probability': 0.1429, 'missed_probability': 0.0714},
+        ])
+
+    def test_empty_book(self):
+        Lease.objects.all().delete()
+        data = self.forecast(months=2)
+        self.assertEqual([m['expected'] for m in data['months']], ['0.00', '0.00'])
+        self.assertEqual(data['riskiest_leases'], [])
+
+    def test_invalid_months(self):
+        response = self.client.get(reverse('cash-flow-forecast'), {'months': 37})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('months', response.data)
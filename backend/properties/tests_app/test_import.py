@@ -0,0 +1,139 @@
+import datetime
+import os
+import tempfile
+from io import StringIO
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from ..models import LEASE_OVERLAP_MESSAGE, Property, Lease, Payment
+
+User = get_user_model()
+
+class ImportTests(APITestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(
+            username='owner1',
+            email='owner1@example.com',
+            password='password123'
+        )
+        self.tenant = User.objects.create_user(
+            username='tenant1',
+            email='tenant1@example.com',
+            password='password123'
+        )
+        self.start = datetime.date.today() + datetime.timedelta(days=1)
+        self.end = self.start + datetime.timedelta(days=365)
+
+        self.client = APIClient()
+        response = self.client.post(reverse('token_obtain_pair'), {
+            'username': 'owner1',
+            'password': 'password123'
+        })
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+
+    def upload(self, resource, content):
+        return self.client.post(
+            reverse('import', kwargs={'resource': resource}),
+            {'file': SimpleUploadedFile(f'{resource}.csv', content.encode(), content_type='text/csv')},
+            format='multipart',
+        )
+
+    def test_import_properties_reports_bad_rows(self):
+        Property.objects.create(address='0 Import St', owner=self.owner, property_type='bungalow', status='available', area=80, num_of_rooms=4)
+        content = (
+            "address,property_type,status,area,num_of_rooms\n"
+            "1 Import St,apartment,available,50,2\n"
+            "2 Import St,castle,available,50,2\n"
+            "3 Import St,bungalow,available,,4\n"
+            "0 Import St,bungalow,available,80,4\n"
+            "4 Import St,bungalow,under_renovation,120,5\n"
+            "4 Import St,bungalow,available,120,5\n"
+        )
+        response = self.upload('properties', content)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual([error['line'] for error in response.data['errors']], [3, 4, 5, 7])
+        self.assertEqual(
+            [list(error['errors']) for error in response.data['errors']],
+            [['property_type'], ['area'], ['address'], ['address']],
+        )
+        self.assertEqual(Property.objects.filter(owner=self.owner).count(), 3)
+
+    def test_import_leases_by_natural_keys(self):
+        rented = Property.objects.create(address='1 Lease Rd', owner=self.owner, property_type='bungalow', status='available', area=70, num_of_rooms=3)
+        other_owner = User.objects.create_user(username='owner2', email='owner2@example.com', password='password123')
+        foreign = Property.objects.create(address='9 Foreign Rd', owner=other_owner, property_type='bungalow', status='available', area=70, num_of_rooms=3)
+
+        content = (
+            "tenant,property,start_date,end_date,rate_amount,active_lease\n"
+            f"tenant1,1 Lease Rd,{self.start},{self.end},1200,true\n"
+            f"nobody,1 Lease Rd,{self.start},{self.end},1200,true\n"
+            f"{self.tenant.pk},{foreign.pk},{self.start},{self.end},1200,true\n"
+            f"tenant1,1 Lease Rd,{self.end},{self.start},1200,true\n"
+        )
+        response = self.upload('leases', content)
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual([error['line'] for error in response.data['errors']], [3, 4, 5])
+        self.assertIn('tenant', response.data['errors'][0]['errors'])
+        self.assertIn('property', response.data['errors'][1]['errors'])
+
+        lease = Lease.objects.get()
+        self.assertEqual((lease.tenant, lease.property), (self.tenant, rented))
+        # bulk_create skips Lease.save, the importer refreshes the status itself
+        rented.refresh_from_db()
+        self.assertEqual(rented.status, 'rented')
+
+    def test_import_leases_rejects_overlaps(self):
+        prop = Property.objects.create(address='1 Lease Rd', owner=self.owner, property_type='bungalow', status='available', area=70, num_of_rooms=3)
+        later = self.end + datetime.timedelta(days=1)
+        content = (
+            "tenant,property,start_date,end_date,rate_amount,active_lease\n"
+            f"tenant1,1 Lease Rd,{self.start},{self.end},1200,true\n"
+            f"tenant1,1 Lease Rd,{self.end},{later},1200,true\n"
+            f"tenant1,1 Lease Rd,{self.end},{later},1200,false\n"
+            f"tenant1,1 Lease Rd,{later},{later},1200,true\n"
+        )
+        response = self.upload('leases', content)
+        self.assertEqual(response.data['created'], 3)
+        self.assertEqual(response.data['errors'], [{'line': 3, 'errors': {'non_field_errors': [LEASE_OVERLAP_MESSAGE]}}])
+        self.assertEqual(Lease.objects.filter(property=prop, active_lease=True).count(), 2)
+
+    def test_import_payments_sets_status(self):
+        prop = Property.objects.create(address='1 Pay Rd', owner=self.owner, property_type='bungalow', status='available', area=70, num_of_rooms=3)
+        lease = Lease.objects.create(property=prop, tenant=self.tenant, start_date=self.start, end_date=self.end, rate_amount=900)
+        content = "lease,amount,due_date,is_paid\n" + "".join(
+            f"{lease.pk},900,{self.start + datetime.timedelta(days=40 * (i // 2))},{'true' if i == 0 else 'false'}\n"
+            for i in range(3)
+        )
+        response = self.upload('payments', content)
+        self.assertEqual(response.data['created'], 3)
+        self.assertEqual(
+            list(Payment.objects.order_by('due_date').values_list('status', flat=True)),
+            ['paid', 'due_soon', 'pending'],
+        )
+
+    def test_nothing_valid(self):
+        response = self.upload('payments', "lease,amount,due_date\n999,10,2030-01-01\n")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['created'], 0)
+        self.assertEqual(self.upload('payments', "").status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.upload('users', "username\nx\n").status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_management_command_in_chunks(self):
+        fd, path = tempfile.mkstemp(suffix='.csv')
+        with os.fdopen(fd, 'w') as f:
+            f.write("address,property_type,status,area,num_of_rooms\n")
+            for i in range(25):
+                f.write(f"{i} Bulk Ave,{'flat' if i == 7 else 'apartment'},available,45.5,2\n")
+        self.addCleanup(os.remove, path)
+
+        out, err = StringIO(), StringIO()
+        # Owner lookup, then per chunk of 10: unique check, SAVEPOINT, INSERT, RELEASE
+        with self.assertNumQueries(13):
+            call_command('import_csv', 'properties', path, owner='owner1', chunk_size=10, stdout=out, stderr=err)
+        self.assertIn('Imported 24 properties', out.getvalue())
+        self.assertIn('line 9: property_type', err.getvalue())
+        self.assertEqual(Property.objects.filter(owner=self.owner).count(), 24)
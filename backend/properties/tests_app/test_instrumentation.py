@@ -0,0 +1,89 @@
+import re
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase, APIClient
+from django.contrib.auth import get_user_model
+from core.instrumentation import registry
+from ..models import Property
+
+User = get_user_model()
+
+class RequestInstrumentationTests(APITestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(
+            username='owner1',
+            email='owner1@example.com',
+            password='password123'
+        )
+        Property.objects.create(
+            address='1 Timing Street', owner=self.owner, property_type='apartment', status='available',
+            area=50, num_of_rooms=2
+        )
+
+        self.client = APIClient()
+        response = self.client.post(reverse('token_obtain_pair'), {
+            'username': 'owner1',
+            'password': 'password123'
+        })
+        self.access = response.data['access']
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.access}")
+        registry.clear()
+
+    def server_timing(self, response):
+        return dict(entry.split(';', 1) for entry in response['Server-Timing'].split(', '))
+
+    def query_count(self, response):
+        return int(re.fullmatch(r'dur=[\d.]+;desc="(\d+) queries"', self.server_timing(response)['db']).group(1))
+
+    def test_server_timing_header(self):
+        response = self.client.get('/properties/api/')
+        self.assertEqual(response.status_code, 200)
+        timing = self.server_timing(response)
+        self.assertEqual(set(timing), {'db', 'serialize', 'total'})
+        # The page of properties at least
+        self.assertGreaterEqual(self.query_count(response), 1)
+
+        response = self.client.get(reverse('async-property-list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertGreaterEqual(self.query_count(response), 1)
+
+    async def test_queries_of_async_views_are_counted(self):
+        # Under ASGI the ORM runs in sync_to_async's thread, not the request's
+        response = await self.async_client.get(
+            reverse('async-property-list'), headers={'Authorization': f'Bearer {self.access}'}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertGreaterEqual(self.query_count(response), 1)
+        response = await self.async_client.get(
+            reverse('lease-list'), headers={'Authorization': f'Bearer {self.access}'}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertGreaterEqual(self.query_count(response), 1)
+
+    def test_prometheus_metrics(self):
+        queries = sum(self.query_count(self.client.get('/properties/api/')) for _ in range(2))
+        self.client.get(reverse('dashboard-summary'))
+
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        metrics = response.content.decode()
+        # Unnamed routes are labelled with their pattern
+        self.assertIn('rentwise_requests_total{method="GET",status="200",view="properties/api/"} 2', metrics)
+        self.assertIn('rentwise_requests_total{method="GET",status="200",view="dashboard-summary"} 1', metrics)
+        self.assertIn(f'rentwise_db_queries_total{{view="properties/api/"}} {queries}', metrics)
+        self.assertIn('# TYPE rentwise_request_duration_seconds histogram', metrics)
+        self.assertIn('rentwise_request_duration_seconds_count{view="dashboard-summary"} 1', metrics)
+        self.assertIn('rentwise_request_queries_bucket{view="properties/api/",le="+Inf"} 2', metrics)
+        self.assertNotIn('rentwise_slow_queries_total', metrics)
+
+    def test_metrics_are_local_only(self):
+        response = self.client.get(reverse('metrics'), REMOTE_ADDR='10.1.2.3')
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(SLOW_QUERY_THRESHOLD_MS=0)
+    def test_slow_queries_are_logged_with_their_origin(self):
+        with self.assertLogs('core.instrumentation', 'WARNING') as logs:
+            self.client.get(reverse('dashboard-summary'))
+        self.assertTrue(any('from properties/dashboard.py:' in line for line in logs.output), logs.output)
+        self.assertIn('rentwise_slow_queries_total{view="dashboard-summary"}', self.client.get(reverse('metrics')).content.decode())
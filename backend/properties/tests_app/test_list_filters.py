@@ -0,0 +1,129 @@
+from django.urls import reverse
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from ..models import Property, Lease, Payment
+import datetime
+from decimal import Decimal
+
+User = get_user_model()
+
+class ListFilterPaginationTests(APITestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(
+            username='owner1',
+            email='owner1@example.com',
+            password='password123'
+        )
+        self.tenant = User.objects.create_user(
+            username='tenant1',
+            email='tenant1@example.com',
+            password='password123'
+        )
+        self.apartment = Property.objects.create(
+            address='1 Filter St',
+            owner=self.owner,
+            property_type='apartment',
+            status='available',
+            area=50,
+            num_of_rooms=2,
+        )
+        self.office = Property.objects.create(
+            address='2 Filter St',
+            owner=self.owner,
+            property_type='office',
+            status='under_renovation',
+            area=120,
+            num_of_rooms=4,
+        )
+        today = datetime.date.today()
+        self.lease = Lease.objects.create(
+            property=self.apartment,
+            tenant=self.tenant,
+            start_date=today + datetime.timedelta(days=10),
+            end_date=today + datetime.timedelta(days=100),
+            rate_amount=900,
+            active_lease=True
+        )
+        self.paid = Payment.objects.create(
+            lease=self.lease,
+            amount=Decimal('900.00'),
+            due_date=today + datetime.timedelta(days=10),
+            is_paid=True
+        )
+        self.unpaid = Payment.objects.create(
+            lease=self.lease,
+            amount=Decimal('900.00'),
+            due_date=today + datetime.timedelta(days=40),
+            is_paid=False
+        )
+
+        self.client = APIClient()
+        response = self.client.post(reverse('token_obtain_pair'), {
+            'username': 'owner1',
+            'password': 'password123'
+        })
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+
+    def test_property_filters(self):
+        response = self.client.get('/properties/api/', {'property_type': 'office'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([p['id'] for p in response.data['results']], [self.office.id])
+
+        response = self.client.get('/properties/api/', {'status': 'rented'})
+        self.assertEqual([p['id'] for p in response.data['results']], [self.apartment.id])
+
+    def test_invalid_filter_returns_400(self):
+        response = self.client.get('/properties/api/', {'status': 'demolished'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('status', response.data)
+
+    def test_cursor_pagination_walks_all_rows(self):
+        response = self.client.get('/properties/api/', {'page_size': 1})
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertIsNone(response.data['previous'])
+        first = response.data['results'][0]['id']
+
+        response = self.client.get(response.data['next'])
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertIsNone(response.data['next'])
+        self.assertEqual({first, response.data['results'][0]['id']}, {self.apartment.id, self.office.id})
+
+    def test_lease_date_range_filter(self):
+        today = datetime.date.today()
+        inside = {'date_from': today + datetime.timedelta(days=50), 'date_to': today + datetime.timedelta(days=60)}
+        outside = {'date_from': today + datetime.timedelta(days=200)}
+        response = self.client.get(reverse('lease-list'), inside)
+        self.assertEqual(len(response.data['results']), 1)
+        response = self.client.get(reverse('lease-list'), outside)
+        self.assertEqual(len(response.data['results']), 0)
+
+    def test_payment_filters(self):
+        today = datetime.date.today()
+        response = self.client.get(reverse('payment-list'), {'is_paid': 'false'})
+        self.assertEqual([p['id'] for p in response.data['results']], [self.unpaid.id])
+
+        response = self.client.get(reverse('payment-list'), {'due_to': today + datetime.timedelta(days=20)})
+        self.assertEqual([p['id'] for p in response.data['results']], [self.paid.id])
+
+        response = self.client.get(reverse('payment-list'))
+        self.assertEqual(len(response.data['results']), 2)
+
+    def test_payment_status_filter(self):
+        today = datetime.date.today()
+        overdue = Payment.objects.create(
+            lease=self.lease,
+            amount=Decimal('900.00'),
+            due_date=today - datetime.timedelta(days=2),
+            is_paid=False
+        )
+        # Stored status goes stale until the nightly rollover, the list computes it live
+        Payment.objects.filter(pk=overdue.pk).update(status='pending')
+
+        response = self.client.get(reverse('payment-list'), {'status': 'overdue'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([p['id'] for p in response.data['results']], [overdue.id])
+        self.assertEqual(response.data['results'][0]['status'], 'overdue')
+
+        response = self.client.get(reverse('payment-list'), {'status': 'late'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -58,7 +58,7 @@ class PaymentAPITests(APITestCase):
     def test_get_payment_list(self):
         response = self.client.get(self.list_url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data['results']), 1)
 
     def test_get_payment_detail(self):
         response = self.client.get(self.detail_url)
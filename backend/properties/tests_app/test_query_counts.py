@@ -0,0 +1,138 @@
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase, APIClient
+from django.contrib.auth import get_user_model
+from ..models import Property, Lease, Payment
+import datetime
+from decimal import Decimal
+
+User = get_user_model()
+
+# Every endpoint must run the same number of queries whatever the size of
+# the owner's portfolio. One of these is always the JWT user lookup.
+ROW_COUNTS = (1, 100, 10_000)
+
+
+# Measure the uncached path: list responses are otherwise served from cache
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}})
+class QueryCountTests(APITestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(
+            username='owner1',
+            email='owner1@example.com',
+            password='password123'
+        )
+        self.tenant = User.objects.create_user(
+            username='tenant1',
+            email='tenant1@example.com',
+            password='password123'
+        )
+        self.start = datetime.date.today() + datetime.timedelta(days=1)
+        self.lease = Lease.objects.create(
+            property=self._new_properties(1)[0],
+            tenant=self.tenant,
+            start_date=self.start,
+            end_date=self.start + datetime.timedelta(days=365),
+            rate_amount=1000,
+            active_lease=True
+        )
+        self.payment = Payment.objects.create(
+            lease=self.lease,
+            amount=Decimal('1000.00'),
+            due_date=self.start,
+        )
+
+        self.client = APIClient()
+        response = self.client.post(reverse('token_obtain_pair'), {
+            'username': 'owner1',
+            'password': 'password123'
+        })
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+
+    def _new_properties(self, count):
+        offset = Property.objects.count()
+        return Property.objects.bulk_create(
+            Property(
+                address=f'{offset + i} Query St',
+                owner=self.owner,
+                property_type='apartment',
+                status='available',
+                area=50,
+                num_of_rooms=2,
+            )
+            for i in range(count)
+        )
+
+    def _grow_to(self, rows):
+        """Top up properties, leases and payments (on self.lease) to `rows` each."""
+        missing = rows - Property.objects.count()
+        if missing <= 0:
+            return
+        Lease.objects.bulk_create(
+            Lease(
+                property=prop,
+                tenant=self.tenant,
+                start_date=self.start,
+                end_date=self.start + datetime.timedelta(days=365),
+                rate_amount=1000,
+            )
+            for prop in self._new_properties(missing)
+        )
+        Payment.objects.bulk_create(
+            Payment(lease=self.lease, amount=Decimal('1000.00'), due_date=self.start)
+            for _ in range(missing)
+        )
+
+    def assert_queries_at_each_size(self, expected, method, url, data=None):
+        """`data` may be a function of the row count, so every write changes something."""
+        for rows in ROW_COUNTS:
+            self._grow_to(rows)
+            body = data(rows) if callable(data) else data
+            with self.subTest(rows=rows), self.assertNumQueries(expected):
+                response = getattr(self.client, method)(url, body, format='json')
+                self.assertLess(response.status_code, 300)
+
+    def test_property_list(self):
+        self.assert_queries_at_each_size(2, 'get', '/properties/api/')
+
+    def test_property_detail(self):
+        self.assert_queries_at_each_size(2, 'get', f'/properties/api/{self.lease.property_id}/')
+
+    def test_lease_list(self):
+        self.assert_queries_at_each_size(2, 'get', reverse('lease-list'))
+
+    def test_lease_detail(self):
+        url = reverse('lease-detail', kwargs={'id': self.lease.pk})
+        self.assert_queries_at_each_size(3, 'get', url)
+
+    def test_lease_update(self):
+        url = reverse('lease-detail', kwargs={'id': self.lease.pk})
+        data = lambda rows: {
+            'property': self.lease.property_id,
+            'tenant': self.tenant.id,
+            'start_date': self.start.isoformat(),
+            'end_date': (self.start + datetime.timedelta(days=400)).isoformat(),
+            'rate_amount': f'{1000 + rows}.00',
+            'active_lease': True
+        }
+        # includes the savepoints around the write and its audit entry, see Lease.save
+        self.assert_queries_at_each_size(12, 'put', url, data)
+
+    def test_payment_list(self):
+        self.assert_queries_at_each_size(2, 'get', reverse('payment-list'))
+
+    def test_payment_detail(self):
+        url = reverse('payment-detail', kwargs={'id': self.payment.pk})
+        self.assert_queries_at_each_size(2, 'get', url)
+
+    def test_payment_update(self):
+        url = reverse('payment-detail', kwargs={'id': self.payment.pk})
+        data = lambda rows: {
+            'lease': self.lease.id,
+            'amount': f'{1000 + rows}.00',
+            'due_date': self.start.isoformat(),
+            'is_paid': True
+        }
+        # includes the lease owner lookup for cache invalidation, memoized outside tests,
+        # the rent roll lock and refresh, and the audit entry with its savepoint
+        self.assert_queries_at_each_size(10, 'put', url, data)
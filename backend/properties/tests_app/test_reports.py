@@ -0,0 +1,176 @@
+from io import StringIO
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from ..models import Property, Lease, Payment, RentRollEntry, RentRollMonth
+from ..reports import refresh_rent_roll
+import datetime
+from decimal import Decimal
+
+User = get_user_model()
+
+class RentRollTests(APITestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(
+            username='owner1',
+            email='owner1@example.com',
+            password='password123'
+        )
+        self.tenant = User.objects.create_user(
+            username='tenant1',
+            email='tenant1@example.com',
+            password='password123'
+        )
+        self.property = Property.objects.create(
+            address='1 Ledger Ln', owner=self.owner, property_type='apartment', status='available', area=50, num_of_rooms=2
+        )
+        # First day of next month
+        self.start = (datetime.date.today().replace(day=28) + datetime.timedelta(days=4)).replace(day=1)
+        self.lease = Lease.objects.create(
+            property=self.property,
+            tenant=self.tenant,
+            start_date=self.start,
+            end_date=self.start + datetime.timedelta(days=364),
+            rate_amount=1000,
+        )
+        self.month1 = self.start
+        self.month2 = (self.month1 + datetime.timedelta(days=31)).replace(day=1)
+        self.month3 = (self.month2 + datetime.timedelta(days=31)).replace(day=1)
+
+        self.client = APIClient()
+        response = self.client.post(reverse('token_obtain_pair'), {
+            'username': 'owner1',
+            'password': 'password123'
+        })
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+
+    def pay(self, due_date, amount='1000.00', is_paid=False):
+        return Payment.objects.create(lease=self.lease, amount=Decimal(amount), due_date=due_date, is_paid=is_paid)
+
+    def ledger(self):
+        return list(RentRollEntry.objects.filter(lease=self.lease).order_by('month').values_list(
+            'month', 'expected', 'paid', 'arrears'
+        ))
+
+    def totals(self):
+        return list(RentRollMonth.objects.filter(owner=self.owner).order_by('month').values_list(
+            'month', 'expected', 'paid'
+        ))
+
+    def test_ledger_follows_payment_writes(self):
+        first = self.pay(self.month1, is_paid=True)
+        self.pay(self.month1 + datetime.timedelta(days=10), amount='50.00')
+        second = self.pay(self.month2)
+        self.assertEqual(self.ledger(), [
+            (self.month1, Decimal('1050.00'), Decimal('1000.00'), Decimal('50.00')),
+            (self.month2, Decimal('1000.00'), Decimal('0.00'), Decimal('1050.00')),
+        ])
+
+        # Moving a due date moves the row and the running arrears after it
+        second.due_date = self.month3
+        second.is_paid = True
+        second.save()
+        first.delete()
+        self.assertEqual(self.ledger(), [
+            (self.month1, Decimal('50.00'), Decimal('0.00'), Decimal('50.00')),
+            (self.month3, Decimal('1000.00'), Decimal('1000.00'), Decimal('50.00')),
+        ])
+        self.assertEqual(self.totals(), [
+            (self.month1, Decimal('50.00'), Decimal('0.00')),
+            (self.month2, Decimal('0.00'), Decimal('0.00')),
+            (self.month3, Decimal('1000.00'), Decimal('1000.00')),
+        ])
+
+        # Deleting the lease takes its rows along, and out of the totals
+        self.lease.delete()
+        self.assertFalse(RentRollEntry.objects.exists())
+        self.assertEqual(self.totals(), [
+            (self.month1, Decimal('0.00'), Decimal('0.00')),
+            (self.month2, Decimal('0.00'), Decimal('0.00')),
+            (self.month3, Decimal('0.00'), Decimal('0.00')),
+        ])
+
+    def test_deleted_leases_leave_the_totals(self):
+        self.pay(self.month1, is_paid=True)
+        other = Lease.objects.create(
+            property=Property.objects.create(
+                address='2 Ledger Ln', owner=self.owner, property_type='apartment', status='available',
+                area=50, num_of_rooms=2
+            ),
+            tenant=self.tenant, start_date=self.start, end_date=self.start + datetime.timedelta(days=364),
+            rate_amount=500,
+        )
+        Payment.objects.create(lease=other, amount=Decimal('500.00'), due_date=self.month1)
+        self.assertEqual(self.totals(), [(self.month1, Decimal('1500.00'), Decimal('1000.00'))])
+
+        response = self.client.post(reverse('lease-batch'), [{'op': 'delete', 'id': other.pk}], format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.totals(), [(self.month1, Decimal('1000.00'), Decimal('1000.00'))])
+
+        response = self.client.delete(f'/properties/api/{self.property.pk}/')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(self.totals(), [(self.month1, Decimal('0.00'), Decimal('0.00'))])
+        self.assertFalse(RentRollEntry.objects.exists())
+
+    def test_bulk_writes_refresh_the_ledger(self):
+        response = self.client.post(
+            reverse('lease-payment-schedule', kwargs={'id': self.lease.pk})
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(RentRollEntry.objects.filter(lease=self.lease).count(), len(response.data))
+
+        ids = [payment['id'] for payment in response.data[:2]]
+        operations = [{'op': 'delete', 'id': ids[0]}, {'op': 'update', 'id': ids[1], 'data': {
+            'lease': self.lease.pk, 'amount': '1000.00', 'due_date': self.month2.isoformat(), 'is_paid': True,
+        }}]
+        response = self.client.post(reverse('payment-batch'), operations, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.ledger()[0], (self.month2, Decimal('1000.00'), Decimal('1000.00'), Decimal('0.00')))
+
+        # Nothing left to change
+        self.assertEqual(refresh_rent_roll([self.lease.pk]), 0)
+
+    def test_rent_roll_report(self):
+        self.pay(self.month1, is_paid=True)
+        self.pay(self.month2)
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('rent-roll'), {'month': self.month2.strftime('%Y-%m')})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 1)
+        row = response.data['results'][0]
+        self.assertEqual(
+            (row['lease'], row['address'], row['tenant'], row['expected'], row['paid'], row['arrears']),
+            (self.lease.pk, '1 Ledger Ln', self.tenant.pk, '1000.00', '0.00', '1000.00'),
+        )
+        self.assertEqual(self.client.get(reverse('rent-roll'), {'month': '2025-13'}).status_code, 400)
+
+    def test_year_over_year_report(self):
+        last_year = datetime.date(self.month1.year - 1, 12, 1)
+        # bulk_create skips the signal, the explicit refresh stands in for it
+        Payment.objects.bulk_create([
+            Payment(lease=self.lease, amount=Decimal('500.00'), due_date=last_year, is_paid=False),
+            Payment(lease=self.lease, amount=Decimal('1000.00'), due_date=self.month1, is_paid=True),
+        ])
+        refresh_rent_roll([self.lease.pk])
+
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('arrears-report'), {'year': self.month1.year})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['current']), 12)
+        self.assertEqual(response.data['previous'][11], {
+            'month': last_year.strftime('%Y-%m'), 'expected': '500.00', 'paid': '0.00', 'arrears': '500.00',
+        })
+        current = {row['month']: row for row in response.data['current']}
+        self.assertEqual(current[self.month1.strftime('%Y-%m')]['paid'], '1000.00')
+        self.assertEqual(response.data['current'][11]['arrears'], '500.00')
+
+    def test_rebuild_command(self):
+        self.pay(self.month1)
+        RentRollEntry.objects.all().delete()
+        RentRollMonth.objects.update(expected=0)
+        out = StringIO()
+        call_command('rebuild_rent_roll', stdout=out)
+        self.assertIn('Ledger: 1 rows written', out.getvalue())
+        self.assertEqual(self.totals(), [(self.month1, Decimal('1000.00'), Decimal('0.00'))])
@@ -0,0 +1,86 @@
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from ..models import Property, Lease, Payment
+from ..schedule import monthly_due_dates
+import datetime
+
+User = get_user_model()
+
+class MonthlyDueDatesTests(TestCase):
+    def test_clamps_to_month_end(self):
+        dates = monthly_due_dates(datetime.date(2027, 1, 31), datetime.date(2027, 4, 30))
+        self.assertEqual(dates, [
+            datetime.date(2027, 1, 31),
+            datetime.date(2027, 2, 28),
+            datetime.date(2027, 3, 31),
+            datetime.date(2027, 4, 30),
+        ])
+
+    def test_multi_year_lease(self):
+        dates = monthly_due_dates(datetime.date(2027, 6, 1), datetime.date(2032, 5, 31))
+        self.assertEqual(len(dates), 60)
+        self.assertEqual(dates[-1], datetime.date(2032, 5, 1))
+
+
+class PaymentScheduleAPITests(APITestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(
+            username='owner1',
+            email='owner1@example.com',
+            password='password123'
+        )
+        self.tenant = User.objects.create_user(
+            username='tenant1',
+            email='tenant1@example.com',
+            password='password123'
+        )
+        self.property = Property.objects.create(
+            address='789 Schedule Rd',
+            owner=self.owner,
+            property_type='apartment',
+            status='available',
+            area=60,
+            num_of_rooms=2,
+        )
+        start = datetime.date.today() + datetime.timedelta(days=1)
+        self.lease = Lease.objects.create(
+            property=self.property,
+            tenant=self.tenant,
+            start_date=start,
+            end_date=start + datetime.timedelta(days=729),
+            rate_amount=1500,
+            active_lease=True
+        )
+
+        self.client = APIClient()
+        response = self.client.post(reverse('token_obtain_pair'), {
+            'username': 'owner1',
+            'password': 'password123'
+        })
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+        self.url = reverse('lease-payment-schedule', kwargs={'id': self.lease.pk})
+
+    def test_generates_monthly_schedule(self):
+        response = self.client.post(self.url)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data), 24)
+        self.assertEqual(Payment.objects.filter(lease=self.lease).count(), 24)
+        self.assertTrue(all(p['amount'] == '1500.00' for p in response.data))
+
+    def test_is_idempotent(self):
+        self.client.post(self.url)
+        response = self.client.post(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, [])
+        self.assertEqual(Payment.objects.filter(lease=self.lease).count(), 24)
+
+    def test_other_owner_gets_404(self):
+        User.objects.create_user(username='owner2', email='owner2@example.com', password='password123')
+        client = APIClient()
+        response = client.post(reverse('token_obtain_pair'), {'username': 'owner2', 'password': 'password123'})
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+        response = client.post(self.url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,98 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase, APIClient
+from django.contrib.auth import get_user_model
+from ..models import Property, Lease
+import datetime
+
+User = get_user_model()
+
+class PropertySearchTests(APITestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(
+            username='owner1',
+            email='owner1@example.com',
+            password='password123'
+        )
+        other = User.objects.create_user(username='owner2', email='owner2@example.com', password='password123')
+        Property.objects.bulk_create([
+            Property(address='1 Garden Street', description='Bright flat with a balcony', owner=self.owner,
+                     property_type='apartment', status='available', area=55, num_of_rooms=2),
+            Property(address='2 Garden Street', description='Quiet flat, no balcony views', owner=self.owner,
+                     property_type='apartment', status='rented', area=70, num_of_rooms=3),
+            Property(address='3 Mill Road', description='Office next to the gardens', owner=self.owner,
+                     property_type='office', status='available', area=120, num_of_rooms=5),
+            Property(address='4 Mill Road', description='Warehouse', owner=self.owner,
+                     property_type='industrial', status='under_renovation', area=900, num_of_rooms=1),
+            Property(address='5 Garden Street', description='Balconies everywhere', owner=other,
+                     property_type='apartment', status='available', area=60, num_of_rooms=2),
+        ])
+
+        self.client = APIClient()
+        response = self.client.post(reverse('token_obtain_pair'), {
+            'username': 'owner1',
+            'password': 'password123'
+        })
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+
+    def search(self, **params):
+        response = self.client.get(reverse('property-search'), params)
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data
+
+    def test_full_text_search_ranks_address_matches_first(self):
+        # Stemmed: "garden" also matches "gardens" in a description
+        data = self.search(q='garden')
+        self.assertEqual(data['count'], 3)
+        self.assertEqual(
+            [p['address'] for p in data['results']],
+            ['2 Garden Street', '1 Garden Street', '3 Mill Road'],
+        )
+
+        data = self.search(q='balcony -quiet')
+        self.assertEqual([p['address'] for p in data['results']], ['1 Garden Street'])
+
+    def test_search_vector_follows_updates(self):
+        Property.objects.filter(address='4 Mill Road').update(description='Warehouse with a garden')
+        data = self.search(q='garden', property_type='industrial')
+        self.assertEqual([p['address'] for p in data['results']], ['4 Mill Road'])
+
+    def test_facets_and_ranges(self):
+        data = self.search(q='garden', status='available', area_max=100)
+        self.assertEqual([p['address'] for p in data['results']], ['1 Garden Street'])
+        self.assertEqual(data['count'], 1)
+        # Type counts keep the status filter, status counts ignore it
+        self.assertEqual(data['facets']['property_type'], {
+            'apartment': 1, 'room': 0, 'office': 0, 'industrial': 0, 'town_house': 0, 'bungalow': 0,
+        })
+        self.assertEqual(data['facets']['status'], {'available': 1, 'rented': 1, 'under_renovation': 0})
+
+        data = self.search(rooms_min=2, rooms_max=4)
+        self.assertEqual(data['count'], 2)
+        self.assertEqual(data['facets']['status'], {'available': 1, 'rented': 1, 'under_renovation': 0})
+
+    def test_query_count(self):
+        # JWT user lookup + the facet query + the page; the facets give the total
+        with self.assertNumQueries(3):
+            data = self.search(q='garden', limit=2)
+        self.assertEqual(data['count'], 3)
+        self.assertEqual(len(data['results']), 2)
+        self.assertIsNotNone(data['next'])
+
+    def test_other_reads_leave_the_vector_out(self):
+        property = Property.objects.get(address='1 Garden Street')
+        start = datetime.date.today() + datetime.timedelta(days=1)
+        lease = Lease.objects.create(
+            property=property, tenant=self.owner, start_date=start, end_date=start + datetime.timedelta(days=30),
+            rate_amount=1000,
+        )
+        with CaptureQueriesContext(connection) as queries:
+            for url in ('/properties/api/', f'/properties/api/{property.pk}/', reverse('lease-detail', args=[lease.pk])):
+                self.assertEqual(self.client.get(url).status_code, 200)
+        self.assertFalse([q['sql'] for q in queries if 'search_vector' in q['sql']])
+
+    def test_invalid_ranges(self):
+        response = self.client.get(reverse('property-search'), {'rooms_min': 4, 'rooms_max': 2})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('rooms_max', response.data)
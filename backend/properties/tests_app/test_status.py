@@ -0,0 +1,139 @@
+from django.core.management import call_command
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from ..models import Property, Lease, Payment
+from ..status import refresh_property_status, refresh_payment_status
+import datetime
+from io import StringIO
+
+User = get_user_model()
+
+class PropertyStatusTests(TestCase):
+    def setUp(self):
+        self.tenant = User.objects.create_user(
+            username='tenant1',
+            email='tenant1@example.com',
+            password='password123'
+        )
+        self.today = datetime.date.today()
+        self.properties = Property.objects.bulk_create(
+            Property(
+                address=f'{i} Status Ave',
+                property_type='apartment',
+                status=status,
+                area=40,
+                num_of_rooms=1,
+            )
+            for i, status in enumerate(['available', 'rented', 'under_renovation', 'rented'])
+        )
+
+    def lease(self, prop, end_date, active_lease=True):
+        # bulk_create skips Lease.save so leases can end in the past
+        return Lease.objects.bulk_create([Lease(
+            property=prop,
+            tenant=self.tenant,
+            start_date=self.today - datetime.timedelta(days=30),
+            end_date=end_date,
+            rate_amount=100,
+            active_lease=active_lease,
+        )])[0]
+
+    def statuses(self):
+        return list(Property.objects.order_by('id').values_list('status', flat=True))
+
+    def test_recomputes_every_property_in_one_query(self):
+        available, rented, renovation, expired = self.properties
+        self.lease(available, self.today + datetime.timedelta(days=10))
+        self.lease(expired, self.today - datetime.timedelta(days=1))
+
+        with self.assertNumQueries(1):
+            updated = refresh_property_status()
+
+        self.assertEqual(updated, 3)
+        self.assertEqual(self.statuses(), ['rented', 'available', 'under_renovation', 'available'])
+
+    def test_only_touches_given_properties(self):
+        available = self.properties[0]
+        self.lease(available, self.today + datetime.timedelta(days=10))
+        refresh_property_status([self.properties[1].id])
+        self.assertEqual(self.statuses(), ['available', 'available', 'under_renovation', 'rented'])
+
+    def test_lease_save_and_delete_refresh_status(self):
+        prop = self.properties[0]
+        lease = Lease.objects.create(
+            property=prop,
+            tenant=self.tenant,
+            start_date=self.today,
+            end_date=self.today + datetime.timedelta(days=10),
+            rate_amount=100,
+            active_lease=True,
+        )
+        prop.refresh_from_db()
+        self.assertEqual(prop.status, 'rented')
+
+        # Moving the lease frees the property it left
+        lease = Lease.objects.get(pk=lease.pk)
+        lease.property = self.properties[2]
+        lease.save()
+        prop.refresh_from_db()
+        self.assertEqual(prop.status, 'available')
+
+        lease.delete()
+        self.properties[2].refresh_from_db()
+        self.assertEqual(self.properties[2].status, 'available')
+
+    def test_payment_status_matches_python(self):
+        lease = self.lease(self.properties[0], self.today + datetime.timedelta(days=10))
+        due_dates = [None] + [self.today + datetime.timedelta(days=d) for d in (-5, -1, 0, 2, 3, 4, 30)]
+        payments = Payment.objects.bulk_create(
+            Payment(lease=lease, amount=100, due_date=due, is_paid=paid)
+            for due in due_dates for paid in (False, True)
+        )
+        refresh_payment_status()
+        stored = dict(Payment.objects.values_list('id', 'status'))
+        for payment in payments:
+            self.assertEqual(stored[payment.id], Payment.compute_status(payment.is_paid, payment.due_date))
+
+    def test_status_conditions_match_annotation(self):
+        lease = self.lease(self.properties[0], self.today + datetime.timedelta(days=10))
+        due_dates = [None] + [self.today + datetime.timedelta(days=d) for d in (-5, -1, 0, 2, 3, 4, 30)]
+        Payment.objects.bulk_create(
+            Payment(lease=lease, amount=100, due_date=due, is_paid=paid)
+            for due in due_dates for paid in (False, True)
+        )
+        annotated = Payment.objects.with_live_status()
+        for status, _ in Payment.STATUS_CHOICES:
+            with self.subTest(status=status):
+                self.assertEqual(
+                    set(Payment.objects.filter_status(status).values_list('id', flat=True)),
+                    set(annotated.filter(live_status=status).values_list('id', flat=True)),
+                )
+
+    def test_payment_save_sets_status(self):
+        lease = self.lease(self.properties[0], self.today + datetime.timedelta(days=10))
+        payment = Payment.objects.create(lease=lease, amount=100, due_date=self.today - datetime.timedelta(days=1))
+        self.assertEqual(payment.status, 'overdue')
+        payment.is_paid = True
+        payment.save(update_fields=['is_paid'])
+        payment.refresh_from_db()
+        self.assertEqual(payment.status, 'paid')
+
+    def test_nightly_command(self):
+        current = self.lease(self.properties[0], self.today + datetime.timedelta(days=10))
+        expired = self.lease(self.properties[3], self.today - datetime.timedelta(days=1))
+        Payment.objects.bulk_create([
+            Payment(lease=current, amount=100, due_date=self.today - datetime.timedelta(days=3)),
+            Payment(lease=current, amount=100, due_date=self.today + datetime.timedelta(days=30)),
+        ])
+        out = StringIO()
+        call_command('nightly_rollover', '--chunk-size', '2', stdout=out)
+
+        self.assertIn('1 leases deactivated', out.getvalue())
+        self.assertIn('3 properties updated', out.getvalue())
+        self.assertIn('1 payments updated', out.getvalue())
+        self.assertEqual(self.statuses(), ['rented', 'available', 'under_renovation', 'available'])
+        expired.refresh_from_db()
+        self.assertFalse(expired.active_lease)
+        self.assertEqual(
+            list(Payment.objects.order_by('due_date').values_list('status', flat=True)), ['overdue', 'pending']
+        )
@@ -0,0 +1,59 @@
+from io import StringIO
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from ..models import Property, Lease, Payment, RentRollEntry
+import datetime
+
+User = get_user_model()
+
+class GenerateSyntheticDataTests(TestCase):
+    def generate(self, **options):
+        options = {'owners': 2, 'properties': 5, 'leases': 2, 'lease_months': 6, 'tenants': 4,
+                   'date': datetime.date(2025, 6, 15), 'batch_size': 2, **options}
+        call_command('generate_synthetic_data', stdout=StringIO(), **options)
+
+    def snapshot(self):
+        return (
+            list(Property.objects.order_by('address').values_list('address', 'property_type', 'status', 'area')),
+            list(Lease.objects.order_by('property__address', 'start_date').values_list(
+                'property__address', 'tenant__username', 'start_date', 'end_date', 'rate_amount', 'active_lease'
+            )),
+            list(Payment.objects.order_by('lease__property__address', 'due_date').values_list(
+                'due_date', 'payment_date', 'is_paid', 'status'
+            )),
+        )
+
+    def test_generates_consistent_rows(self):
+        self.generate()
+        self.assertEqual(User.objects.filter(username__startswith='synthetic-owner').count(), 2)
+        self.assertEqual(User.objects.filter(username__startswith='synthetic-tenant').count(), 4)
+        self.assertEqual(Property.objects.count(), 10)
+        self.assertEqual(Lease.objects.count(), 20)
+        # One payment per lease month
+        self.assertEqual(Payment.objects.count(), 120)
+        self.assertTrue(self.client.login(username='synthetic-owner0', password='synthetic'))
+
+        today = datetime.date(2025, 6, 15)
+        for lease in Lease.objects.all():
+            self.assertEqual(lease.active_lease, lease.end_date >= today)
+        rented = Property.objects.filter(leases__active_lease=True).distinct()
+        self.assertEqual(set(rented), set(Property.objects.filter(status='rented')))
+        self.assertFalse(Payment.objects.filter(due_date__gte=today, is_paid=True).exists())
+        self.assertFalse(Payment.objects.filter(payment_date__gt=today).exists())
+        self.assertEqual(RentRollEntry.objects.count(), 120)
+
+    def test_same_seed_same_data(self):
+        self.generate(seed=7)
+        first = self.snapshot()
+        User.objects.filter(username__startswith='synthetic-').delete()
+        self.generate(seed=7)
+        self.assertEqual(self.snapshot(), first)
+
+    def test_refuses_existing_prefix(self):
+        self.generate()
+        with self.assertRaises(CommandError):
+            self.generate()
+        self.generate(prefix='second')
+        self.assertEqual(Property.objects.count(), 20)
@@ -1,12 +1,33 @@
 from django.urls import path
-from . import views
+from . import views, async_views
 
 urlpatterns = [
     path('api/', views.PropertyViewSet.as_view()),
     path('api/<int:id>/', views.PropertyDetailView.as_view()),
+    path('api/availability/', views.PortfolioCalendarView.as_view(), name='portfolio-calendar'),
+    path('api/<int:id>/availability/', views.PropertyAvailabilityView.as_view(), name='property-availability'),
+    path('api/search/', views.PropertySearchView.as_view(), name='property-search'),
     path('api/leases/', views.LeaseViewSet.as_view(), name='lease-list'),
+    path('api/leases/contracts/', views.LeaseContractExportView.as_view(), name='lease-contract-export'),
+    path('api/leases/batch/', views.LeaseBatchView.as_view(), name='lease-batch'),
     path('api/leases/<int:id>/', views.LeaseDetailView.as_view(), name='lease-detail'),
+    path('api/leases/<int:id>/schedule/', views.LeasePaymentScheduleView.as_view(), name='lease-payment-schedule'),
     path('api/payments/', views.PaymentViewSet.as_view(), name='payment-list'),
+    path('api/payments/batch/', views.PaymentBatchView.as_view(), name='payment-batch'),
     path('api/payments/<int:id>/', views.PaymentDetailView.as_view(), name='payment-detail'),
+    path('api/export/<str:resource>/', views.ExportView.as_view(), name='export'),
+    path('api/import/<str:resource>/', views.ImportView.as_view(), name='import'),
+    path('api/reports/rent-roll/', views.RentRollView.as_view(), name='rent-roll'),
+    path('api/reports/arrears/', views.ArrearsReportView.as_view(), name='arrears-report'),
+    path('api/forecast/', views.CashFlowForecastView.as_view(), name='cash-flow-forecast'),
+    path('api/audit/', views.AuditLogView.as_view(), name='audit-log'),
+    path('api/dashboard/', views.DashboardSummaryView.as_view(), name='dashboard-summary'),
+    path('api/async/', async_views.property_list, name='async-property-list'),
+    path('api/async/<int:id>/', async_views.property_detail, name='async-property-detail'),
+    path('api/async/leases/', async_views.lease_list, name='async-lease-list'),
+    path('api/async/leases/<int:id>/', async_views.lease_detail, name='async-lease-detail'),
+    path('api/async/payments/', async_views.payment_list, name='async-payment-list'),
+    path('api/async/payments/<int:id>/', async_views.payment_detail, name='async-payment-detail'),
+    path('api/async/dashboard/', async_views.dashboard_summary, name='async-dashboard-summary'),
     path('leases/<int:pk>/contract/', views.lease_contract_pdf, name='lease_contract_pdf'),
 ]
\ No newline at end of file
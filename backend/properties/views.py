@@ -1,13 +1,38 @@
 from django.shortcuts import get_object_or_404
+from django.db import IntegrityError, transaction
+from django.db.models import Prefetch
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from .models import Payment, Property, Lease
-from .serializers import PaymentSerializer, PropertySerializer, LeaseSerializer, LeaseDetailSerializer
+from .models import (
+  LEASE_OVERLAP_CONSTRAINT, LEASE_OVERLAP_MESSAGE, Payment, Property, Lease, AuditEntry, violated_constraint,
+)
+from .serializers import (
+  PaymentSerializer, PropertySerializer, LeaseSerializer, LeaseDetailSerializer, RentRollEntrySerializer,
+  AuditEntrySerializer,
+)
+from .filters import (
+  PropertyFilterSerializer, PropertySearchSerializer, LeaseFilterSerializer, PaymentFilterSerializer,
+  DashboardFilterSerializer, AvailabilityFilterSerializer, CalendarFilterSerializer,
+  RentRollFilterSerializer, YearOverYearFilterSerializer, ForecastFilterSerializer, AuditFilterSerializer,
+)
+from .pagination import OwnerCursorPagination, PropertySearchPagination
+from .schedule import generate_payment_schedule
+from .batch import BatchOperationSerializer, BatchError, MAX_BATCH_OPERATIONS, apply_batch
+from .status import refresh_property_status, refresh_payment_status
+from .dashboard import owner_summary
+from .cache import cache_owner_response, invalidate_owner
+from .contracts import contract_path, submit_contract, stream_contracts_zip
+from .exports import EXPORTS, EXPORT_FORMATS, export_rows
+from .imports import IMPORTS, CSVImportError, import_csv
+from .availability import portfolio_calendar, with_conflicting_leases
+from .reports import refresh_rent_roll, rent_roll, retire_rent_roll, year_over_year
+from .forecast import cash_flow_forecast
+from . import audit
+from core.instrumentation import timed
 from rest_framework.permissions import IsAuthenticated
-from django.http import HttpResponse
-from django.template.loader import get_template
-from xhtml2pdf import pisa
-import datetime
+from django.conf import settings
+from django.http import FileResponse, StreamingHttpResponse
+import io
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 
@@ -16,10 +41,16 @@ from rest_framework.permissions import IsAuthenticated
 class PropertyViewSet(APIView):
   permission_classes = [IsAuthenticated]
 
+  @cache_owner_response
   def get(self, request):
-    properties = Property.objects.filter(owner=request.user)
-    serializer = PropertySerializer(properties, many=True)
-    return Response(serializer.data , status=200)
+    filters = PropertyFilterSerializer(data=request.query_params.dict())
+    if not filters.is_valid():
+      return Response(filters.errors, status=400)
+    properties = filters.filter_queryset(Property.objects.filter(owner=request.user))
+    paginator = OwnerCursorPagination()
+    page = paginator.paginate_queryset(properties, request, view=self)
+    serializer = PropertySerializer(page, many=True)
+    return paginator.get_paginated_response(serializer.data)
   
   def post(self, request):
     serializer = PropertySerializer(data=request.data)
@@ -30,6 +61,25 @@ class PropertyViewSet(APIView):
       return Response(serializer.errors, status=400)
   
 
+class PropertySearchView(APIView):
+  permission_classes = [IsAuthenticated]
+
+  @cache_owner_response
+  def get(self, request):
+    filters = PropertySearchSerializer(data=request.query_params.dict())
+    if not filters.is_valid():
+      return Response(filters.errors, status=400)
+    properties = Property.objects.filter(owner=request.user)
+    matches, facets = filters.facet_counts(properties)
+    paginator = PropertySearchPagination()
+    paginator.count = matches
+    page = paginator.paginate_queryset(filters.filter_queryset(properties), request, view=self)
+    serializer = PropertySerializer(page, many=True)
+    response = paginator.get_paginated_response(serializer.data)
+    response.data['facets'] = facets
+    return response
+
+
 # Property APIViews
 class PropertyDetailView(APIView):
   permission_classes = [IsAuthenticated]
@@ -55,14 +105,59 @@ class PropertyDetailView(APIView):
     return Response(status=204)
   
 
+class PropertyAvailabilityView(APIView):
+  permission_classes = [IsAuthenticated]
+
+  def get(self, request, id):
+    filters = AvailabilityFilterSerializer(data=request.query_params.dict())
+    if not filters.is_valid():
+      return Response(filters.errors, status=400)
+    window = filters.validated_data
+    # Ownership check and overlap lookup in one query
+    properties = with_conflicting_leases(
+      Property.objects.filter(owner=request.user, id=id),
+      window['start_date'], window['end_date'], window.get('exclude_lease'),
+    )
+    property = get_object_or_404(properties.only('id'))
+    return Response({
+      'property': property.id,
+      'start_date': window['start_date'],
+      'end_date': window['end_date'],
+      'available': not property.conflicting_leases,
+      'conflicting_leases': property.conflicting_leases,
+    })
+
+
+class PortfolioCalendarView(APIView):
+  permission_classes = [IsAuthenticated]
+
+  @cache_owner_response
+  def get(self, request):
+    filters = CalendarFilterSerializer(data=request.query_params.dict())
+    if not filters.is_valid():
+      return Response(filters.errors, status=400)
+    window = filters.validated_data
+    return Response({
+      'start_date': window['start_date'],
+      'end_date': window['end_date'],
+      'properties': list(portfolio_calendar(request.user, window['start_date'], window['end_date'])),
+    })
+
+
 # Lease APIViews
 class LeaseViewSet(APIView):
   permission_classes = [IsAuthenticated]
 
+  @cache_owner_response
   def get(self, request):
-    leases = Lease.objects.filter(property__owner=request.user)
-    serializer = LeaseSerializer(leases, many=True)
-    return Response(serializer.data , status=200)
+    filters = LeaseFilterSerializer(data=request.query_params.dict())
+    if not filters.is_valid():
+      return Response(filters.errors, status=400)
+    leases = filters.filter_queryset(Lease.objects.filter(property__owner=request.user))
+    paginator = OwnerCursorPagination()
+    page = paginator.paginate_queryset(leases, request, view=self)
+    serializer = LeaseSerializer(page, many=True)
+    return paginator.get_paginated_response(serializer.data)
   
   def post(self, request):
     serializer = LeaseSerializer(data=request.data)
@@ -75,13 +170,20 @@ class LeaseViewSet(APIView):
 class LeaseDetailView(APIView):
   permission_classes = [IsAuthenticated]
 
+  def get_queryset(self):
+    # LeaseDetailSerializer nests the property and all payments,
+    # load them up front so serialization does not query per row
+    return Lease.objects.select_related('property').defer('property__search_vector').prefetch_related(
+      Prefetch('payments', queryset=Payment.objects.with_live_status())
+    )
+
   def get(self, request, id):
-    lease = get_object_or_404(Lease, property__owner=request.user, id=id)
+    lease = get_object_or_404(self.get_queryset(), property__owner=request.user, id=id)
     serializer = LeaseDetailSerializer(lease)
     return Response(serializer.data)
     
   def put(self, request, id):
-    lease = get_object_or_404(Lease, property__owner=request.user, id=id)
+    lease = get_object_or_404(self.get_queryset(), property__owner=request.user, id=id)
     serializer = LeaseSerializer(instance=lease, data=request.data)
     if serializer.is_valid():
       serializer.save()
@@ -93,18 +195,100 @@ class LeaseDetailView(APIView):
     
   def delete(self, request, id):
     lease = get_object_or_404(Lease, property__owner=request.user, id=id)
-    lease.delete()
+    deleted = audit.change('delete', lease, audit.snapshot(lease))
+    with transaction.atomic():
+      lease.delete()
+      audit.record([deleted])
     return Response(status=204)
   
 
+class LeaseBatchView(APIView):
+  permission_classes = [IsAuthenticated]
+
+  def post(self, request):
+    operations = BatchOperationSerializer(data=request.data, many=True, max_length=MAX_BATCH_OPERATIONS)
+    if not operations.is_valid():
+      return Response(operations.errors, status=400)
+    ops = operations.validated_data
+
+    leases = Lease.objects.filter(property__owner=request.user)
+    # Properties that lose a lease through an update or delete need their status refreshed too
+    property_ids = set(
+      leases.filter(pk__in=[op['id'] for op in ops if 'id' in op]).values_list('property_id', flat=True)
+    )
+
+    def refresh_status(written):
+      refresh_property_status(property_ids | {lease.property_id for lease in written})
+      # Leases moved to another property take their rent roll along
+      refresh_rent_roll([lease.pk for lease in written])
+
+    try:
+      results = apply_batch(
+        ops, LeaseSerializer, leases,
+        related={'property': Property.objects.filter(owner=request.user)},
+        after_write=refresh_status,
+        # Queryset deletes skip Lease.delete, which takes the lease out of the totals
+        before_delete=retire_rent_roll,
+      )
+    except BatchError as e:
+      return Response(e.errors, status=400)
+    except IntegrityError as e:
+      if violated_constraint(e) != LEASE_OVERLAP_CONSTRAINT:
+        raise
+      return Response({'detail': LEASE_OVERLAP_MESSAGE}, status=400)
+    # bulk_create and bulk_update do not send post_save (the deletes do send post_delete)
+    invalidate_owner(request.user.pk)
+    return Response(results, status=200)
+
+
+# Upper bound on contracts in one export
+MAX_CONTRACT_EXPORT = 1000
+
+class LeaseContractExportView(APIView):
+  permission_classes = [IsAuthenticated]
+
+  def get(self, request):
+    filters = LeaseFilterSerializer(data=request.query_params.dict())
+    if not filters.is_valid():
+      return Response(filters.errors, status=400)
+    leases = filters.filter_queryset(
+      Lease.objects.filter(property__owner=request.user).select_related('property', 'tenant')
+      .defer('property__search_vector').order_by('id')
+    )
+    leases = list(leases[:MAX_CONTRACT_EXPORT + 1])
+    if len(leases) > MAX_CONTRACT_EXPORT:
+      return Response({'detail': f'At most {MAX_CONTRACT_EXPORT} contracts can be exported at once.'}, status=400)
+
+    response = StreamingHttpResponse(stream_contracts_zip(leases), content_type='application/zip')
+    response['Content-Disposition'] = 'attachment; filename="contracts.zip"'
+    return response
+
+
+class LeasePaymentScheduleView(APIView):
+  permission_classes = [IsAuthenticated]
+
+  def post(self, request, id):
+    lease = get_object_or_404(Lease, property__owner=request.user, id=id)
+    created = generate_payment_schedule(lease.pk)
+    invalidate_owner(request.user.pk)
+    serializer = PaymentSerializer(created, many=True)
+    return Response(serializer.data, status=201 if created else 200)
+
+
 # Payment APIViews
 class PaymentViewSet(APIView):
   permission_classes = [IsAuthenticated]
 
+  @cache_owner_response
   def get(self, request):
-    payment = Payment.objects.filter(lease__property__owner=request.user)
-    serializer = PaymentSerializer(payment, many=True)
-    return Response(serializer.data , status=200)
+    filters = PaymentFilterSerializer(data=request.query_params.dict())
+    if not filters.is_valid():
+      return Response(filters.errors, status=400)
+    payments = filters.filter_queryset(Payment.objects.with_live_status().filter(lease__property__owner=request.user))
+    paginator = OwnerCursorPagination()
+    page = paginator.paginate_queryset(payments, request, view=self)
+    serializer = PaymentSerializer(page, many=True)
+    return paginator.get_paginated_response(serializer.data)
   
   def post(self, request):
     serializer = PaymentSerializer(data=request.data)
@@ -119,7 +303,7 @@ class PaymentDetailView(APIView):
   permission_classes = [IsAuthenticated]
 
   def get(self, request, id):
-    payment = get_object_or_404(Payment, lease__property__owner=request.user, id=id)
+    payment = get_object_or_404(Payment.objects.with_live_status(), lease__property__owner=request.user, id=id)
     serializer = PaymentSerializer(payment)
     return Response(serializer.data, status=200)
     
@@ -134,33 +318,180 @@ class PaymentDetailView(APIView):
     
   def delete(self, request, id):
     payment = get_object_or_404(Payment, lease__property__owner=request.user, id=id)
-    payment.delete()
+    deleted = audit.change('delete', payment, audit.snapshot(payment))
+    with transaction.atomic():
+      payment.delete()
+      audit.record([deleted])
     return Response(status=204)
   
 
-def render_to_pdf(template_src, context_dict={}):
-    template = get_template(template_src)
-    html = template.render(context_dict)
-    response = HttpResponse(content_type='application/pdf')
-    pisa_status = pisa.CreatePDF(html, dest=response)
-    if pisa_status.err:
-        return None
+class PaymentBatchView(APIView):
+  permission_classes = [IsAuthenticated]
+
+  def post(self, request):
+    operations = BatchOperationSerializer(data=request.data, many=True, max_length=MAX_BATCH_OPERATIONS)
+    if not operations.is_valid():
+      return Response(operations.errors, status=400)
+    ops = operations.validated_data
+
+    payments = Payment.objects.filter(lease__property__owner=request.user)
+    # Leases losing a payment through an update or delete need their rent roll refreshed too
+    lease_ids = set(
+      payments.filter(pk__in=[op['id'] for op in ops if 'id' in op]).values_list('lease_id', flat=True)
+    )
+
+    def refresh_status(written):
+      # bulk writes skip Payment.save, which is what normally sets status
+      refresh_payment_status([payment.pk for payment in written])
+      for payment in written:
+        payment.status = Payment.compute_status(payment.is_paid, payment.due_date)
+      refresh_rent_roll(lease_ids | {payment.lease_id for payment in written})
+
+    try:
+      results = apply_batch(
+        ops, PaymentSerializer,
+        payments,
+        related={'lease': Lease.objects.filter(property__owner=request.user)},
+        after_write=refresh_status,
+      )
+    except BatchError as e:
+      return Response(e.errors, status=400)
+    # bulk_create and bulk_update do not send post_save (the deletes do send post_delete)
+    invalidate_owner(request.user.pk)
+    return Response(results, status=200)
+
+
+class DashboardSummaryView(APIView):
+  permission_classes = [IsAuthenticated]
+
+  @cache_owner_response
+  def get(self, request):
+    filters = DashboardFilterSerializer(data=request.query_params.dict())
+    if not filters.is_valid():
+      return Response(filters.errors, status=400)
+    return Response(owner_summary(request.user, months=filters.validated_data['months']), status=200)
+
+
+class RentRollView(APIView):
+  permission_classes = [IsAuthenticated]
+
+  @cache_owner_response
+  def get(self, request):
+    filters = RentRollFilterSerializer(data=request.query_params.dict())
+    if not filters.is_valid():
+      return Response(filters.errors, status=400)
+    entries = rent_roll(request.user, filters.validated_data['month'])
+    paginator = OwnerCursorPagination()
+    page = paginator.paginate_queryset(entries, request, view=self)
+    serializer = RentRollEntrySerializer(page, many=True)
+    return paginator.get_paginated_response(serializer.data)
+
+
+class ArrearsReportView(APIView):
+  permission_classes = [IsAuthenticated]
+
+  @cache_owner_response
+  def get(self, request):
+    filters = YearOverYearFilterSerializer(data=request.query_params.dict())
+    if not filters.is_valid():
+      return Response(filters.errors, status=400)
+    return Response(year_over_year(request.user, filters.validated_data['year']), status=200)
+
+
+class CashFlowForecastView(APIView):
+  permission_classes = [IsAuthenticated]
+
+  @cache_owner_response
+  def get(self, request):
+    filters = ForecastFilterSerializer(data=request.query_params.dict())
+    if not filters.is_valid():
+      return Response(filters.errors, status=400)
+    return Response(cash_flow_forecast(request.user, months=filters.validated_data['months']), status=200)
+
+
+class AuditLogView(APIView):
+  permission_classes = [IsAuthenticated]
+
+  def get(self, request):
+    filters = AuditFilterSerializer(data=request.query_params.dict())
+    if not filters.is_valid():
+      return Response(filters.errors, status=400)
+    entries = filters.filter_queryset(AuditEntry.objects.filter(user=request.user))
+    paginator = OwnerCursorPagination()
+    page = paginator.paginate_queryset(entries, request, view=self)
+    serializer = AuditEntrySerializer(page, many=True)
+    return paginator.get_paginated_response(serializer.data)
+
+
+class ExportView(APIView):
+  permission_classes = [IsAuthenticated]
+
+  def get(self, request, resource):
+    export = EXPORTS.get(resource)
+    if export is None:
+      return Response({'detail': 'Not found.'}, status=404)
+    output = request.query_params.get('output', 'csv')
+    if output not in EXPORT_FORMATS:
+      return Response({'output': [f'Choose one of: {", ".join(EXPORT_FORMATS)}.']}, status=400)
+    filters = export['filters'](data=request.query_params.dict())
+    if not filters.is_valid():
+      return Response(filters.errors, status=400)
+
+    queryset = filters.filter_queryset(export['queryset'](request.user))
+    content_type, stream = EXPORT_FORMATS[output]
+    rows = export_rows(queryset, export['columns'])
+    response = StreamingHttpResponse(stream(rows, export['columns']), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{resource}.{output}"'
     return response
 
+
+class ImportView(APIView):
+  permission_classes = [IsAuthenticated]
+
+  def post(self, request, resource):
+    if resource not in IMPORTS:
+      return Response({'detail': 'Not found.'}, status=404)
+    upload = request.FILES.get('file')
+    if upload is None:
+      return Response({'file': ['This field is required.']}, status=400)
+
+    # Large uploads are spooled to disk by Django and read back line by line
+    lines = io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')
+    try:
+      report = import_csv(resource, lines, request.user)
+    except CSVImportError as e:
+      return Response({'file': [str(e)]}, status=400)
+    # bulk_create does not send post_save
+    invalidate_owner(request.user.pk)
+    if report['created']:
+      return Response(report, status=201)
+    return Response(report, status=400 if report['errors'] else 200)
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def lease_contract_pdf(request, pk):
-    lease = get_object_or_404(Lease.objects.select_related('tenant', 'property'), pk=pk)
+    lease = get_object_or_404(
+        Lease.objects.select_related('tenant', 'property').defer('property__search_vector'), pk=pk
+    )
     user = request.user
 
     if user != lease.tenant and user != lease.property.owner:
         return Response({'detail': 'Unauthorized'}, status=401)
 
-    context = {
-        'lease': lease,
-        'today': datetime.date.today()
-    }
-    pdf_response = render_to_pdf('properties/contract_template.html', context)
-    if not pdf_response:
-        return Response({'detail': 'Error while generating PDF'}, status=500)
-    return pdf_response
\ No newline at end of file
+    # Contracts are rendered by the worker pool into a file named after the
+    # lease data they show, so an unchanged lease is served straight from disk.
+    # A missing one is queued and the client asked to come back for it, the
+    # request does not wait for the rendering.
+    path = contract_path(lease)
+    if not path.exists():
+        with timed('pdf'):
+            future = submit_contract(lease, path)
+        if not future.done():
+            return Response(
+                {'detail': 'Contract is being generated'}, status=202,
+                headers={'Retry-After': str(settings.CONTRACT_PDF_RETRY_AFTER)},
+            )
+        if future.exception() is not None:
+            return Response({'detail': 'Error while generating PDF'}, status=500)
+    return FileResponse(open(path, 'rb'), content_type='application/pdf')
@@ -0,0 +1,96 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import router
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+
+def user_cache_key(user_id):
+  # Not users:auth:, where whole users were cached before
+  return f'users:auth-entry:{user_id}'
+
+
+def invalidate_user(user_id):
+  cache.delete(user_cache_key(user_id))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+  """
+  JWTAuthentication that keeps what it needs to know about the users it
+  loads in the cache for AUTH_USER_CACHE_TIMEOUT seconds.
+
+  Reads (safe methods) are answered from the cache, which saves the user
+  query on most requests. Only the id, is_active and a digest of the
+  password hash are cached, as the cache may be shared or on disk; the user
+  is returned with its other fields deferred, loaded if a view reads them.
+  Writes always load the user from the database and refresh the cached
+  entry. Saving or deleting a user drops the entry (see users.signals), so
+  deactivations and password changes apply at once.
+  """
+
+  def authenticate(self, request):
+    self.use_cache = request.method in SAFE_METHODS
+    return super().authenticate(request)
+
+  def get_user(self, validated_token):
+    key = user_cache_key(self._user_id(validated_token))
+    entry = cache.get(key) if getattr(self, 'use_cache', True) else None
+    if entry is None:
+      user = super().get_user(validated_token)
+      cache.set(key, cache_entry(user), settings.AUTH_USER_CACHE_TIMEOUT)
+      return user
+    self.check_user(entry, validated_token)
+    return self.cached_user(entry)
+
+  async def aget_user(self, validated_token):
+    """
+    get_user for async views. cache.aget() and afirst() run the cache backend
+    and the query through sync_to_async, so this still takes thread hops.
+    """
+    user_id = self._user_id(validated_token)
+    key = user_cache_key(user_id)
+    entry = await cache.aget(key)
+    if entry is None:
+      user = await self.user_model.objects.filter(**{api_settings.USER_ID_FIELD: user_id}).afirst()
+      if user is None:
+        raise AuthenticationFailed(_("User not found"), code="user_not_found")
+      entry = cache_entry(user)
+      await cache.aset(key, entry, settings.AUTH_USER_CACHE_TIMEOUT)
+      self.check_user(entry, validated_token)
+      return user
+    self.check_user(entry, validated_token)
+    return self.cached_user(entry)
+
+  def cached_user(self, entry):
+    """The user of a cache entry, every field but the id and is_active deferred."""
+    pk = self.user_model._meta.pk
+    user = self.user_model.from_db(
+      router.db_for_read(self.user_model), [pk.attname, 'is_active'], [entry['pk'], entry['is_active']]
+    )
+    # Load the rest with one query on first access, see CustomUser.refresh_from_db
+    user.load_deferred_together = True
+    return user
+
+  def _user_id(self, validated_token):
+    try:
+      return validated_token[api_settings.USER_ID_CLAIM]
+    except KeyError:
+      raise InvalidToken(_("Token contained no recognizable user identification"))
+
+  def check_user(self, entry, validated_token):
+    # The checks JWTAuthentication.get_user runs after loading the user
+    if api_settings.CHECK_USER_IS_ACTIVE and not entry['is_active']:
+      raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+    if api_settings.CHECK_REVOKE_TOKEN:
+      if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != entry['password_digest']:
+        raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+
+def cache_entry(user):
+  """What authenticating a user needs, without the password hash itself."""
+  return {'pk': user.pk, 'is_active': user.is_active, 'password_digest': get_md5_hash_password(user.password)}
@@ -0,0 +1,34 @@
+from django.db.models import Case, IntegerField, Q, Value, When
+from rest_framework import serializers
+from .models import user_search_document
+
+
+class UserFilterSerializer(serializers.Serializer):
+    """Query parameters of the user directory."""
+    search = serializers.CharField(required=False, max_length=100)
+    # Comma separated primary keys, to show the users a form already refers to
+    ids = serializers.CharField(required=False)
+
+    def validate_ids(self, value):
+        try:
+            return [int(pk) for pk in value.split(',') if pk.strip()]
+        except ValueError:
+            raise serializers.ValidationError('Expected a comma separated list of ids.')
+
+    def filter_queryset(self, queryset):
+        data = self.validated_data
+        if 'ids' in data:
+            queryset = queryset.filter(pk__in=data['ids'])
+
+        terms = data.get('search', '').split()
+        if not terms:
+            return queryset.order_by('username')
+        # Every term has to appear in one of the fields
+        queryset = queryset.alias(search_document=user_search_document())
+        for term in terms:
+            queryset = queryset.filter(search_document__icontains=term)
+        # Typeahead: users whose username or email starts with the first term come first
+        prefix = Q(username__istartswith=terms[0]) | Q(email__istartswith=terms[0])
+        return queryset.annotate(
+            prefix_match=Case(When(prefix, then=Value(0)), default=Value(1), output_field=IntegerField())
+        ).order_by('prefix_match', 'username')
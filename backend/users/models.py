@@ -1,8 +1,26 @@
 from django.db import models
+from django.db.models.functions import Concat, Upper
 from django.contrib.auth.models import AbstractUser
+from django.contrib.postgres.indexes import GinIndex, OpClass
 
 # Create your models here.
 
+# Fields the user directory searches
+USER_SEARCH_FIELDS = ["username", "email", "first_name", "last_name", "phone_number"]
+
+
+def user_search_document():
+  """
+  USER_SEARCH_FIELDS joined by spaces. The model has a trigram index on the
+  upper-cased document, which is what a document__icontains filter compares,
+  so a search is a single index scan whatever the field it matches.
+  """
+  parts = []
+  for field in USER_SEARCH_FIELDS:
+    parts += [models.F(field), models.Value(' ')]
+  return Concat(*parts[:-1], output_field=models.TextField())
+
+
 class CustomUser(AbstractUser):
 
   email = models.EmailField(unique=True)
@@ -11,7 +29,24 @@ class CustomUser(AbstractUser):
   REQUIRED_FIELDS = ["email", "first_name", "last_name"]
   USERNAME_FIELD = "username"
 
+  class Meta(AbstractUser.Meta):
+    indexes = [
+      GinIndex(OpClass(Upper(user_search_document()), name='gin_trgm_ops'), name='user_search_trgm_idx'),
+    ]
+
   def __str__(self):
     return f"{self.username}, {self.role}"
 
+  # Set on users built from the authentication cache (see users.authentication)
+  load_deferred_together = False
+
+  def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+    # On a cached user, reading a deferred field loads every deferred field,
+    # so it costs one query whichever fields the view reads
+    if fields is not None and self.load_deferred_together:
+      deferred = self.get_deferred_fields()
+      if deferred and set(fields) <= deferred:
+        fields = deferred
+    super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+
 
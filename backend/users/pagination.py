@@ -0,0 +1,7 @@
+from rest_framework.pagination import LimitOffsetPagination
+
+
+class UserDirectoryPagination(LimitOffsetPagination):
+    """Small pages by default: the directory backs a typeahead."""
+    default_limit = 20
+    max_limit = 100
@@ -1,3 +1,135 @@
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from .authentication import user_cache_key
+
+User = get_user_model()
 
 # Create your tests here.
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class CachedJWTAuthenticationTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='owner1',
+            email='owner1@example.com',
+            password='password123'
+        )
+        self.client = APIClient()
+        response = self.client.post(reverse('token_obtain_pair'), {
+            'username': 'owner1',
+            'password': 'password123'
+        })
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+
+    def test_reads_use_the_cached_user(self):
+        # The user lookup, then the page count and the page itself
+        with self.assertNumQueries(3):
+            self.client.get(reverse('user-list'))
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('user-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_password_hash_is_not_cached(self):
+        self.client.get(reverse('user-list'))
+        entry = cache.get(user_cache_key(self.user.pk))
+        self.assertEqual(set(entry), {'pk', 'is_active', 'password_digest'})
+        self.assertNotIn(self.user.password, repr(entry))
+
+        # The other fields are loaded together when a view reads them
+        with self.assertNumQueries(1):
+            response = self.client.get('/users/auth/users/me/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['username'], 'owner1')
+
+    def test_other_users_load_deferred_fields_one_at_a_time(self):
+        user = User.objects.only('id').get(pk=self.user.pk)
+        with self.assertNumQueries(1):
+            self.assertEqual(user.username, 'owner1')
+        self.assertIn('email', user.get_deferred_fields())
+
+    def test_writes_load_the_user(self):
+        self.client.get(reverse('user-list'))
+        # Invalid payload: the user lookup is the only query
+        with self.assertNumQueries(1):
+            response = self.client.post('/properties/api/', {})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_changes_to_the_user_apply_at_once(self):
+        self.client.get(reverse('user-list'))
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get(reverse('user-list')).status_code, status.HTTP_401_UNAUTHORIZED)
+
+        self.user.is_active = True
+        self.user.save()
+        self.assertEqual(self.client.get(reverse('user-list')).status_code, status.HTTP_200_OK)
+        self.user.delete()
+        self.assertEqual(self.client.get(reverse('user-list')).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_async_views_share_the_cache(self):
+        self.client.get(reverse('user-list'))
+        # Just the dashboard aggregates
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('async-dashboard-summary'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get(reverse('async-lease-list')).status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class UserDirectoryTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='owner1',
+            email='owner1@example.com',
+            password='password123'
+        )
+        people = [
+            ('anna.nowak', 'anna@example.com', 'Anna', 'Nowak', '+48 600 100 200'),
+            ('jan.kowalski', 'jan@rentwise.pl', 'Jan', 'Kowalski', None),
+            ('kowal', 'k.wal@example.com', 'Karol', 'Wal', '+48 511 222 333'),
+            ('zofia', 'zofia.kowalska@example.com', 'Zofia', 'Kowalska', None),
+        ]
+        self.people = {
+            username: User.objects.create_user(
+                username=username, email=email, first_name=first, last_name=last,
+                phone_number=phone, password='password123'
+            )
+            for username, email, first, last, phone in people
+        }
+        self.client = APIClient()
+        response = self.client.post(reverse('token_obtain_pair'), {
+            'username': 'owner1',
+            'password': 'password123'
+        })
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+
+    def search(self, **params):
+        response = self.client.get(reverse('user-list'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [user['username'] for user in response.data['results']]
+
+    def test_search_matches_any_field(self):
+        # Prefix matches on username or email come first
+        self.assertEqual(self.search(search='KOWAL'), ['kowal', 'jan.kowalski', 'zofia'])
+        self.assertEqual(self.search(search='rentwise'), ['jan.kowalski'])
+        self.assertEqual(self.search(search='600 100'), ['anna.nowak'])
+        self.assertEqual(self.search(search='zofia kowalska'), ['zofia'])
+        self.assertEqual(self.search(search='nobody'), [])
+
+    def test_paging_and_ids(self):
+        response = self.client.get(reverse('user-list'), {'limit': 2})
+        self.assertEqual(response.data['count'], 5)
+        self.assertEqual([user['username'] for user in response.data['results']], ['anna.nowak', 'jan.kowalski'])
+        self.assertIsNotNone(response.data['next'])
+
+        ids = f"{self.people['zofia'].pk},{self.people['kowal'].pk}"
+        self.assertEqual(self.search(ids=ids), ['kowal', 'zofia'])
+        response = self.client.get(reverse('user-list'), {'ids': 'a,b'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -1,6 +1,8 @@
 from rest_framework.generics import ListAPIView
 from rest_framework.permissions import IsAuthenticated
 from .serializers import CustomUserSerializer
+from .filters import UserFilterSerializer
+from .pagination import UserDirectoryPagination
 from django.contrib.auth import get_user_model
 
 # Create your views here.
@@ -10,4 +12,10 @@ User = get_user_model()
 class UserListView(ListAPIView):
     permission_classes = [IsAuthenticated]
     queryset = User.objects.all()
-    serializer_class = CustomUserSerializer
\ No newline at end of file
+    serializer_class = CustomUserSerializer
+    pagination_class = UserDirectoryPagination
+
+    def get_queryset(self):
+        filters = UserFilterSerializer(data=self.request.query_params.dict())
+        filters.is_valid(raise_exception=True)
+        return filters.filter_queryset(super().get_queryset())
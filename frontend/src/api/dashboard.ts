@@ -0,0 +1,13 @@
+export const fetchDashboardSummary = async (accessToken: string) => {
+  const response = await fetch('http://localhost:8000/properties/api/dashboard/', {
+    headers: {
+      Authorization: `Bearer ${accessToken}`,
+    },
+  });
+
+  if (!response.ok) {
+    throw new Error('Failed to fetch dashboard summary');
+  }
+
+  return await response.json();
+};
@@ -1,15 +1,7 @@
-export const fetchLeases = async (accessToken: string) => {
-  const response = await fetch('http://localhost:8000/properties/api/leases/', {
-    headers: {
-      Authorization: `Bearer ${accessToken}`,
-    },
-  });
-
-  if (!response.ok) {
-    throw new Error('Failed to fetch leases');
-  }
+import { fetchPage, ListFilters } from './pagination';
 
-  return await response.json();
+export const fetchLeases = async (accessToken: string, filters: ListFilters = {}, cursor?: string | null) => {
+  return fetchPage('http://localhost:8000/properties/api/leases/', accessToken, 'Failed to fetch leases', filters, cursor);
 };
 
 export const fetchLeaseDetail = async (id: number, accessToken: string): Promise<any> => {
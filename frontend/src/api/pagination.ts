@@ -0,0 +1,35 @@
+export interface Page<T> {
+  results: T[];
+  next: string | null;
+}
+
+export type ListFilters = Record<string, string | number | boolean | undefined>;
+
+// List endpoints are cursor paginated: this loads one page. Pass the page's `next`
+// back as `cursor` to load the following one, the filters are already encoded in it.
+export const fetchPage = async <T = any>(
+  url: string,
+  accessToken: string,
+  errorMessage: string,
+  filters: ListFilters = {},
+  cursor?: string | null,
+): Promise<Page<T>> => {
+  const params = new URLSearchParams();
+  Object.entries(filters).forEach(([key, value]) => {
+    if (value !== undefined && value !== '') params.set(key, String(value));
+  });
+  const query = params.toString();
+
+  const response = await fetch(cursor || (query ? `${url}?${query}` : url), {
+    headers: {
+      Authorization: `Bearer ${accessToken}`,
+    },
+  });
+
+  if (!response.ok) {
+    throw new Error(errorMessage);
+  }
+
+  const page = await response.json();
+  return { results: page.results, next: page.next };
+};
@@ -1,12 +1,19 @@
-export const fetchPayments = async (accessToken: string) => {
-  const response = await fetch('http://localhost:8000/properties/api/payments/', {
+import { fetchPage, ListFilters } from './pagination';
+
+export const fetchPayments = async (accessToken: string, filters: ListFilters = {}, cursor?: string | null) => {
+  return fetchPage('http://localhost:8000/properties/api/payments/', accessToken, 'Failed to fetch payments', filters, cursor);
+};
+
+export const generatePaymentSchedule = async (leaseId: number, accessToken: string) => {
+  const response = await fetch(`http://localhost:8000/properties/api/leases/${leaseId}/schedule/`, {
+    method: 'POST',
     headers: {
       Authorization: `Bearer ${accessToken}`,
     },
   });
 
   if (!response.ok) {
-    throw new Error('Failed to fetch payments');
+    throw new Error('Failed to generate payment schedule');
   }
 
   return await response.json();
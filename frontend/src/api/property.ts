@@ -1,12 +1,18 @@
-export const fetchProperties = async (accessToken: string) => {
-  const response = await fetch('http://localhost:8000/properties/api/', {
+import { fetchPage, ListFilters } from './pagination';
+
+export const fetchProperties = async (accessToken: string, filters: ListFilters = {}, cursor?: string | null) => {
+  return fetchPage('http://localhost:8000/properties/api/', accessToken, 'Failed to fetch properties', filters, cursor);
+};
+
+export const fetchProperty = async (id: number, accessToken: string) => {
+  const response = await fetch(`http://localhost:8000/properties/api/${id}/`, {
     headers: {
       Authorization: `Bearer ${accessToken}`,
     },
   });
 
   if (!response.ok) {
-    throw new Error('Failed to fetch properties');
+    throw new Error('Failed to fetch property');
   }
 
   return await response.json();
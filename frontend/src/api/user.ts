@@ -0,0 +1,34 @@
+export interface User {
+  id: number;
+  username: string;
+  email: string;
+  first_name: string;
+  last_name: string;
+  phone_number: string | null;
+}
+
+interface UserQuery {
+  search?: string;
+  ids?: number[];
+  limit?: number;
+}
+
+// The user directory is paginated: this returns one page of matches, not every user.
+export const searchUsers = async (accessToken: string, { search, ids, limit = 20 }: UserQuery): Promise<User[]> => {
+  const params = new URLSearchParams({ limit: String(limit) });
+  if (search) params.set('search', search);
+  if (ids) params.set('ids', ids.join(','));
+
+  const response = await fetch(`http://localhost:8000/users/api/users/?${params}`, {
+    headers: {
+      Authorization: `Bearer ${accessToken}`,
+    },
+  });
+
+  if (!response.ok) {
+    throw new Error('Failed to fetch users');
+  }
+
+  const page = await response.json();
+  return page.results;
+};
@@ -0,0 +1,97 @@
+import React, { useEffect, useState } from 'react';
+import { searchUsers, User } from '../api/user';
+
+interface TenantPickerProps {
+  id?: string;
+  value: number | '';
+  onChange: (tenantId: number | '') => void;
+  invalid?: boolean;
+}
+
+// Searching starts at this many characters; shorter terms match too many users to be useful
+const MIN_SEARCH_LENGTH = 3;
+
+const TenantPicker = ({ id = 'tenant', value, onChange, invalid = false }: TenantPickerProps) => {
+  const [search, setSearch] = useState('');
+  const [options, setOptions] = useState<User[]>([]);
+  const [selected, setSelected] = useState<User | null>(null);
+  const [error, setError] = useState('');
+
+  // Load the current tenant so the select can show it before any search
+  useEffect(() => {
+    const access = localStorage.getItem('access');
+    if (!access || value === '' || selected?.id === value) return;
+
+    let cancelled = false;
+    searchUsers(access, { ids: [value] })
+      .then(([user]) => {
+        if (!cancelled) setSelected(user ?? null);
+      })
+      .catch(() => setError('Failed to load tenants.'));
+    return () => {
+      cancelled = true;
+    };
+  }, [value, selected]);
+
+  useEffect(() => {
+    const access = localStorage.getItem('access');
+    const query = search.trim();
+    if (!access || (query && query.length < MIN_SEARCH_LENGTH)) return;
+
+    // Wait for a pause in typing, and drop answers to searches that were superseded
+    let cancelled = false;
+    const timer = setTimeout(() => {
+      searchUsers(access, { search: query })
+        .then((users) => {
+          if (!cancelled) setOptions(users);
+        })
+        .catch(() => setError('Failed to load tenants.'));
+    }, 300);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [search]);
+
+  const handleSelect = (e: React.ChangeEvent<HTMLSelectElement>) => {
+    if (e.target.value === '') {
+      onChange('');
+      return;
+    }
+    const tenantId = Number(e.target.value);
+    setSelected(options.find((u) => u.id === tenantId) ?? null);
+    onChange(tenantId);
+  };
+
+  const choices = selected && !options.some((u) => u.id === selected.id) ? [selected, ...options] : options;
+
+  return (
+    <>
+      <input
+        type="search"
+        className="form-control dark-input mb-2"
+        placeholder="Search by name, username, email or phone"
+        value={search}
+        onChange={(e) => setSearch(e.target.value)}
+      />
+      <select
+        id={id}
+        name={id}
+        className={`form-select dark-input ${invalid ? 'is-invalid' : ''}`}
+        value={value}
+        onChange={handleSelect}
+        required
+      >
+        <option value="">-- Select tenant --</option>
+        {choices.map((t) => (
+          <option key={t.id} value={t.id}>
+            {t.email}
+          </option>
+        ))}
+      </select>
+      {error && <div className="text-danger small mt-1">{error}</div>}
+    </>
+  );
+};
+
+export default TenantPicker;
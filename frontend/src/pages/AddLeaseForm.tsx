@@ -1,5 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
+import { fetchProperties } from '../api/property';
+import TenantPicker from '../components/tenantPicker';
 
 interface Property {
   id: number;
@@ -7,21 +9,16 @@ interface Property {
   status: 'available' | 'rented' | 'under_renovation';
 }
 
-interface Tenant {
-  id: number;
-  email: string;
-}
-
 const AddLeaseForm = () => {
   const navigate = useNavigate();
   const [propertyId, setPropertyId] = useState<number | ''>('');
   const [tenantId, setTenantId] = useState<number | ''>('');
-  const [tenants, setTenants] = useState<Tenant[]>([]);
   const [startDate, setStartDate] = useState('');
   const [endDate, setEndDate] = useState('');
   const [rateAmount, setRateAmount] = useState('');
   const [activeLease, setActiveLease] = useState(false);
   const [properties, setProperties] = useState<Property[]>([]);
+  const [nextProperties, setNextProperties] = useState<string | null>(null);
   const [error, setError] = useState('');
   const [validationErrors, setValidationErrors] = useState<Record<string, string>>({});
 
@@ -32,26 +29,28 @@ const AddLeaseForm = () => {
       return;
     }
 
-    fetch('http://localhost:8000/properties/api/', {
-      headers: {
-        Authorization: `Bearer ${access}`,
-      },
-    })
-      .then((res) => res.json())
-      .then((data) => setProperties(data))
+    fetchProperties(access, { status: 'available' })
+      .then((page) => {
+        setProperties(page.results);
+        setNextProperties(page.next);
+      })
       .catch(() => setError('Failed to load properties.'));
 
-    fetch('http://localhost:8000/users/api/users/', {
-      headers: {
-        Authorization: `Bearer ${access}`,
-      },
-    })
-      .then((res) => res.json())
-      .then((data) => setTenants(data))
-      .catch(() => setError('Failed to load tenants.'));
-
   }, [navigate]);
 
+  const loadMoreProperties = async () => {
+    const access = localStorage.getItem('access');
+    if (!access || !nextProperties) return;
+
+    try {
+      const page = await fetchProperties(access, {}, nextProperties);
+      setProperties((prev) => [...prev, ...page.results]);
+      setNextProperties(page.next);
+    } catch {
+      setError('Failed to load properties.');
+    }
+  };
+
 
 
 
@@ -118,36 +117,30 @@ const AddLeaseForm = () => {
               required
             >
               <option value="">-- Select property --</option>
-              {properties
-                .filter(p => p.status === 'available')
-                .map(p => (
-                  <option key={p.id} value={p.id}>
-                    {p.address} ({p.status})
-                  </option>
-                ))}
+              {properties.map(p => (
+                <option key={p.id} value={p.id}>
+                  {p.address} ({p.status})
+                </option>
+              ))}
             </select>
             {validationErrors.propertyId && (
               <div className="invalid-feedback">{validationErrors.propertyId}</div>
             )}
+            {nextProperties && (
+              <button type="button" className="btn btn-link btn-sm px-0" onClick={loadMoreProperties}>
+                Load more properties
+              </button>
+            )}
 </div>
 
 
           <div className="mb-3">
             <label htmlFor="tenant" className="form-label">Tenant</label>
-            <select
-              id="tenant"
-              className={`form-select dark-input ${validationErrors.tenantId ? 'is-invalid' : ''}`}
+            <TenantPicker
               value={tenantId}
-              onChange={(e) => setTenantId(Number(e.target.value))}
-              required
-            >
-              <option value="">-- Select tenant --</option>
-              {tenants.map((t) => (
-                <option key={t.id} value={t.id}>
-                  {t.email}
-                </option>
-              ))}
-            </select>
+              onChange={setTenantId}
+              invalid={Boolean(validationErrors.tenantId)}
+            />
             {validationErrors.tenantId && (
               <div className="invalid-feedback">{validationErrors.tenantId}</div>
             )}
@@ -1,5 +1,7 @@
 import React, { useEffect, useState } from 'react';
 import { useNavigate, useParams } from 'react-router-dom';
+import { fetchProperties, fetchProperty } from '../api/property';
+import TenantPicker from '../components/tenantPicker';
 
 interface Lease {
   id: number;
@@ -11,11 +13,6 @@ interface Lease {
   active_lease: boolean;
 }
 
-interface Tenant {
-  id: number;
-  email: string;
-}
-
 interface Property {
   id: number;
   address: string;
@@ -25,12 +22,12 @@ interface Property {
 const EditLease = () => {
   const { id } = useParams<{ id: string }>();
   const navigate = useNavigate();
-  const [tenants, setTenants] = useState<Tenant[]>([]);
   const [lease, setLease] = useState<Lease | null>(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
   const [validationErrors, setValidationErrors] = useState<Record<string, string>>({});
   const [properties, setProperties] = useState<Property[]>([]);
+  const [nextProperties, setNextProperties] = useState<string | null>(null);
 
   useEffect(() => {
     const access = localStorage.getItem('access');
@@ -41,33 +38,30 @@ const EditLease = () => {
 
     const fetchData = async () => {
       try {
-        const [leaseRes, tenantsRes, propertiesRes] = await Promise.all([
+        const [leaseRes, available] = await Promise.all([
           fetch(`http://localhost:8000/properties/api/leases/${id}/`, {
             headers: { Authorization: `Bearer ${access}` },
           }),
-          fetch('http://localhost:8000/users/api/users/', {
-            headers: { Authorization: `Bearer ${access}` },
-          }),
-          fetch('http://localhost:8000/properties/api/', {
-            headers: { Authorization: `Bearer ${access}` },
-          }),
+          fetchProperties(access, { status: 'available' }),
         ]);
 
         if (!leaseRes.ok) throw new Error('Failed to fetch lease.');
-        if (!tenantsRes.ok) throw new Error('Failed to fetch tenants.');
-        if (!propertiesRes.ok) throw new Error('Failed to fetch properties.');
 
         const leaseData = await leaseRes.json();
-        const tenantsData = await tenantsRes.json();
-        const propertiesData = await propertiesRes.json();
+        const propertyId = typeof leaseData.property === 'object' ? leaseData.property.id : leaseData.property;
+
+        // The leased property is usually rented, so it is not in the available page
+        const current = available.results.some((p: Property) => p.id === propertyId)
+          ? []
+          : [await fetchProperty(propertyId, access)];
 
         setLease({
           ...leaseData,
-          property: typeof leaseData.property === 'object' ? leaseData.property.id : leaseData.property,
+          property: propertyId,
           tenant: typeof leaseData.tenant === 'object' ? leaseData.tenant.id : leaseData.tenant,
         });
-        setTenants(tenantsData);
-        setProperties(propertiesData);
+        setProperties([...current, ...available.results]);
+        setNextProperties(available.next);
       } catch {
         setError('Failed to load data.');
       } finally {
@@ -78,6 +72,19 @@ const EditLease = () => {
     fetchData();
   }, [id, navigate]);
 
+  const loadMoreProperties = async () => {
+    const access = localStorage.getItem('access');
+    if (!access || !nextProperties) return;
+
+    try {
+      const page = await fetchProperties(access, {}, nextProperties);
+      setProperties((prev) => [...prev, ...page.results.filter((p: Property) => !prev.some((q) => q.id === p.id))]);
+      setNextProperties(page.next);
+    } catch {
+      setError('Failed to load properties.');
+    }
+  };
+
   const handleChange = (e: React.ChangeEvent<HTMLInputElement | HTMLSelectElement>) => {
     const target = e.target;
     const { name, type } = target;
@@ -182,35 +189,28 @@ const EditLease = () => {
               required
             >
               <option value="">-- Select property --</option>
-              {properties
-                .filter((p) => p.status === 'available' || p.id === lease.property)
-                .map((p) => (
-                  <option key={p.id} value={p.id}>
-                    {p.address} ({p.status})
-                  </option>
-                ))}
+              {properties.map((p) => (
+                <option key={p.id} value={p.id}>
+                  {p.address} ({p.status})
+                </option>
+              ))}
             </select>
+            {nextProperties && (
+              <button type="button" className="btn btn-link btn-sm px-0" onClick={loadMoreProperties}>
+                Load more properties
+              </button>
+            )}
           </div>
 
           <div className="mb-3">
             <label htmlFor="tenant" className="form-label">
               Tenant
             </label>
-            <select
-              id="tenant"
-              name="tenant"
-              className={`form-select dark-input ${validationErrors.tenant ? 'is-invalid' : ''}`}
+            <TenantPicker
               value={lease.tenant}
-              onChange={handleChange}
-              required
-            >
-              <option value="">-- Select tenant --</option>
-              {tenants.map((t) => (
-                <option key={t.id} value={t.id}>
-                  {t.email}
-                </option>
-              ))}
-            </select>
+              onChange={(tenant) => setLease((prev) => (prev ? { ...prev, tenant: tenant === '' ? 0 : tenant } : null))}
+              invalid={Boolean(validationErrors.tenant)}
+            />
             {validationErrors.tenant && <div className="invalid-feedback">{validationErrors.tenant}</div>}
           </div>
 
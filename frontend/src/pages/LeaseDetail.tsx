@@ -1,6 +1,7 @@
 import React, { useEffect, useState } from 'react';
 import { useNavigate, useParams } from 'react-router-dom';
 import { fetchLeaseDetail } from '../api/lease';
+import { generatePaymentSchedule } from '../api/payment';
 import { Card, Button, Row, Col } from 'react-bootstrap';
 import axios from 'axios';
 
@@ -18,13 +19,27 @@ const previewContractPdf = async () => {
   }
 
   try {
-    const response = await axios.get(`http://localhost:8000/properties/leases/${lease.id}/contract/`, {
+    let response = await axios.get(`http://localhost:8000/properties/leases/${lease.id}/contract/`, {
       headers: {
         Authorization: `Bearer ${access}`,
       },
       responseType: 'blob',
     });
 
+    // 202 means the PDF is still being generated in the background
+    for (let attempt = 0; response.status === 202 && attempt < 10; attempt++) {
+      await new Promise((resolve) => setTimeout(resolve, 2000));
+      response = await axios.get(`http://localhost:8000/properties/leases/${lease.id}/contract/`, {
+        headers: {
+          Authorization: `Bearer ${access}`,
+        },
+        responseType: 'blob',
+      });
+    }
+    if (response.status !== 200) {
+      throw new Error('Contract PDF not ready');
+    }
+
     const file = new Blob([response.data], { type: 'application/pdf' });
     const fileURL = URL.createObjectURL(file);
     window.open(fileURL);
@@ -33,6 +48,18 @@ const previewContractPdf = async () => {
   }
 };
 
+const generateSchedule = async () => {
+  const access = localStorage.getItem('access');
+  if (!access) return;
+
+  try {
+    await generatePaymentSchedule(lease.id, access);
+    setLease(await fetchLeaseDetail(lease.id, access));
+  } catch (error) {
+    setError('Failed to generate payment schedule.');
+  }
+};
+
   useEffect(() => {
     const access = localStorage.getItem('access');
     if (!access) {
@@ -108,6 +135,9 @@ const previewContractPdf = async () => {
                 >
                   Add Payment
                 </Button>
+                <Button className="btn-success" onClick={generateSchedule}>
+                  Generate Payment Schedule
+                </Button>
                 <Button className="btn-dark" onClick={previewContractPdf}>
                   Preview Contract PDF
                 </Button>
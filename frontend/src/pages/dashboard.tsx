@@ -2,9 +2,13 @@ import React, { useEffect, useState } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { fetchProperties, deleteProperty } from '../api/property';
 import { fetchLeases } from '../api/lease';
+import { fetchDashboardSummary } from '../api/dashboard';
 import AppNavbar from '../components/navbar';
 import { Card, Row, Col, Container, Button } from 'react-bootstrap';
 
+// The lists show the most recent rows, every total comes from the summary
+const DASHBOARD_PAGE_SIZE = 10;
+
 interface Property {
   id: number;
   address: string;
@@ -15,6 +19,12 @@ interface Property {
   description: string;
 }
 
+interface Summary {
+  total_properties: number;
+  occupancy_rate: number;
+  overdue: { count: number; amount: string };
+}
+
 interface Lease {
   id: number;
   start_date: string;
@@ -40,6 +50,9 @@ const Dashboard = () => {
   const navigate = useNavigate();
   const [properties, setProperties] = useState<Property[]>([]);
   const [leases, setLeases] = useState<Lease[]>([]);
+  const [nextProperties, setNextProperties] = useState<string | null>(null);
+  const [nextLeases, setNextLeases] = useState<string | null>(null);
+  const [summary, setSummary] = useState<Summary | null>(null);
   const [error, setError] = useState('');
 
   useEffect(() => {
@@ -54,12 +67,16 @@ const Dashboard = () => {
 
     const fetchAllData = async () => {
       try {
-        const [props, ls] = await Promise.all([
-          fetchProperties(access!),
-          fetchLeases(access!),
+        const [props, ls, sum] = await Promise.all([
+          fetchProperties(access!, { page_size: DASHBOARD_PAGE_SIZE }),
+          fetchLeases(access!, { page_size: DASHBOARD_PAGE_SIZE }),
+          fetchDashboardSummary(access!),
         ]);
-        setProperties(props);
-        setLeases(ls);
+        setProperties(props.results);
+        setNextProperties(props.next);
+        setLeases(ls.results);
+        setNextLeases(ls.next);
+        setSummary(sum);
       } catch (err) {
         setError('Failed to load dashboard data.');
       }
@@ -68,6 +85,32 @@ const Dashboard = () => {
     fetchAllData();
   }, [navigate]);
 
+  const loadMoreProperties = async () => {
+    const access = localStorage.getItem('access');
+    if (!access || !nextProperties) return;
+
+    try {
+      const page = await fetchProperties(access, {}, nextProperties);
+      setProperties((prev) => [...prev, ...page.results]);
+      setNextProperties(page.next);
+    } catch (err) {
+      setError('Failed to load more properties.');
+    }
+  };
+
+  const loadMoreLeases = async () => {
+    const access = localStorage.getItem('access');
+    if (!access || !nextLeases) return;
+
+    try {
+      const page = await fetchLeases(access, {}, nextLeases);
+      setLeases((prev) => [...prev, ...page.results]);
+      setNextLeases(page.next);
+    } catch (err) {
+      setError('Failed to load more leases.');
+    }
+  };
+
   const handleDelete = async (id: number) => {
     const access = localStorage.getItem('access');
     if (!access) return;
@@ -113,12 +156,35 @@ const Dashboard = () => {
         <h2 className="text-center mb-4">Dashboard</h2>
         {error && <div className="alert alert-danger">{error}</div>}
 
+        {summary && (
+          <Row className="g-4 mb-4">
+            <Col md={4}>
+              <Card className="custom-card text-center p-3">
+                <div>Properties</div>
+                <h4>{summary.total_properties}</h4>
+              </Card>
+            </Col>
+            <Col md={4}>
+              <Card className="custom-card text-center p-3">
+                <div>Occupancy</div>
+                <h4>{Math.round(summary.occupancy_rate * 100)}%</h4>
+              </Card>
+            </Col>
+            <Col md={4}>
+              <Card className="custom-card text-center p-3">
+                <div>Overdue payments</div>
+                <h4>{summary.overdue.count} ({summary.overdue.amount} PLN)</h4>
+              </Card>
+            </Col>
+          </Row>
+        )}
+
         <Row className="g-4">
           {/* PROPERTIES */}
           <Col md={6}>
             <Card className="custom-card h-100">
               <div className="d-flex justify-content-between align-items-center mb-3 custom-card-header">
-                <div>Properties</div>
+                <div>Properties{summary && ` (${summary.total_properties})`}</div>
                 <div>
                   <Button
                     size="sm"
@@ -158,6 +224,11 @@ const Dashboard = () => {
                     </div>
                   </div>
                 ))}
+                {nextProperties && (
+                  <Button size="sm" variant="outline-light" onClick={loadMoreProperties}>
+                    Load more
+                  </Button>
+                )}
               </div>
             </Card>
           </Col>
@@ -214,6 +285,11 @@ const Dashboard = () => {
                     </div>
                   </div>
                 ))}
+                {nextLeases && (
+                  <Button size="sm" variant="outline-light" onClick={loadMoreLeases}>
+                    Load more
+                  </Button>
+                )}
               </div>
             </Card>
           </Col>